@@ -13,9 +13,45 @@ def create_app():
 
     db.init_app(app)
 
+    from availability import availability_index
+    availability_index.init_app(app)
+
+    from search_cache import search_cache
+    search_cache.init_app(app)
+
+    from holds import room_holds
+    room_holds.init_app(app)
+
+    from room_locks import room_writes
+    room_writes.init_app(app)
+
+    from idempotency import idempotency_keys
+    idempotency_keys.init_app(app)
+
+    from booking_queue import booking_queue
+    booking_queue.init_app(app)
+
+    from sweeper import sweeper
+    sweeper.init_app(app)
+
+    from pagination import paginator
+    paginator.init_app(app)
+
+    from archive_export import archive_exports
+    archive_exports.init_app(app)
+
+    from retention import archive_retention
+    archive_retention.init_app(app)
+
+    from bulk_import import bulk_import
+    bulk_import.init_app(app)
+
     from routes.__init__ import init_app  
     init_app(app)
 
+    from commands import init_app as init_commands
+    init_commands(app)
+
     @app.route('/')
     def root():
         return redirect(url_for('auth.login'))
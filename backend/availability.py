@@ -0,0 +1,206 @@
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+
+class AvailabilityIndex:
+    """Per-process room-night occupancy index used by room search.
+
+    Every room gets a Python int used as a bitset: bit ``i`` is set when the
+    night starting at ``origin + i`` is taken by an active booking or a
+    rental. Searches inside the horizon are answered with a single AND per
+    room instead of the correlated OVERLAPS subqueries.
+    """
+
+    def __init__(self, horizon_days=365, max_age=300):
+        self.enabled = True
+        self.horizon_days = horizon_days
+        self.max_age = max_age
+        self.origin = None
+        self.built_at = None
+        self.masks = {}
+        self._lock = threading.RLock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('AVAILABILITY_INDEX_ENABLED', True)
+        self.horizon_days = app.config.get('AVAILABILITY_HORIZON_DAYS', self.horizon_days)
+        self.max_age = app.config.get('AVAILABILITY_MAX_AGE', self.max_age)
+
+    @property
+    def horizon_end(self):
+        return self.origin + timedelta(days=self.horizon_days)
+
+    def is_ready(self):
+        if self.built_at is None or self.origin != date.today():
+            return False
+        return self.max_age is None or time.monotonic() - self.built_at < self.max_age
+
+    def ensure_ready(self, session):
+        if not self.is_ready():
+            self.build(session)
+
+    def invalidate(self):
+        with self._lock:
+            self.built_at = None
+
+    def covers(self, checkin, checkout):
+        return self.is_ready() and self.origin <= checkin and checkout <= self.horizon_end
+
+    def build(self, session):
+        origin = date.today()
+        horizon_end = origin + timedelta(days=self.horizon_days)
+
+        masks = {
+            (row.hotelid, row.roomid): 0
+            for row in session.execute(text("SELECT HotelID, RoomID FROM Room"))
+        }
+        for row in session.execute(_OCCUPANCY_QUERY, {'start': origin, 'end': horizon_end}):
+            key = (row.hotelid, row.roomid)
+            if key in masks:
+                masks[key] |= self._span(origin, row.checkindate, row.checkoutdate)
+
+        with self._lock:
+            self.masks = masks
+            self.origin = origin
+            self.built_at = time.monotonic()
+
+    def _span(self, origin, checkin, checkout):
+        # Same-day rentals are empty '[)' ranges and block nothing, as in StayPeriod.
+        first = max((checkin - origin).days, 0)
+        last = min((checkout - origin).days, self.horizon_days)
+        if last <= first:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    def occupy(self, hotel_id, room_id, checkin, checkout):
+        if self.built_at is None:
+            return
+        checkin, checkout = as_date(checkin), as_date(checkout)
+        with self._lock:
+            key = (int(hotel_id), int(room_id))
+            self.masks[key] = self.masks.get(key, 0) | self._span(self.origin, checkin, checkout)
+
+    def refresh_room(self, session, hotel_id, room_id):
+        """Recompute one room from the database after a cancellation or delete."""
+        if self.built_at is None:
+            return
+        key = (int(hotel_id), int(room_id))
+        exists = session.execute(
+            text("SELECT 1 FROM Room WHERE HotelID = :hid AND RoomID = :rid"),
+            {'hid': key[0], 'rid': key[1]}
+        ).fetchone()
+
+        mask = 0
+        if exists:
+            rows = session.execute(_ROOM_OCCUPANCY_QUERY, {
+                'start': self.origin, 'end': self.horizon_end, 'hid': key[0], 'rid': key[1]
+            })
+            for row in rows:
+                mask |= self._span(self.origin, row.checkindate, row.checkoutdate)
+
+        with self._lock:
+            if exists:
+                self.masks[key] = mask
+            else:
+                self.masks.pop(key, None)
+
+    def free_room_keys(self, checkin, checkout):
+        """Return ``(hotel_ids, room_ids)`` of rooms free for the whole stay."""
+        wanted = self._span(self.origin, checkin, checkout)
+        hotel_ids, room_ids = [], []
+        with self._lock:
+            for (hotel_id, room_id), mask in self.masks.items():
+                if not mask & wanted:
+                    hotel_ids.append(hotel_id)
+                    room_ids.append(room_id)
+        return hotel_ids, room_ids
+
+    def earliest_free_starts(self, window_start, window_end, nights, extra=None):
+        """Earliest start of a free ``nights``-night stay inside the window, per room.
+
+        ``extra`` rows (hotelid, roomid, checkindate, checkoutdate) count as
+        occupied for this call only. Returns ``{(hotel_id, room_id): start_date}``
+        for rooms that have one.
+        """
+        window = self._span(self.origin, window_start, window_end)
+        busy = {}
+        for row in extra or ():
+            key = (row[0], row[1])
+            busy[key] = busy.get(key, 0) | self._span(self.origin, as_date(row[2]), as_date(row[3]))
+        starts = {}
+        with self._lock:
+            for key, mask in self.masks.items():
+                runs = ~(mask | busy.get(key, 0)) & window
+                # After doubling, bit i is set when nights [i, i + length) are all free.
+                length = 1
+                while runs and length * 2 <= nights:
+                    runs &= runs >> length
+                    length *= 2
+                if runs and length < nights:
+                    runs &= runs >> (nights - length)
+                if runs:
+                    first = (runs & -runs).bit_length() - 1
+                    starts[key] = self.origin + timedelta(days=first)
+        return starts
+
+
+def as_date(value):
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+_OCCUPANCY_COLUMNS = "HotelID, RoomID, CheckInDate, CheckOutDate"
+
+_HORIZON = "daterange(CAST(:start AS DATE), CAST(:end AS DATE), '[)')"
+
+_OCCUPANCY_QUERY = text(f"""
+    SELECT {_OCCUPANCY_COLUMNS} FROM Booking
+    WHERE Status IN ('Pending', 'Checked-in') AND StayPeriod && {_HORIZON}
+    UNION ALL
+    SELECT {_OCCUPANCY_COLUMNS} FROM Rental
+    WHERE StayPeriod && {_HORIZON}
+""")
+
+_ROOM_OCCUPANCY_QUERY = text(f"""
+    SELECT {_OCCUPANCY_COLUMNS} FROM Booking
+    WHERE HotelID = :hid AND RoomID = :rid
+      AND Status IN ('Pending', 'Checked-in') AND StayPeriod && {_HORIZON}
+    UNION ALL
+    SELECT {_OCCUPANCY_COLUMNS} FROM Rental
+    WHERE HotelID = :hid AND RoomID = :rid
+      AND StayPeriod && {_HORIZON}
+""")
+
+# The SQL path the index replaces; kept for consistency checks and benchmarks.
+SQL_FREE_ROOMS_QUERY = text("""
+    SELECT r.HotelID, r.RoomID
+    FROM Room r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM Booking b
+        WHERE b.HotelID = r.HotelID AND b.RoomID = r.RoomID
+          AND b.Status IN ('Pending', 'Checked-in')
+          AND b.StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+    ) AND NOT EXISTS (
+        SELECT 1 FROM Rental rt
+        WHERE rt.HotelID = r.HotelID AND rt.RoomID = r.RoomID
+          AND rt.StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+    )
+""")
+
+
+def check_consistency(index, session, checkin, checkout):
+    """Compare the index with the SQL path for one stay.
+
+    Returns ``(only_sql, only_index)``: rooms the SQL path reports free that
+    the index hides, and rooms the index reports free that SQL rejects.
+    """
+    rows = session.execute(SQL_FREE_ROOMS_QUERY, {'checkin': checkin, 'checkout': checkout})
+    sql_free = {(row.hotelid, row.roomid) for row in rows}
+    index_free = set(zip(*index.free_room_keys(checkin, checkout)))
+    return sql_free - index_free, index_free - sql_free
+
+
+availability_index = AvailabilityIndex()
@@ -0,0 +1,149 @@
+"""Compare the SQL overlap path with the in-memory availability index.
+
+Run from the backend directory against a local database:
+
+    python -m benchmarks.availability_bench --hotels 1000 --rooms-per-hotel 100
+
+The dataset is generated in a throwaway schema, so the real tables are left alone.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app import create_app, db
+from availability import AvailabilityIndex, SQL_FREE_ROOMS_QUERY
+
+SCHEMA = "bench_availability"
+TABLES = ["HotelChain", "Hotel", "Room", "RoomAmenities", "RoomProblems", "Booking", "Rental"]
+
+SQL_SEARCH = text(f"""
+    SELECT r.*, h.HotelName, h.Address, hc.ChainName
+    FROM ({SQL_FREE_ROOMS_QUERY.text}) free
+    JOIN Room r ON r.HotelID = free.HotelID AND r.RoomID = free.RoomID
+    JOIN Hotel h ON r.HotelID = h.HotelID
+    JOIN HotelChain hc ON h.HotelChainID = hc.HotelChainID
+""")
+
+INDEX_SEARCH = text("""
+    SELECT r.*, h.HotelName, h.Address, hc.ChainName
+    FROM unnest(CAST(:free_hids AS INTEGER[]), CAST(:free_rids AS INTEGER[])) AS free(HotelID, RoomID)
+    JOIN Room r ON r.HotelID = free.HotelID AND r.RoomID = free.RoomID
+    JOIN Hotel h ON r.HotelID = h.HotelID
+    JOIN HotelChain hc ON h.HotelChainID = hc.HotelChainID
+""")
+
+
+def generate(conn, hotels, rooms_per_hotel):
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    for table in TABLES:
+        conn.execute(text(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING INDEXES INCLUDING GENERATED)"))
+    conn.execute(text(f"SET search_path TO {SCHEMA}"))
+
+    conn.execute(text("""
+        INSERT INTO HotelChain (HotelChainID, ChainName, CentralOfficeAddress, Num_Hotels)
+        SELECT g, 'Chain ' || g, g || ' Head Office Road', 1 FROM generate_series(1, 5) g
+    """))
+    conn.execute(text("""
+        INSERT INTO Hotel (HotelID, HotelChainID, HotelName, Rating, Address, Category, Num_Rooms)
+        SELECT g, 1 + g % 5, 'Hotel ' || g, 3 + g % 3,
+               g || ' Main Street, City ' || (g % 50) || ', ST',
+               (ARRAY['Luxury', 'Resort', 'Boutique'])[1 + g % 3], :rooms
+        FROM generate_series(1, :hotels) g
+    """), {'hotels': hotels, 'rooms': rooms_per_hotel})
+    conn.execute(text("""
+        INSERT INTO Room (RoomID, HotelID, Price, Capacity, ViewType, Extendable, Status)
+        SELECT r, h, 80 + (r % 40) * 5,
+               (ARRAY['single', 'double', 'triple', 'family', 'suite'])[1 + r % 5],
+               (ARRAY['sea_view', 'mountain_view', 'both', 'none'])[1 + (h + r) % 4],
+               r % 5 <> 0, 'Available'
+        FROM generate_series(1, :hotels) h, generate_series(1, :rooms) r
+    """), {'hotels': hotels, 'rooms': rooms_per_hotel})
+
+    # Three bookings per room spread over the year, plus rentals on a tenth of the rooms.
+    conn.execute(text("""
+        INSERT INTO Booking (BookingID, CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+        SELECT row_number() OVER (), 1, r.HotelID, r.RoomID, CURRENT_DATE,
+               CURRENT_DATE + s.start, CURRENT_DATE + s.start + s.nights,
+               CASE WHEN random() < 0.1 THEN 'Cancelled' ELSE 'Pending' END
+        FROM Room r
+        CROSS JOIN LATERAL (
+            SELECT k * 120 + (random() * 100)::int AS start, 1 + (random() * 6)::int AS nights
+            FROM generate_series(0, 2) k
+            WHERE r.RoomID IS NOT NULL
+        ) s
+    """))
+    conn.execute(text("""
+        INSERT INTO Rental (RentalID, CustomerID, HotelID, RoomID, EmployeeID, CheckInDate, CheckOutDate,
+                            Status, PaymentAmount, PaymentDate, PaymentMethod)
+        SELECT row_number() OVER (), 1, HotelID, RoomID, 1, CURRENT_DATE + 100, CURRENT_DATE + 104,
+               'Ongoing', 0, CURRENT_DATE, 'Pending'
+        FROM Room
+        WHERE RoomID % 10 = 0
+    """))
+    conn.execute(text("ANALYZE"))
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=1000)
+    parser.add_argument("--rooms-per-hotel", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Keep the generated schema afterwards.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context(), db.engine.connect() as conn:
+        print(f"Generating {args.hotels * args.rooms_per_hotel} rooms in schema {SCHEMA}...")
+        generate(conn, args.hotels, args.rooms_per_hotel)
+
+        index = AvailabilityIndex()
+        start = time.perf_counter()
+        index.build(conn)
+        print(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms for {len(index.masks)} rooms")
+
+        stays = []
+        for _ in range(args.runs):
+            checkin = date.today() + timedelta(days=random.randint(0, 300))
+            stays.append((checkin, checkin + timedelta(days=random.randint(1, 7))))
+
+        def sql_path():
+            checkin, checkout = random.choice(stays)
+            conn.execute(SQL_SEARCH, {'checkin': checkin, 'checkout': checkout}).fetchall()
+
+        def index_path():
+            checkin, checkout = random.choice(stays)
+            hids, rids = index.free_room_keys(checkin, checkout)
+            conn.execute(INDEX_SEARCH, {'free_hids': hids, 'free_rids': rids}).fetchall()
+
+        for name, fn in (("SQL overlap path", sql_path), ("Availability index", index_path)):
+            median, worst = timed(fn, args.runs)
+            print(f"{name:<20} median {median:8.1f} ms   max {worst:8.1f} ms")
+
+        mismatched = 0
+        for checkin, checkout in stays:
+            rows = conn.execute(SQL_FREE_ROOMS_QUERY, {'checkin': checkin, 'checkout': checkout})
+            if {(row.hotelid, row.roomid) for row in rows} != set(zip(*index.free_room_keys(checkin, checkout))):
+                mismatched += 1
+        print(f"Consistency: {len(stays) - mismatched}/{len(stays)} stays agree")
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""pgbench-style per-insert cost of the Booking BEFORE INSERT triggers, before and after.
+
+Run from the backend directory against a local database:
+
+    python -m benchmarks.booking_insert_bench --transactions 2000
+
+"before" swaps the three legacy validation triggers (and the AFTER INSERT room
+status update) back in; "after" is trg_validate_booking as installed by
+triggers.sql. Each insert runs in its own savepoint that is rolled back, and
+the whole run, trigger swap included, happens in one transaction that is
+rolled back at the end. The DDL locks Booking while it runs, so point this at
+a development database.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app import create_app, db
+from benchmarks.seeding import seed_customers
+
+# The triggers validate_booking replaced, as they were before the merge.
+LEGACY_TRIGGERS = """
+DROP TRIGGER IF EXISTS trg_validate_booking ON Booking;
+
+CREATE OR REPLACE FUNCTION prevent_problematic_booking() RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM RoomProblems
+        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID AND Resolved = FALSE
+    ) THEN
+        RAISE EXCEPTION '⛔ Cannot book room with unresolved problems.';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_prevent_problematic_booking
+BEFORE INSERT ON Booking FOR EACH ROW EXECUTE FUNCTION prevent_problematic_booking();
+
+CREATE OR REPLACE FUNCTION limit_active_bookings() RETURNS TRIGGER AS $$
+DECLARE
+    active_bookings_count INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO active_bookings_count
+    FROM Booking
+    WHERE CustomerID = NEW.CustomerID AND Status IN ('Pending', 'Checked-in');
+
+    IF active_bookings_count >= 5 THEN
+        RAISE EXCEPTION '❌ Customer already has 5 or more active bookings.';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_limit_active_bookings
+BEFORE INSERT ON Booking FOR EACH ROW EXECUTE FUNCTION limit_active_bookings();
+
+CREATE OR REPLACE FUNCTION prevent_overlapping_booking() RETURNS TRIGGER AS $$
+DECLARE
+    new_stay DATERANGE := daterange(NEW.CheckInDate, NEW.CheckOutDate, '[)');
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM Booking
+        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID
+          AND Status IN ('Pending', 'Checked-in') AND StayPeriod && new_stay
+    ) OR EXISTS (
+        SELECT 1 FROM Rental
+        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID AND StayPeriod && new_stay
+    ) THEN
+        RAISE EXCEPTION '⛔ Cannot book: Room already booked or rented for selected dates.';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_prevent_overlapping_booking
+BEFORE INSERT ON Booking FOR EACH ROW EXECUTE FUNCTION prevent_overlapping_booking();
+
+DROP TRIGGER trg_update_room_status_booking ON Booking;
+CREATE TRIGGER trg_update_room_status_booking
+AFTER INSERT OR UPDATE ON Booking FOR EACH ROW EXECUTE FUNCTION update_room_status_booking();
+"""
+
+# Stays start this far out so they never meet real data.
+SEED_OFFSET = 800
+
+
+def run(conn, rooms, customer_id, transactions):
+    latencies = []
+    rejected = 0
+    for _ in range(transactions):
+        room = random.choice(rooms)
+        checkin = date.today() + timedelta(days=SEED_OFFSET + random.randint(0, 365))
+        savepoint = conn.begin_nested()
+        start = time.perf_counter()
+        try:
+            conn.execute(text("""
+                INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+                VALUES (:cid, :hid, :rid, CURRENT_DATE, :checkin, :checkout, 'Pending')
+            """), {'cid': customer_id, 'hid': room.hotelid, 'rid': room.roomid,
+                   'checkin': checkin, 'checkout': checkin + timedelta(days=2)})
+        except DBAPIError:
+            rejected += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+        savepoint.rollback()
+    return latencies, rejected
+
+
+def report(label, latencies, rejected):
+    total_s = sum(latencies) / 1000
+    print(f"{label}:")
+    print(f"  number of transactions actually processed: {len(latencies)} ({rejected} rejected by triggers)")
+    print(f"  latency average = {statistics.mean(latencies):.3f} ms")
+    print(f"  latency stddev = {statistics.pstdev(latencies):.3f} ms")
+    print(f"  latency p95 = {statistics.quantiles(latencies, n=20)[-1]:.3f} ms")
+    print(f"  tps = {len(latencies) / total_s:.1f} (single client, savepoint per insert)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=2000, help="Inserts per variant.")
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context(), db.engine.connect() as conn:
+        rooms = conn.execute(text("SELECT HotelID, RoomID FROM Room")).fetchall()
+        customer_id = seed_customers(conn, 1, 'PGB')[0]
+
+        # "after" first while the installed triggers are in place, then swap.
+        run(conn, rooms, customer_id, args.warmup)
+        after = run(conn, rooms, customer_id, args.transactions)
+
+        conn.execute(text(LEGACY_TRIGGERS))
+        run(conn, rooms, customer_id, args.warmup)
+        before = run(conn, rooms, customer_id, args.transactions)
+
+        report("before (three BEFORE INSERT triggers + AFTER INSERT room status)", *before)
+        report("after (trg_validate_booking)", *after)
+        print(f"per-insert saving: {statistics.mean(before[0]) - statistics.mean(after[0]):.3f} ms")
+
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Compare book_room's direct path with queued mode under a burst of customers.
+
+Run from the backend directory against a loaded database:
+
+    python -m benchmarks.booking_queue_load --clients 200 --workers 4
+
+Each mode releases --clients customers at once, each booking a random short
+stay on one of --rooms rooms. Clients share a connection pool sized like the
+app's (--pool-size plus --max-overflow), as requests in one web process do.
+"direct" books inline through room_writes, as book_room does by default.
+"queued" enqueues, then waits up to --deadline seconds for the result,
+releasing its pooled connection between polls, while --workers workers drain
+the queue on connections of their own.
+
+For each mode the script reports p50/p99 response time, how many clients got
+a ticket instead of a result or could not get a connection at all, and the
+peak number of server connections the run had open (sampled from
+pg_stat_activity).
+
+Rows are committed for real and deleted again at the end (archive trigger
+disabled, so nothing is archived).
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeout
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app import create_app, db
+from benchmarks.seeding import seed_customers
+from booking_queue import BookingQueue
+from holds import HoldUnavailable, room_holds
+from room_locks import room_writes
+
+APP_NAME = 'booking-queue-load'
+
+# Bench stays start this far out so they never meet real data.
+SEED_OFFSET = 900
+
+
+def book_direct(session, customer_id, room, checkin, checkout, queue, args):
+    def book():
+        room_holds.check_room(session, customer_id, room.hotelid, room.roomid, checkin, checkout)
+        room_writes.lock_room(session, room.hotelid, room.roomid)
+        session.execute(text("""
+            INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+            VALUES (:cid, :hid, :rid, CURRENT_DATE, :checkin, :checkout, 'Pending')
+        """), {'cid': customer_id, 'hid': room.hotelid, 'rid': room.roomid, 'checkin': checkin, 'checkout': checkout})
+
+    try:
+        room_writes.run(session, book)
+        return 'booked'
+    except (HoldUnavailable, DBAPIError):
+        return 'rejected'
+
+
+def book_queued(session, customer_id, room, checkin, checkout, queue, args):
+    request_id = queue.enqueue(session, customer_id, room.hotelid, room.roomid, checkin, checkout)
+    booking_request = queue.wait(session, request_id, args.deadline)
+    return {'Booked': 'booked', 'Failed': 'rejected'}.get(booking_request.status, 'ticket')
+
+
+def peak_connections(url, stop):
+    """Sample pg_stat_activity until ``stop`` is set; returns the highest count seen."""
+    peak = 0
+    engine = create_engine(url, poolclass=NullPool)
+    with engine.connect() as conn:
+        while not stop.is_set():
+            count = conn.execute(text("SELECT COUNT(*) FROM pg_stat_activity WHERE application_name = :app"),
+                                 {'app': APP_NAME}).scalar()
+            conn.rollback()
+            peak = max(peak, count)
+            time.sleep(0.005)
+    return peak
+
+
+def run_mode(url, attempt, args, rooms, customers):
+    pool_engine = create_engine(url, pool_size=args.pool_size, max_overflow=args.max_overflow,
+                                pool_timeout=args.pool_timeout, connect_args={'application_name': APP_NAME})
+    worker_engine = create_engine(url, poolclass=NullPool, connect_args={'application_name': APP_NAME})
+    queue = BookingQueue(enabled=True, workers=0, batch_size=args.batch_size, poll_interval=args.poll_interval)
+    if attempt is book_queued:
+        queue.start(worker_engine, args.workers)
+
+    stop = threading.Event()
+    peak = []
+    monitor = threading.Thread(target=lambda: peak.append(peak_connections(url, stop)))
+    monitor.start()
+
+    barrier = threading.Barrier(len(customers))
+    results = [None] * len(customers)
+
+    def client(n):
+        rng = random.Random(n)
+        room = rng.choice(rooms)
+        checkin = date.today() + timedelta(days=SEED_OFFSET + rng.randint(0, args.days))
+        checkout = checkin + timedelta(days=rng.randint(1, 3))
+        session = Session(bind=pool_engine)
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            outcome = attempt(session, customers[n], room, checkin, checkout, queue, args)
+        except PoolTimeout:
+            outcome = 'no connection'
+        finally:
+            session.close()
+        results[n] = (outcome, (time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(len(customers))]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # Let the workers finish what the clients stopped waiting for.
+    drain_start = time.perf_counter()
+    with pool_engine.connect() as conn:
+        while conn.execute(text("SELECT COUNT(*) FROM BookingRequest WHERE Status = 'Queued' AND CustomerID = ANY(:ids)"),
+                           {'ids': customers}).scalar():
+            conn.rollback()
+            time.sleep(args.poll_interval)
+    drain = time.perf_counter() - drain_start
+
+    queue.stop()
+    stop.set()
+    monitor.join()
+    pool_engine.dispose()
+    return results, elapsed, drain, peak[0]
+
+
+def report(mode, results, elapsed, drain, peak):
+    counts = {}
+    for outcome, _ in results:
+        counts[outcome] = counts.get(outcome, 0) + 1
+    latencies = [ms for _, ms in results]
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"{mode}:")
+    print(f"  outcomes: {', '.join(f'{count} {outcome}' for outcome, count in sorted(counts.items()))}")
+    print(f"  response p50 = {percentiles[49]:.1f} ms   p99 = {percentiles[98]:.1f} ms   max = {max(latencies):.1f} ms")
+    print(f"  burst finished in {elapsed:.2f} s, queue drained {drain:.2f} s later")
+    print(f"  peak server connections: {peak}")
+
+
+def cleanup(conn, customers, rooms):
+    conn.execute(text("ALTER TABLE Booking DISABLE TRIGGER trg_archive_booking"))
+    conn.execute(text("DELETE FROM Booking WHERE CustomerID = ANY(:ids)"), {'ids': customers})
+    conn.execute(text("ALTER TABLE Booking ENABLE TRIGGER trg_archive_booking"))
+    conn.execute(text("DELETE FROM BookingRequest WHERE CustomerID = ANY(:ids)"), {'ids': customers})
+    for room in rooms:
+        conn.execute(text("UPDATE Room SET Status = :status WHERE HotelID = :hid AND RoomID = :rid"),
+                     {'status': room.status, 'hid': room.hotelid, 'rid': room.roomid})
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200, help="Customers booking at the same moment.")
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--days", type=int, default=60, help="Spread of check-in dates.")
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    parser.add_argument("--pool-timeout", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--deadline", type=float, default=2.0, help="Seconds a queued client waits before taking a ticket.")
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        url = db.engine.url
+        setup = create_engine(url, poolclass=NullPool)
+        with setup.connect() as conn:
+            rooms = conn.execute(text("""
+                SELECT r.HotelID, r.RoomID, r.Status FROM Room r
+                WHERE NOT EXISTS (SELECT 1 FROM RoomProblems p
+                                  WHERE p.HotelID = r.HotelID AND p.RoomID = r.RoomID AND p.Resolved = FALSE)
+                ORDER BY r.HotelID, r.RoomID
+                LIMIT :rooms
+            """), {'rooms': args.rooms}).fetchall()
+            # A fresh customer per client and mode keeps the 5-active-bookings limit out of the picture.
+            customers = seed_customers(conn, 2 * args.clients, 'LOAD', 'Load Customer')
+            conn.commit()
+
+        try:
+            for n, (mode, attempt) in enumerate((("direct", book_direct), ("queued", book_queued))):
+                crowd = customers[n * args.clients:(n + 1) * args.clients]
+                report(mode, *run_mode(url, attempt, args, rooms, crowd))
+                with setup.connect() as conn:
+                    cleanup(conn, crowd, rooms)
+        finally:
+            with setup.connect() as conn:
+                cleanup(conn, customers, rooms)
+                conn.execute(text("DELETE FROM Customer WHERE CustomerID = ANY(:ids)"), {'ids': customers})
+                conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Hammer a few rooms with concurrent bookings and rentals under each concurrency mode.
+
+Run from the backend directory against a local database:
+
+    python -m benchmarks.booking_race_stress --threads 16 --ops 50 --rooms 3
+
+Every thread books or rents random short stays on the same handful of rooms,
+going through room_writes exactly like book_room and rent_room do. For each of
+the "none", "advisory" and "serializable" modes the script reports throughput,
+rejected attempts, serialization retries and double bookings, i.e. pairs of
+active bookings/rentals that overlap on the same room.
+
+Rows are committed for real and deleted again (archive triggers disabled, so
+nothing is archived) before the next mode and at the end.
+"""
+import argparse
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool
+
+from app import create_app, db
+from benchmarks.seeding import seed_customers
+from room_locks import room_writes
+
+# Bench stays start this far out so they never meet real data.
+SEED_OFFSET = 700
+
+DOUBLE_BOOKINGS = text("""
+    WITH stays AS (
+        SELECT 'B' || BookingID AS StayID, HotelID, RoomID, StayPeriod FROM Booking
+        WHERE CustomerID = ANY(:ids) AND Status IN ('Pending', 'Checked-in')
+        UNION ALL
+        SELECT 'R' || RentalID, HotelID, RoomID, StayPeriod FROM Rental
+        WHERE CustomerID = ANY(:ids)
+    )
+    SELECT COUNT(*)
+    FROM stays a
+    JOIN stays b ON a.HotelID = b.HotelID AND a.RoomID = b.RoomID
+     AND a.StayID < b.StayID AND a.StayPeriod && b.StayPeriod
+""")
+
+
+def book(conn, customer_id, room, checkin, checkout, employee_id):
+    room_writes.lock_room(conn, room.hotelid, room.roomid)
+    conn.execute(text("""
+        INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+        VALUES (:cid, :hid, :rid, CURRENT_DATE, :checkin, :checkout, 'Pending')
+    """), {'cid': customer_id, 'hid': room.hotelid, 'rid': room.roomid, 'checkin': checkin, 'checkout': checkout})
+
+
+def rent(conn, customer_id, room, checkin, checkout, employee_id):
+    room_writes.lock_room(conn, room.hotelid, room.roomid)
+    conn.execute(text("""
+        INSERT INTO Rental (CustomerID, HotelID, RoomID, EmployeeID, CheckInDate, CheckOutDate, Status,
+                            PaymentAmount, PaymentDate, PaymentMethod)
+        VALUES (:cid, :hid, :rid, :eid, :checkin, :checkout, 'Completed', 0, CURRENT_DATE, 'Cash')
+    """), {'cid': customer_id, 'hid': room.hotelid, 'rid': room.roomid, 'eid': employee_id,
+           'checkin': checkin, 'checkout': checkout})
+
+
+def cleanup(conn, customers, rooms=()):
+    for table in ("Booking", "Rental"):
+        conn.execute(text(f"ALTER TABLE {table} DISABLE TRIGGER trg_archive_{table.lower()}"))
+        conn.execute(text(f"DELETE FROM {table} WHERE CustomerID = ANY(:ids)"), {'ids': customers})
+        conn.execute(text(f"ALTER TABLE {table} ENABLE TRIGGER trg_archive_{table.lower()}"))
+    for room in rooms:
+        conn.execute(text("UPDATE Room SET Status = :status WHERE HotelID = :hid AND RoomID = :rid"),
+                     {'status': room.status, 'hid': room.hotelid, 'rid': room.roomid})
+    conn.commit()
+
+
+def run_mode(engine, args, rooms, customers, employee_id):
+    counts = {'ok': 0, 'rejected': 0}
+    counts_lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def worker(n):
+        rng = random.Random(n)
+        with engine.connect() as conn:
+            barrier.wait()
+            for op in range(args.ops):
+                room = rng.choice(rooms)
+                checkin = date.today() + timedelta(days=SEED_OFFSET + rng.randint(0, args.days))
+                checkout = checkin + timedelta(days=rng.randint(1, 3))
+                action = book if rng.random() < 0.7 else rent
+                customer_id = customers[n * args.ops + op]
+                try:
+                    room_writes.run(conn, lambda: action(conn, customer_id, room, checkin, checkout, employee_id))
+                    outcome = 'ok'
+                except DBAPIError:
+                    outcome = 'rejected'
+                with counts_lock:
+                    counts[outcome] += 1
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=50, help="Attempts per thread.")
+    parser.add_argument("--rooms", type=int, default=3, help="Rooms everyone fights over.")
+    parser.add_argument("--days", type=int, default=30, help="Spread of check-in dates.")
+    parser.add_argument("--modes", default="none,advisory,serializable")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        # One connection per thread; the app's pool is smaller than the crowd.
+        engine = create_engine(db.engine.url, poolclass=NullPool)
+        with engine.connect() as conn:
+            rooms = conn.execute(text("""
+                SELECT r.HotelID, r.RoomID, r.Status FROM Room r
+                WHERE NOT EXISTS (SELECT 1 FROM RoomProblems p
+                                  WHERE p.HotelID = r.HotelID AND p.RoomID = r.RoomID AND p.Resolved = FALSE)
+                ORDER BY r.HotelID, r.RoomID
+                LIMIT :rooms
+            """), {'rooms': args.rooms}).fetchall()
+            employee_id = conn.execute(text("SELECT MIN(EmployeeID) FROM Employee")).scalar()
+            # A fresh customer per attempt keeps the 5-active-bookings limit out of the picture.
+            customers = seed_customers(conn, args.threads * args.ops, 'RACE', 'Race Customer')
+            conn.commit()
+
+        original_mode = room_writes.mode
+        try:
+            for mode in args.modes.split(","):
+                room_writes.mode = mode
+                retries_before = room_writes.retries
+                counts, elapsed = run_mode(engine, args, rooms, customers, employee_id)
+                with engine.connect() as conn:
+                    doubles = conn.execute(DOUBLE_BOOKINGS, {'ids': customers}).scalar()
+                    cleanup(conn, customers)
+                print(f"{mode:<13} {counts['ok'] + counts['rejected']:6} attempts   "
+                      f"{(counts['ok'] + counts['rejected']) / elapsed:7.0f} ops/s   "
+                      f"{counts['ok']:5} ok   {counts['rejected']:5} rejected   "
+                      f"{room_writes.retries - retries_before:5} retries   {doubles:3} double bookings")
+        finally:
+            room_writes.mode = original_mode
+            with engine.connect() as conn:
+                cleanup(conn, customers, rooms)
+                conn.execute(text("DELETE FROM Customer WHERE CustomerID = ANY(:ids)"), {'ids': customers})
+                conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compare bulk booking throughput with the one-room-per-request path.
+
+Run from the backend directory against a loaded database:
+
+    python -m benchmarks.bulk_booking_bench --rooms 20 --rounds 20
+
+The single path mirrors book_room: one INSERT per room in its own transaction,
+then a second query for the hotel name. The bulk path books the same rooms with
+bulk_book. Each transaction is a savepoint inside one outer transaction that is
+rolled back at the end, so commit flushes are not counted and the gap is, if
+anything, understated.
+"""
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app import create_app, db
+from benchmarks.seeding import seed_customers
+from bookings import bulk_book
+
+# Bench stays start this far out so they never meet real data.
+SEED_OFFSET = 500
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=20, help="Rooms per group booking.")
+    parser.add_argument("--rounds", type=int, default=20, help="Group bookings per path.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context(), db.engine.connect() as conn:
+        rooms = conn.execute(text("""
+            SELECT r.HotelID, r.RoomID FROM Room r
+            WHERE NOT EXISTS (SELECT 1 FROM RoomProblems p
+                              WHERE p.HotelID = r.HotelID AND p.RoomID = r.RoomID AND p.Resolved = FALSE)
+            ORDER BY r.HotelID, r.RoomID
+            LIMIT :rooms
+        """), {'rooms': args.rooms}).fetchall()
+        customers = seed_customers(conn, 2 * args.rounds * len(rooms), 'BULK')
+
+        def group(round_no, path):
+            # Every round books the same rooms for a new week, with fresh customers.
+            checkin = date.today() + timedelta(days=SEED_OFFSET + 7 * (2 * round_no + path))
+            first = (2 * round_no + path) * len(rooms)
+            return [{'customer_id': customers[first + n], 'hotel_id': room.hotelid, 'room_id': room.roomid,
+                     'checkin': checkin, 'checkout': checkin + timedelta(days=2)}
+                    for n, room in enumerate(rooms)]
+
+        def single_path(items):
+            for item in items:
+                savepoint = conn.begin_nested()
+                conn.execute(text("""
+                    INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+                    VALUES (:cid, :hid, :rid, CURRENT_DATE, :checkin, :checkout, 'Pending')
+                """), {'cid': item['customer_id'], 'hid': item['hotel_id'], 'rid': item['room_id'],
+                       'checkin': item['checkin'], 'checkout': item['checkout']})
+                savepoint.commit()
+                conn.execute(text("SELECT HotelName FROM Hotel WHERE HotelID = :hid"), {'hid': item['hotel_id']}).fetchone()
+            return len(items)
+
+        def bulk_path(items):
+            results = bulk_book(conn, items)
+            return sum('booking_id' in result for result in results)
+
+        for name, path, fn in (("One room per request", 0, single_path), ("Bulk booking", 1, bulk_path)):
+            samples, booked = [], 0
+            for round_no in range(args.rounds):
+                items = group(round_no, path)
+                start = time.perf_counter()
+                booked += fn(items)
+                samples.append((time.perf_counter() - start) * 1000)
+            total_s = sum(samples) / 1000
+            print(f"{name:<22} median {statistics.median(samples):8.1f} ms/group   "
+                  f"{booked / total_s:8.0f} bookings/s   ({booked} booked)")
+
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
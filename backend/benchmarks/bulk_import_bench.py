@@ -0,0 +1,99 @@
+"""Time a CSV bulk import of rooms, amenities and customers.
+
+Run from the backend directory against a loaded database:
+
+    python -m benchmarks.bulk_import_bench --rooms 400000 --amenities 400000 --customers 200000
+
+The script creates a hotel, builds the three CSV files in memory (one row in
+every --bad-every of each file breaks a rule), and imports them as
+flask import-csv does, as a dry run. It reports the time per file and checks
+that exactly the broken rows were rejected. It exits non-zero if the import
+takes longer than --budget-s or rejects the wrong rows.
+
+The dry run rolls everything back, the hotel included.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import date
+
+from sqlalchemy import text
+
+from app import create_app, db
+from bulk_import import bulk_import
+
+
+def build_files(args):
+    """CSV files as binary streams, and how many rows of each are broken."""
+    rooms, amenities, customers = io.StringIO(), io.StringIO(), io.StringIO()
+    rooms.write("hotel_id,room_id,price,capacity,view_type,extendable,status\n")
+    amenities.write("hotel_id,room_id,amenity\n")
+    customers.write("full_name,address,id_type,id_number,registration_date\n")
+    today = date.today().isoformat()
+    capacities = ['single', 'double', 'triple', 'family', 'suite']
+
+    for i in range(args.rooms):
+        price = "-5" if i % args.bad_every == 0 else f"{80 + i % 400}.50"
+        rooms.write(f"{{hotel}},{i + 1},{price},{capacities[i % 5]},none,{'true' if i % 2 else 'false'},Available\n")
+    for i in range(args.amenities):
+        # Amenities of broken rooms are rejected as well: their room never gets imported.
+        room = i % args.rooms
+        room_id = 0 if i % args.bad_every == 0 else room + 1
+        amenities.write(f"{{hotel}},{room_id},Amenity {i // args.rooms}\n")
+    for i in range(args.customers):
+        id_type = "Library Card" if i % args.bad_every == 0 else "Passport"
+        customers.write(f"Import Customer {i},\"{i} Import Street, Importville\",{id_type},IMP-{os.getpid()}-{i},{today}\n")
+
+    bad = {
+        'rooms': len(range(0, args.rooms, args.bad_every)),
+        'amenities': sum(1 for i in range(args.amenities)
+                         if i % args.bad_every == 0 or (i % args.rooms) % args.bad_every == 0),
+        'customers': len(range(0, args.customers, args.bad_every)),
+    }
+    return {'rooms': rooms, 'amenities': amenities, 'customers': customers}, bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=400000)
+    parser.add_argument("--amenities", type=int, default=400000)
+    parser.add_argument("--customers", type=int, default=200000)
+    parser.add_argument("--bad-every", type=int, default=1000, help="One row in this many breaks a rule.")
+    parser.add_argument("--budget-s", type=float, default=30, help="Longest the whole import may take.")
+    args = parser.parse_args()
+
+    files, bad = build_files(args)
+    app = create_app()
+    with app.app_context():
+        hotel_id = db.session.execute(text("""
+            INSERT INTO Hotel (HotelChainID, HotelName, Rating, Address, Category, Num_Rooms)
+            SELECT MIN(HotelChainID), 'Import Bench Hotel', 3, '1 Bench Street, Benchville', 'Boutique', :rooms
+            FROM HotelChain
+            RETURNING HotelID
+        """), {'rooms': args.rooms}).scalar()
+        streams = {kind: io.BytesIO(f.getvalue().replace("{hotel}", str(hotel_id)).encode())
+                   for kind, f in files.items()}
+
+        start = time.perf_counter()
+        results = bulk_import.run(db.session, streams, dry_run=True)
+        elapsed = time.perf_counter() - start
+
+    failed = False
+    for kind, result in results.items():
+        print(f"{kind:<10}{result.read:9} rows  {result.merged:9} imported  {result.rejected:7} rejected  "
+              f"{result.seconds:6.1f} s")
+        if result.rejected != bad[kind]:
+            print(f"❌ {kind}: expected {bad[kind]} rejected row(s)")
+            failed = True
+    print(f"Total {sum(result.read for result in results.values())} rows in {elapsed:.1f} s")
+    if elapsed > args.budget_s:
+        print(f"❌ Import took longer than {args.budget_s:.0f} s")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
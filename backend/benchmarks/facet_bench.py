@@ -0,0 +1,63 @@
+"""Measure the latency facet counts add to the first search results page.
+
+Run from the backend directory against a loaded database:
+
+    python -m benchmarks.facet_bench --runs 100
+
+Each stay is searched twice, with and without the GROUPING SETS facet column,
+so both variants see the same data and the same availability path.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app import create_app, db
+from search import build_search_query
+
+FILTERS = [{}, {'capacity': 'double'}, {'category': 'Luxury'}, {'viewtype': 'sea_view'}, {'price': '250'}]
+
+
+def timed(query, params):
+    start = time.perf_counter()
+    db.session.execute(text(query), params).fetchall()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=25)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        plain_ms, faceted_ms = [], []
+        for _ in range(args.runs):
+            checkin = date.today() + timedelta(days=random.randint(0, 300))
+            criteria = {'checkin': checkin, 'checkout': checkin + timedelta(days=random.randint(1, 7)),
+                        'sort': 'price', **random.choice(FILTERS)}
+            plain = build_search_query(db.session, criteria, page_size=args.page_size)
+            faceted = build_search_query(db.session, criteria, page_size=args.page_size, with_facets=True)
+
+            # Alternate the order so neither variant always runs on a warmer cache.
+            if random.random() < 0.5:
+                plain_ms.append(timed(*plain))
+                faceted_ms.append(timed(*faceted))
+            else:
+                faceted_ms.append(timed(*faceted))
+                plain_ms.append(timed(*plain))
+
+        for name, samples in (("Page only", plain_ms), ("Page + facets", faceted_ms)):
+            print(f"{name:<14} median {statistics.median(samples):7.2f} ms   "
+                  f"p95 {statistics.quantiles(samples, n=20)[-1]:7.2f} ms")
+        added = [faceted - plain for plain, faceted in zip(plain_ms, faceted_ms)]
+        print(f"Added latency  median {statistics.median(added):7.2f} ms   "
+              f"p95 {statistics.quantiles(added, n=20)[-1]:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
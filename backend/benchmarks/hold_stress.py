@@ -0,0 +1,136 @@
+"""Race many customers for one room, with and without holds.
+
+Run from the backend directory against a loaded database:
+
+    python -m benchmarks.hold_stress --threads 32 --rounds 10
+
+In each round every thread tries to book the same room for the same stay at
+once. "direct" sends the Booking INSERT straight away, as book_room did before
+holds. "hold" takes a RoomHold first and only the winner inserts. For each
+mode the script counts transactions that reached the INSERT and were aborted
+there, and attempts turned away before it, with the time the losers spent.
+
+The bench commits real rows (the race needs separate transactions). They use
+stays far in the future and are removed again at the end with the archive
+trigger disabled, so nothing is archived.
+"""
+import argparse
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool
+
+from app import create_app, db
+from benchmarks.seeding import seed_customers
+from holds import HoldUnavailable, room_holds
+
+# Bench stays start this far out so they never meet real data.
+SEED_OFFSET = 600
+
+
+def attempt_direct(conn, customer_id, room, checkin, checkout):
+    try:
+        conn.execute(text("""
+            INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+            VALUES (:cid, :hid, :rid, CURRENT_DATE, :checkin, :checkout, 'Pending')
+        """), {'cid': customer_id, 'hid': room.hotelid, 'rid': room.roomid, 'checkin': checkin, 'checkout': checkout})
+        conn.commit()
+        return 'booked'
+    except DBAPIError:
+        conn.rollback()
+        return 'aborted'
+
+
+def attempt_hold(conn, customer_id, room, checkin, checkout):
+    try:
+        hold = room_holds.acquire(conn, customer_id, room.hotelid, room.roomid, checkin, checkout)
+        conn.commit()
+    except HoldUnavailable:
+        conn.rollback()
+        return 'rejected'
+    except DBAPIError:
+        conn.rollback()
+        return 'aborted'
+
+    if not room_holds.claim(conn, hold.holdid, customer_id):
+        conn.rollback()
+        return 'rejected'
+    return attempt_direct(conn, customer_id, room, checkin, checkout)
+
+
+def run_round(engine, attempt, customers, room, checkin):
+    checkout = checkin + timedelta(days=2)
+    barrier = threading.Barrier(len(customers))
+    outcomes = [None] * len(customers)
+
+    def worker(n):
+        with engine.connect() as conn:
+            barrier.wait()
+            start = time.perf_counter()
+            outcome = attempt(conn, customers[n], room, checkin, checkout)
+            outcomes[n] = (outcome, (time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(len(customers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        # One connection per thread; the app's pool is smaller than the crowd.
+        engine = create_engine(db.engine.url, poolclass=NullPool)
+        with engine.connect() as conn:
+            room = conn.execute(text("""
+                SELECT r.HotelID, r.RoomID, r.Status FROM Room r
+                WHERE NOT EXISTS (SELECT 1 FROM RoomProblems p
+                                  WHERE p.HotelID = r.HotelID AND p.RoomID = r.RoomID AND p.Resolved = FALSE)
+                ORDER BY r.HotelID, r.RoomID
+                LIMIT 1
+            """)).fetchone()
+            customers = seed_customers(conn, 2 * args.rounds * args.threads, 'HOLD', 'Stress Customer')
+            conn.commit()
+
+        try:
+            for mode, attempt in (("direct", attempt_direct), ("hold", attempt_hold)):
+                counts = {'booked': 0, 'aborted': 0, 'rejected': 0}
+                loser_ms = []
+                for round_no in range(args.rounds):
+                    # Fresh customers every round keep the 5-active-bookings limit out of the picture.
+                    batch = 2 * round_no + (mode == "hold")
+                    crowd = customers[batch * args.threads:(batch + 1) * args.threads]
+                    checkin = date.today() + timedelta(days=SEED_OFFSET + 7 * batch)
+                    outcomes = run_round(engine, attempt, crowd, room, checkin)
+                    for outcome, elapsed in outcomes:
+                        counts[outcome] += 1
+                        if outcome != 'booked':
+                            loser_ms.append(elapsed)
+                print(f"{mode:<7} booked {counts['booked']:4}   aborted at INSERT {counts['aborted']:5}   "
+                      f"turned away early {counts['rejected']:5}   "
+                      f"loser median {statistics.median(loser_ms) if loser_ms else 0:7.2f} ms")
+        finally:
+            with engine.connect() as conn:
+                conn.execute(text("ALTER TABLE Booking DISABLE TRIGGER trg_archive_booking"))
+                conn.execute(text("DELETE FROM Booking WHERE CustomerID = ANY(:ids)"), {'ids': customers})
+                conn.execute(text("ALTER TABLE Booking ENABLE TRIGGER trg_archive_booking"))
+                conn.execute(text("DELETE FROM RoomHold WHERE CustomerID = ANY(:ids)"), {'ids': customers})
+                conn.execute(text("DELETE FROM Customer WHERE CustomerID = ANY(:ids)"), {'ids': customers})
+                conn.execute(text("UPDATE Room SET Status = :status WHERE HotelID = :hid AND RoomID = :rid"),
+                             {'status': room.status, 'hid': room.hotelid, 'rid': room.roomid})
+                conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Time deleting a hotel whose bookings and rentals cascade into the archive.
+
+Run from the backend directory against a loaded database:
+
+    python -m benchmarks.hotel_delete_bench --bookings 50000 --rentals 10000
+
+The script creates a hotel with --rooms rooms, --bookings bookings and
+--rentals rentals (spread over --customers new customers), then deletes it
+with one DELETE FROM Hotel, as delete_hotel does. It reports how long the
+delete took and checks that every booking and rental reached the archive
+with its customer and hotel names.
+
+Everything happens inside one transaction that is rolled back at the end.
+"""
+import argparse
+import sys
+import time
+
+from sqlalchemy import text
+
+from app import create_app, db
+from benchmarks.seeding import seed_customers
+
+# Seeded stays start this far out so they never meet real data.
+SEED_OFFSET = 1100
+
+
+def seed(conn, args):
+    hotel_id = conn.execute(text("""
+        INSERT INTO Hotel (HotelChainID, HotelName, Rating, Address, Category, Num_Rooms)
+        SELECT MIN(HotelChainID), 'Delete Bench Hotel ' || txid_current(), 3, '1 Bench Street, Benchville', 'Boutique', :rooms
+        FROM HotelChain
+        RETURNING HotelID
+    """), {'rooms': args.rooms}).scalar()
+    conn.execute(text("""
+        INSERT INTO Room (RoomID, HotelID, Price, Capacity, ViewType, Extendable, Status)
+        SELECT g, :hid, 100, 'double', 'none', FALSE, 'Available'
+        FROM generate_series(1, :rooms) g
+    """), {'hid': hotel_id, 'rooms': args.rooms})
+    customers = seed_customers(conn, args.customers, 'DEL', 'Delete Bench Customer')
+
+    # Triggers are bypassed for the bulk load only; each room's stays are 5 days apart and never overlap.
+    conn.execute(text("ALTER TABLE Booking DISABLE TRIGGER USER"))
+    conn.execute(text("ALTER TABLE Rental DISABLE TRIGGER USER"))
+    conn.execute(text("""
+        INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+        SELECT (:customers)[1 + g % cardinality(:customers)], :hid, 1 + g % :rooms, CURRENT_DATE,
+               CURRENT_DATE + :offset + (g / :rooms) * 5, CURRENT_DATE + :offset + (g / :rooms) * 5 + 3, 'Cancelled'
+        FROM generate_series(0, :count - 1) g
+    """), {'customers': customers, 'hid': hotel_id, 'rooms': args.rooms, 'offset': SEED_OFFSET,
+           'count': args.bookings})
+    conn.execute(text("""
+        INSERT INTO Rental (CustomerID, HotelID, RoomID, EmployeeID, CheckInDate, CheckOutDate, Status,
+                            PaymentAmount, PaymentDate, PaymentMethod)
+        SELECT (:customers)[1 + g % cardinality(:customers)], :hid, 1 + g % :rooms, (SELECT MIN(EmployeeID) FROM Employee),
+               CURRENT_DATE - :offset - (g / :rooms) * 5 - 3, CURRENT_DATE - :offset - (g / :rooms) * 5,
+               'Completed', 100, CURRENT_DATE, 'Cash'
+        FROM generate_series(0, :count - 1) g
+    """), {'customers': customers, 'hid': hotel_id, 'rooms': args.rooms, 'offset': SEED_OFFSET,
+           'count': args.rentals})
+    conn.execute(text("ALTER TABLE Booking ENABLE TRIGGER USER"))
+    conn.execute(text("ALTER TABLE Rental ENABLE TRIGGER USER"))
+    conn.execute(text("ANALYZE Booking, Rental"))
+    return hotel_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=50000)
+    parser.add_argument("--rentals", type=int, default=10000)
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--customers", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context(), db.engine.connect() as conn:
+        try:
+            hotel_id = seed(conn, args)
+
+            start = time.perf_counter()
+            conn.execute(text("DELETE FROM Hotel WHERE HotelID = :hid"), {'hid': hotel_id})
+            elapsed = time.perf_counter() - start
+
+            archived = conn.execute(text("""
+                SELECT (SELECT COUNT(*) FROM BookingArchive
+                        WHERE HotelID = :hid AND CustomerName LIKE 'Delete Bench Customer %') AS bookings,
+                       (SELECT COUNT(*) FROM RentalArchive
+                        WHERE HotelID = :hid AND CustomerName LIKE 'Delete Bench Customer %') AS rentals
+            """), {'hid': hotel_id}).fetchone()
+        finally:
+            conn.rollback()
+
+    print(f"DELETE FROM Hotel with {args.bookings} bookings and {args.rentals} rentals: {elapsed:.2f} s")
+    print(f"Archived {archived.bookings} booking(s) and {archived.rentals} rental(s)")
+    if (archived.bookings, archived.rentals) != (args.bookings, args.rentals):
+        print("❌ Some deleted rows did not reach the archive")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Check that every employee list page stays within a query-time budget on a large dataset.
+
+Run from the backend directory against a loaded database:
+
+    python -m benchmarks.list_page_bench --customers 200000 --bookings 500000 --budget-ms 50
+
+The script seeds --customers customers, --bookings bookings and as many
+rentals, and --archived rows in each archive table, then walks the first
+--pages pages of every list page under every sort, as an Admin and as the
+Manager of the busiest hotel, and times the SQL each page runs (its rows and
+its total). Page-number sorts also jump straight to the deepest page. Any
+page over --budget-ms is reported and the script exits non-zero.
+
+Everything happens inside one transaction that is rolled back at the end.
+"""
+import argparse
+import statistics
+import sys
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from flask import request, session, url_for
+from sqlalchemy import event, text
+
+from app import create_app, db
+from pagination import paginator
+
+# Seeded stays start this far out so they never meet real data.
+SEED_OFFSET = 1000
+
+LISTS = {
+    'employee.manage_customers': ['id', 'fullname', 'registered', 'idtype'],
+    'employee.manage_employees': ['id', 'name', 'address', 'position', 'ssn', 'hotel'],
+    'employee.manage_hotels': ['id', 'name', 'address', 'category', 'num_rooms', 'rating'],
+    'employee.manage_rooms': ['roomid_asc', 'roomid_desc', 'price_asc', 'price_desc', 'capacity', 'status', 'viewtype'],
+    'employee.view_bookings': ['checkin_desc', 'checkin_asc', 'bookingdate', 'customer', 'hotel', 'status'],
+    'employee.view_rentals': ['checkin_desc', 'checkin_asc', 'customer', 'hotel', 'status', 'payment', 'payment_asc'],
+    'employee.view_booking_archive': ['archivedate_desc', 'archivedate_asc', 'bookingdate', 'checkin', 'customer', 'hotel'],
+    'employee.view_rental_archive': ['archivedate_desc', 'archivedate_asc', 'checkin', 'customer', 'hotel', 'employee'],
+}
+
+# Lists only an Admin can open.
+ADMIN_ONLY = ('employee.manage_customers', 'employee.manage_hotels')
+
+
+def seed(conn, args):
+    conn.execute(text("ALTER TABLE Booking DISABLE TRIGGER USER"))
+    conn.execute(text("ALTER TABLE Rental DISABLE TRIGGER USER"))
+    conn.execute(text("""
+        INSERT INTO Customer (FullName, Address, IDType, IDNumber, RegistrationDate)
+        SELECT 'List Customer ' || md5(g::text), 'Nowhere', (ARRAY['Passport', 'SIN', 'Driving License'])[1 + g % 3],
+               'LIST-' || txid_current() || '-' || g, CURRENT_DATE - g % 3650
+        FROM generate_series(1, :count) g
+    """), {'count': args.customers})
+    rooms = conn.execute(text("SELECT COUNT(*) FROM Room")).scalar()
+    # Triggers are bypassed for the bulk load only; each room's stays are 5 days apart and never overlap.
+    stays = """
+        WITH customers AS (SELECT CustomerID, row_number() OVER () - 1 AS n FROM Customer
+                           WHERE FullName LIKE 'List Customer %'),
+             stays AS (SELECT r.HotelID, r.RoomID, k, row_number() OVER () AS n,
+                              CURRENT_DATE + :offset + k * 5 AS checkin
+                       FROM Room r, generate_series(0, :per_room - 1) k)
+    """
+    params = {'offset': SEED_OFFSET, 'per_room': max(1, args.bookings // max(rooms, 1))}
+    conn.execute(text(stays + """
+        INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+        SELECT c.CustomerID, s.HotelID, s.RoomID, CURRENT_DATE - s.k % 365, s.checkin, s.checkin + 3,
+               (ARRAY['Pending', 'Checked-in', 'Cancelled'])[1 + s.k % 3]
+        FROM stays s
+        JOIN customers c ON c.n = s.n % (SELECT COUNT(*) FROM customers)
+    """), params)
+    conn.execute(text(stays + """
+        INSERT INTO Rental (CustomerID, HotelID, RoomID, EmployeeID, CheckInDate, CheckOutDate, Status,
+                            PaymentAmount, PaymentDate, PaymentMethod)
+        SELECT c.CustomerID, s.HotelID, s.RoomID, (SELECT MIN(EmployeeID) FROM Employee), s.checkin,
+               s.checkin + 3, 'Ongoing', 50 + s.n % 900, CURRENT_DATE, 'Credit Card'
+        FROM stays s
+        JOIN customers c ON c.n = s.n % (SELECT COUNT(*) FROM customers)
+    """), params)
+    conn.execute(text("""
+        INSERT INTO BookingArchive (BookingID, HotelID, CustomerName, HotelName, RoomIdentifier, BookingDate,
+                                    CheckInDate, CheckOutDate, Status, ArchiveDate)
+        SELECT -g, h.HotelID, 'List Customer ' || md5(g::text), h.HotelName, 'Room ' || g % 100, CURRENT_DATE - g % 1000,
+               CURRENT_DATE - g % 1000, CURRENT_DATE - g % 1000 + 2, 'Cancelled', CURRENT_DATE - g % 900
+        FROM generate_series(1, :count) g
+        JOIN (SELECT HotelID, HotelName, row_number() OVER () - 1 AS n FROM Hotel) h
+          ON h.n = g % (SELECT COUNT(*) FROM Hotel)
+    """), {'count': args.archived})
+    conn.execute(text("""
+        INSERT INTO RentalArchive (RentalID, HotelID, CustomerName, HotelName, RoomIdentifier, EmployeeName,
+                                   CheckInDate, CheckOutDate, Status, PaymentAmount, PaymentDate, PaymentMethod,
+                                   ArchiveDate)
+        SELECT -g, h.HotelID, 'List Customer ' || md5(g::text), h.HotelName, 'Room ' || g % 100,
+               CASE WHEN g % 7 <> 0 THEN 'List Employee ' || g % 50 END,
+               CURRENT_DATE - g % 1000, CURRENT_DATE - g % 1000 + 2, 'Completed', 100, CURRENT_DATE - g % 1000,
+               'Cash', CURRENT_DATE - g % 900
+        FROM generate_series(1, :count) g
+        JOIN (SELECT HotelID, HotelName, row_number() OVER () - 1 AS n FROM Hotel) h
+          ON h.n = g % (SELECT COUNT(*) FROM Hotel)
+    """), {'count': args.archived})
+    conn.execute(text("ANALYZE Customer, Booking, Rental, BookingArchive, RentalArchive"))
+
+
+class QueryTimer:
+    """Sums the time spent in SQL statements on an engine."""
+
+    def __init__(self, engine):
+        self.total = 0.0
+        self._started = []
+        event.listen(engine, 'before_cursor_execute', self._before)
+        event.listen(engine, 'after_cursor_execute', self._after)
+
+    def _before(self, *args):
+        self._started.append(time.perf_counter())
+
+    def _after(self, *args):
+        self.total += time.perf_counter() - self._started.pop()
+
+
+def open_page(app, url, user, pages):
+    """Render one list page as ``user``; returns the Page it showed."""
+    parts = urlsplit(url)
+    with app.test_request_context(parts.path, query_string=dict(parse_qsl(parts.query))):
+        session.update(user)
+        app.view_functions[request.endpoint]()
+    return pages[-1]
+
+
+def walk(app, user, endpoint, sort, args, timer, pages):
+    """Time up to ``args.pages`` pages of one list; returns [(label, ms)]."""
+    with app.test_request_context():
+        url = url_for(endpoint, sort=sort)
+    timings = []
+    for number in range(1, args.pages + 1):
+        start = timer.total
+        page = open_page(app, url, user, pages)
+        timings.append((f"page {number}", (timer.total - start) * 1000))
+        if page.number is not None and number == 1:
+            # Page numbers: the deepest reachable page is the one to worry about.
+            start = timer.total
+            open_page(app, f"{url}&page={paginator.max_offset // paginator.page_size + 1}", user, pages)
+            timings.append(("deepest page", (timer.total - start) * 1000))
+        if not page.next_url:
+            break
+        url = page.next_url
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=200000)
+    parser.add_argument("--bookings", type=int, default=500000, help="Bookings seeded, and as many rentals.")
+    parser.add_argument("--archived", type=int, default=500000, help="Rows seeded in each archive table.")
+    parser.add_argument("--pages", type=int, default=20, help="Pages walked per list and sort.")
+    parser.add_argument("--budget-ms", type=float, default=50, help="Most SQL time one page may take.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        seed(db.session.connection(), args)
+        hotel_id = db.session.execute(text("""
+            SELECT HotelID FROM Booking GROUP BY HotelID ORDER BY COUNT(*) DESC LIMIT 1
+        """)).scalar()
+        users = {
+            'Admin': {'user_type': 'employee', 'user_id': 0, 'position': 'Admin', 'hotel_id': None},
+            'Manager': {'user_type': 'employee', 'user_id': 0, 'position': 'Manager', 'hotel_id': hotel_id},
+        }
+
+        pages = []
+        paginate = paginator.paginate
+        paginator.paginate = lambda *a, **kw: pages.append(paginate(*a, **kw)) or pages[-1]
+        timer = QueryTimer(db.engine)
+        over = []
+        try:
+            for role, user in users.items():
+                for endpoint, sorts in LISTS.items():
+                    if role != 'Admin' and endpoint in ADMIN_ONLY:
+                        continue
+                    for sort in sorts:
+                        timings = walk(app, user, endpoint, sort, args, timer, pages)
+                        samples = [ms for _, ms in timings]
+                        print(f"{role:<8}{endpoint:<30}{sort:<18}{len(timings):>3} pages   "
+                              f"median {statistics.median(samples):7.2f} ms   max {max(samples):7.2f} ms")
+                        over += [(role, endpoint, sort, label, ms) for label, ms in timings if ms > args.budget_ms]
+        finally:
+            paginator.paginate = paginate
+            db.session.rollback()
+
+        for role, endpoint, sort, label, ms in over:
+            print(f"❌ {role} {endpoint} sort={sort} {label}: {ms:.2f} ms > {args.budget_ms:.0f} ms")
+        if over:
+            sys.exit(1)
+        print(f"✅ Every page within {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
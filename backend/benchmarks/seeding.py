@@ -0,0 +1,17 @@
+"""Seed data shared by the benchmarks."""
+from sqlalchemy import text
+
+
+def seed_customers(conn, count, prefix, name='Bench Customer'):
+    """Insert ``count`` customers named ``name 1``..``name count``; returns their IDs.
+
+    ID numbers are ``prefix-<txid>-<n>``, so reruns never collide with each
+    other or with real customers. Benches that book often want a customer per
+    booking, since the Booking triggers cap each customer at 5 active ones.
+    """
+    return conn.execute(text("""
+        INSERT INTO Customer (FullName, Address, IDType, IDNumber, RegistrationDate)
+        SELECT :name || ' ' || g, 'Nowhere', 'Passport', :prefix || '-' || txid_current() || '-' || g, CURRENT_DATE
+        FROM generate_series(1, :count) g
+        RETURNING CustomerID
+    """), {'name': name, 'prefix': prefix, 'count': count}).scalars().all()
@@ -0,0 +1,126 @@
+"""Measure booking insert and availability search latency on the live schema.
+
+Run it once before and once after migrations/002_stay_periods.sql:
+
+    python -m benchmarks.stay_period_bench --bookings 50000 --runs 200
+
+Everything happens inside one transaction that is rolled back at the end.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app import create_app, db
+from benchmarks.seeding import seed_customers
+
+LEGACY_SEARCH = text("""
+    SELECT r.HotelID, r.RoomID
+    FROM Room r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM Booking b
+        WHERE b.RoomID = r.RoomID AND b.HotelID = r.HotelID
+          AND b.Status IN ('Pending', 'Checked-in')
+          AND (b.CheckInDate, b.CheckOutDate) OVERLAPS (:checkin, :checkout)
+    ) AND NOT EXISTS (
+        SELECT 1 FROM Rental rt
+        WHERE rt.RoomID = r.RoomID AND rt.HotelID = r.HotelID
+          AND (rt.CheckInDate, rt.CheckOutDate) OVERLAPS (:checkin, :checkout)
+    )
+""")
+
+RANGE_SEARCH = text("""
+    SELECT r.HotelID, r.RoomID
+    FROM Room r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM Booking b
+        WHERE b.HotelID = r.HotelID AND b.RoomID = r.RoomID
+          AND b.Status IN ('Pending', 'Checked-in')
+          AND b.StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+    ) AND NOT EXISTS (
+        SELECT 1 FROM Rental rt
+        WHERE rt.HotelID = r.HotelID AND rt.RoomID = r.RoomID
+          AND rt.StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+    )
+""")
+
+# Seeded stays start this far out so they never meet real data.
+SEED_OFFSET = 400
+
+
+def seed(conn, bookings):
+    rooms = conn.execute(text("SELECT COUNT(*) FROM Room")).scalar()
+    per_room = max(1, bookings // max(rooms, 1))
+
+    # Triggers are bypassed for the bulk load only; the stays never overlap.
+    conn.execute(text("ALTER TABLE Booking DISABLE TRIGGER USER"))
+    conn.execute(text("""
+        INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+        SELECT (SELECT MIN(CustomerID) FROM Customer), r.HotelID, r.RoomID, CURRENT_DATE,
+               CURRENT_DATE + :offset + k * 5, CURRENT_DATE + :offset + k * 5 + 3, 'Pending'
+        FROM Room r, generate_series(0, :per_room - 1) k
+    """), {'offset': SEED_OFFSET, 'per_room': per_room})
+    conn.execute(text("ALTER TABLE Booking ENABLE TRIGGER USER"))
+    conn.execute(text("ANALYZE Booking"))
+    return rooms * per_room, per_room
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=50000, help="Extra bookings to seed before measuring.")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context(), db.engine.connect() as conn:
+        has_ranges = conn.execute(text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'booking' AND column_name = 'stayperiod'
+        """)).fetchone() is not None
+        print(f"Schema: {'StayPeriod + GiST' if has_ranges else 'legacy date columns'}")
+
+        seeded, per_room = seed(conn, args.bookings)
+        print(f"Seeded {seeded} bookings ({per_room} per room)")
+
+        customer_id = seed_customers(conn, 1, 'BENCH')[0]
+        rooms = conn.execute(text("SELECT HotelID, RoomID FROM Room")).fetchall()
+        horizon = per_room * 5
+
+        insert_ms, rejected = [], 0
+        for _ in range(args.runs):
+            room = random.choice(rooms)
+            checkin = date.today() + timedelta(days=SEED_OFFSET + random.randint(0, horizon))
+            savepoint = conn.begin_nested()
+            start = time.perf_counter()
+            try:
+                conn.execute(text("""
+                    INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+                    VALUES (:cid, :hid, :rid, CURRENT_DATE, :checkin, :checkout, 'Pending')
+                """), {'cid': customer_id, 'hid': room.hotelid, 'rid': room.roomid,
+                       'checkin': checkin, 'checkout': checkin + timedelta(days=2)})
+            except DBAPIError:
+                rejected += 1
+            insert_ms.append((time.perf_counter() - start) * 1000)
+            savepoint.rollback()
+
+        search = RANGE_SEARCH if has_ranges else LEGACY_SEARCH
+        search_ms = []
+        for _ in range(max(1, args.runs // 10)):
+            checkin = date.today() + timedelta(days=SEED_OFFSET + random.randint(0, horizon))
+            start = time.perf_counter()
+            conn.execute(search, {'checkin': checkin, 'checkout': checkin + timedelta(days=3)}).fetchall()
+            search_ms.append((time.perf_counter() - start) * 1000)
+
+        print(f"Booking insert  median {statistics.median(insert_ms):7.2f} ms   "
+              f"p95 {statistics.quantiles(insert_ms, n=20)[-1]:7.2f} ms   ({rejected} rejected as overlapping)")
+        print(f"Free-room query median {statistics.median(search_ms):7.2f} ms   max {max(search_ms):7.2f} ms")
+
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import threading
+import time
+import traceback
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from app import db
+from availability import availability_index
+from bookings import error_message
+from holds import HoldUnavailable, room_holds
+from room_locks import RETRYABLE_SQLSTATES, room_writes
+from search_cache import search_cache
+
+_ENQUEUE = text("""
+    INSERT INTO BookingRequest (CustomerID, HotelID, RoomID, CheckInDate, CheckOutDate)
+    VALUES (:cid, :hid, :rid, :checkin, :checkout)
+    RETURNING RequestID
+""")
+
+# A held room is queued exactly as held; nothing is queued for an expired hold.
+_ENQUEUE_HOLD = text("""
+    INSERT INTO BookingRequest (CustomerID, HotelID, RoomID, CheckInDate, CheckOutDate, HoldID)
+    SELECT CustomerID, HotelID, RoomID, CheckInDate, CheckOutDate, HoldID
+    FROM RoomHold
+    WHERE HoldID = :hold AND CustomerID = :cid AND ExpiresAt > now()
+    RETURNING RequestID
+""")
+
+# Workers skip requests another worker has already claimed.
+_CLAIM_BATCH = text("""
+    SELECT RequestID, CustomerID, HotelID, RoomID, CheckInDate, CheckOutDate, HoldID
+    FROM BookingRequest
+    WHERE Status = 'Queued'
+    ORDER BY RequestID
+    LIMIT :batch
+    FOR UPDATE SKIP LOCKED
+""")
+
+_FINISH = text("""
+    UPDATE BookingRequest
+    SET Status = :status, BookingID = :bid, Message = :message, ProcessedAt = now()
+    WHERE RequestID = :id
+""")
+
+_STATUS = text("""
+    SELECT q.RequestID, q.CustomerID, q.HotelID, q.RoomID, q.CheckInDate, q.CheckOutDate,
+           q.Status, q.Message, q.BookingID, q.CreatedAt, h.HotelName
+    FROM BookingRequest q
+    JOIN Hotel h ON h.HotelID = q.HotelID
+    WHERE q.RequestID = :id
+""")
+
+
+class BookingQueue:
+    """Optional queued mode for book_room.
+
+    Requests are appended to the BookingRequest table and booked by a small
+    pool of worker threads, each draining up to ``batch_size`` requests per
+    transaction with ``FOR UPDATE SKIP LOCKED``. A burst of customers then
+    costs one short INSERT each plus ``workers`` connections doing the
+    trigger-heavy work, instead of one connection per customer for the whole
+    booking.
+
+    Workers start on the first enqueue in each web process, or in a process
+    of their own with ``flask booking-worker`` (with ``workers`` set to 0 for
+    the web processes). Availability index and search cache updates are
+    per-process, so the web processes only see bookings made by a separate
+    worker process once their index and cache entries age out.
+    """
+
+    def __init__(self, enabled=False, workers=4, batch_size=10, wait_timeout=2.0, poll_interval=0.2):
+        self.enabled = enabled
+        self.workers = workers
+        self.batch_size = batch_size
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._threads = []
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._finished = threading.Condition()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('BOOKING_QUEUE_ENABLED', self.enabled)
+        self.workers = app.config.get('BOOKING_QUEUE_WORKERS', self.workers)
+        self.batch_size = app.config.get('BOOKING_QUEUE_BATCH_SIZE', self.batch_size)
+        self.wait_timeout = app.config.get('BOOKING_QUEUE_WAIT', self.wait_timeout)
+        self.poll_interval = app.config.get('BOOKING_QUEUE_POLL_INTERVAL', self.poll_interval)
+
+    def enqueue(self, session, customer_id, hotel_id, room_id, checkin, checkout, hold_id=None):
+        """Queue a booking and commit; returns the request ID, or None if the hold has expired."""
+        try:
+            if hold_id:
+                request_id = session.execute(_ENQUEUE_HOLD, {'hold': hold_id, 'cid': customer_id}).scalar()
+            else:
+                request_id = session.execute(_ENQUEUE, {'cid': customer_id, 'hid': hotel_id, 'rid': room_id,
+                                                        'checkin': checkin, 'checkout': checkout}).scalar()
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        if self.workers:
+            self.start(db.engine, self.workers)
+        return request_id
+
+    def status(self, session, request_id):
+        row = session.execute(_STATUS, {'id': request_id}).fetchone()
+        session.rollback()
+        return row
+
+    def wait(self, session, request_id, timeout=None):
+        """Poll until the request is processed or ``timeout`` passes; returns its status row.
+
+        The session is rolled back between polls so a waiting request does not
+        keep a pooled connection checked out.
+        """
+        deadline = time.monotonic() + (self.wait_timeout if timeout is None else timeout)
+        while True:
+            row = self.status(session, request_id)
+            remaining = deadline - time.monotonic()
+            if row is None or row.status != 'Queued' or remaining <= 0:
+                return row
+            with self._finished:
+                self._finished.wait(min(self.poll_interval, remaining))
+
+    def start(self, engine, workers):
+        """Start ``workers`` worker threads on ``engine``, unless they are already running."""
+        with self._start_lock:
+            if self._threads:
+                return self._threads
+            self._stop.clear()
+            self._threads = [threading.Thread(target=self._work, args=(engine,), daemon=True,
+                                              name=f"booking-worker-{n}") for n in range(workers)]
+            for thread in self._threads:
+                thread.start()
+            return self._threads
+
+    def stop(self):
+        with self._start_lock:
+            self._stop.set()
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+
+    def _work(self, engine):
+        while not self._stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    while not self._stop.is_set():
+                        booked = room_writes.run(conn, lambda: self.process_batch(conn))
+                        if booked is None:
+                            self._stop.wait(self.poll_interval)
+                            continue
+                        for item in booked:
+                            availability_index.occupy(item.hotelid, item.roomid, item.checkindate, item.checkoutdate)
+                            search_cache.invalidate(item.hotelid, item.checkindate, item.checkoutdate)
+                        with self._finished:
+                            self._finished.notify_all()
+            except Exception:
+                # Claimed requests were rolled back to Queued; retry on a fresh connection.
+                print("⚠️ Booking worker error:")
+                print(traceback.format_exc())
+                self._stop.wait(self.poll_interval)
+
+    def process_batch(self, conn):
+        """Book one batch of queued requests; returns the booked ones, or None if the queue is empty.
+
+        Runs inside the caller's transaction. Every room lock of the batch is
+        taken up front, in (hotel, room) order, before the first INSERT: a
+        worker never waits for a room while holding another room's lock. Each
+        request is booked in its own savepoint so one rejection does not undo
+        the rest of the batch.
+        """
+        batch = conn.execute(_CLAIM_BATCH, {'batch': self.batch_size}).fetchall()
+        if not batch:
+            return None
+
+        for hotel_id, room_id in sorted({(item.hotelid, item.roomid) for item in batch}):
+            room_writes.lock_room(conn, hotel_id, room_id)
+
+        booked = []
+        for item in sorted(batch, key=lambda r: (r.hotelid, r.roomid, r.requestid)):
+            savepoint = conn.begin_nested()
+            try:
+                booking_id = self._book(conn, item)
+                savepoint.commit()
+            except (HoldUnavailable, DBAPIError) as e:
+                savepoint.rollback()
+                if getattr(getattr(e, 'orig', None), 'pgcode', None) in RETRYABLE_SQLSTATES:
+                    # The whole batch is retried by room_writes.run
+                    raise
+                message = str(e) if isinstance(e, HoldUnavailable) else error_message(e)
+                conn.execute(_FINISH, {'id': item.requestid, 'status': 'Failed', 'bid': None, 'message': message})
+                continue
+            conn.execute(_FINISH, {'id': item.requestid, 'status': 'Booked', 'bid': booking_id, 'message': None})
+            booked.append(item)
+        return booked
+
+    @staticmethod
+    def _book(conn, item):
+        # Same path as book_room; process_batch already holds the room lock,
+        # having waited for it rather than turning the request away.
+        if item.holdid:
+            if not room_holds.claim(conn, item.holdid, item.customerid):
+                raise HoldUnavailable("⌛ Your hold on this room has expired. Please search again.")
+        else:
+            room_holds.check_room(conn, item.customerid, item.hotelid, item.roomid,
+                                  item.checkindate, item.checkoutdate)
+        return conn.execute(text("""
+            INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+            VALUES (:cid, :hid, :rid, CURRENT_DATE, :checkin, :checkout, 'Pending')
+            RETURNING BookingID
+        """), {'cid': item.customerid, 'hid': item.hotelid, 'rid': item.roomid,
+               'checkin': item.checkindate, 'checkout': item.checkoutdate}).scalar()
+
+
+booking_queue = BookingQueue()
@@ -0,0 +1,155 @@
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from room_locks import RETRYABLE_SQLSTATES
+
+# Each item is checked against the same rules the Booking triggers enforce, so
+# the rejections can be reported per item instead of as one aborted statement.
+# The INSERT is a data-modifying CTE: checking, inserting and the Hotel join
+# for the response all happen in a single statement.
+BULK_BOOKING_SQL = text("""
+    WITH items AS (
+        SELECT *
+        FROM unnest(CAST(:customer_ids AS INTEGER[]), CAST(:hotel_ids AS INTEGER[]), CAST(:room_ids AS INTEGER[]),
+                    CAST(:checkins AS DATE[]), CAST(:checkouts AS DATE[]))
+            WITH ORDINALITY AS i(CustomerID, HotelID, RoomID, CheckInDate, CheckOutDate, Item)
+    ),
+    checked AS (
+        SELECT i.*,
+            CASE
+                WHEN r.RoomID IS NULL THEN '❌ Room not found.'
+                WHEN i.CheckOutDate <= i.CheckInDate THEN '❌ Check-out must be after check-in.'
+                WHEN EXISTS (
+                    SELECT 1 FROM RoomHold rh
+                    WHERE rh.HotelID = i.HotelID AND rh.RoomID = i.RoomID AND rh.ExpiresAt > now()
+                      AND rh.CustomerID <> i.CustomerID
+                      AND rh.StayPeriod && daterange(i.CheckInDate, i.CheckOutDate, '[)')
+                ) THEN '⏳ This room is on hold for another customer.'
+                WHEN EXISTS (
+                    SELECT 1 FROM RoomProblems p
+                    WHERE p.HotelID = i.HotelID AND p.RoomID = i.RoomID AND p.Resolved = FALSE
+                ) THEN '⛔ Cannot book room with unresolved problems.'
+                WHEN EXISTS (
+                    SELECT 1 FROM Booking b
+                    WHERE b.HotelID = i.HotelID AND b.RoomID = i.RoomID
+                      AND b.Status IN ('Pending', 'Checked-in')
+                      AND b.StayPeriod && daterange(i.CheckInDate, i.CheckOutDate, '[)')
+                ) OR EXISTS (
+                    SELECT 1 FROM Rental rt
+                    WHERE rt.HotelID = i.HotelID AND rt.RoomID = i.RoomID
+                      AND rt.StayPeriod && daterange(i.CheckInDate, i.CheckOutDate, '[)')
+                ) THEN '⛔ Cannot book: Room already booked or rented for selected dates.'
+                WHEN EXISTS (
+                    SELECT 1 FROM items earlier
+                    WHERE earlier.Item < i.Item
+                      AND earlier.HotelID = i.HotelID AND earlier.RoomID = i.RoomID
+                      AND daterange(earlier.CheckInDate, earlier.CheckOutDate, '[)')
+                          && daterange(i.CheckInDate, i.CheckOutDate, '[)')
+                ) THEN '⛔ Overlaps an earlier room in this request.'
+            END AS Reason
+        FROM items i
+        LEFT JOIN Room r ON r.HotelID = i.HotelID AND r.RoomID = i.RoomID
+    ),
+    inserted AS (
+        INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+        SELECT CustomerID, HotelID, RoomID, CURRENT_DATE, CheckInDate, CheckOutDate, 'Pending'
+        FROM checked
+        WHERE Reason IS NULL
+          AND (:best_effort OR NOT EXISTS (SELECT 1 FROM checked WHERE Reason IS NOT NULL))
+        ORDER BY Item
+        RETURNING BookingID, CustomerID, HotelID, RoomID, CheckInDate
+    )
+    SELECT c.Item, c.HotelID, c.RoomID, c.CheckInDate, c.CheckOutDate, c.Reason,
+           ins.BookingID, h.HotelName
+    FROM checked c
+    LEFT JOIN inserted ins
+      ON ins.CustomerID = c.CustomerID AND ins.HotelID = c.HotelID
+     AND ins.RoomID = c.RoomID AND ins.CheckInDate = c.CheckInDate
+    LEFT JOIN Hotel h ON h.HotelID = c.HotelID
+    ORDER BY c.Item
+""")
+
+SINGLE_BOOKING_SQL = text("""
+    INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
+    VALUES (:cid, :hid, :rid, CURRENT_DATE, :checkin, :checkout, 'Pending')
+    RETURNING BookingID, (SELECT HotelName FROM Hotel WHERE HotelID = :hid) AS hotelname
+""")
+
+
+def error_message(error):
+    orig = getattr(error, 'orig', None)
+    if orig is not None and getattr(orig, 'diag', None) is not None and orig.diag.message_primary:
+        return orig.diag.message_primary
+    return str(error).split('\n')[0]
+
+
+def _retryable(error):
+    return getattr(getattr(error, 'orig', None), 'pgcode', None) in RETRYABLE_SQLSTATES
+
+
+def bulk_book(session, items, best_effort=False):
+    """Book several rooms in one statement; the caller commits or rolls back.
+
+    ``items`` are dicts with customer_id, hotel_id, room_id, checkin and
+    checkout. By default nothing is inserted unless every item can be booked.
+    With ``best_effort`` the bookable items are inserted and the rest are
+    reported. Returns one result dict per item, in request order, each with
+    ``booking_id`` set when it was booked or ``error`` when it was not.
+    Serialization failures and deadlocks propagate, so ``room_writes.run``
+    can retry the whole transaction.
+    """
+    params = {
+        'customer_ids': [item['customer_id'] for item in items],
+        'hotel_ids': [item['hotel_id'] for item in items],
+        'room_ids': [item['room_id'] for item in items],
+        'checkins': [item['checkin'] for item in items],
+        'checkouts': [item['checkout'] for item in items],
+        'best_effort': best_effort,
+    }
+
+    savepoint = session.begin_nested()
+    try:
+        rows = session.execute(BULK_BOOKING_SQL, params).fetchall()
+        savepoint.commit()
+    except DBAPIError as e:
+        # A trigger fired on something the pre-checks cannot see (a concurrent
+        # booking, the per-customer limit). All-or-nothing gives up here;
+        # best-effort retries the items one at a time.
+        savepoint.rollback()
+        if _retryable(e):
+            raise
+        if not best_effort:
+            return [dict(_item_result(item), error=error_message(e)) for item in items]
+        return [_book_one(session, item) for item in items]
+
+    results = []
+    for item, row in zip(items, rows):
+        result = dict(_item_result(item), hotel_name=row.hotelname)
+        if row.bookingid is not None:
+            result['booking_id'] = row.bookingid
+        else:
+            result['error'] = row.reason or '⏸ Not booked: another room in this request failed.'
+        results.append(result)
+    return results
+
+
+def _item_result(item):
+    return {key: str(item[key]) if key in ('checkin', 'checkout') else item[key]
+            for key in ('hotel_id', 'room_id', 'checkin', 'checkout')}
+
+
+def _book_one(session, item):
+    result = _item_result(item)
+    savepoint = session.begin_nested()
+    try:
+        row = session.execute(SINGLE_BOOKING_SQL, {
+            'cid': item['customer_id'], 'hid': item['hotel_id'], 'rid': item['room_id'],
+            'checkin': item['checkin'], 'checkout': item['checkout'],
+        }).fetchone()
+        savepoint.commit()
+        result.update(booking_id=row.bookingid, hotel_name=row.hotelname)
+    except DBAPIError as e:
+        savepoint.rollback()
+        if _retryable(e):
+            raise
+        result['error'] = error_message(e)
+    return result
@@ -0,0 +1,231 @@
+import codecs
+import csv
+import time
+import psycopg2
+from sqlalchemy import text
+
+# Year 1000-2999, a real month and a day that exists in it.
+DATE = r"^[12][0-9]{3}-(0[1-9]|1[0-2])-(0[1-9]|[12][0-9]|3[01])$"
+
+
+# Each helper returns (condition, message) pairs for one staging column; a condition is only
+# evaluated once the ones before it are false, so it may cast what they have vetted.
+def _required(column):
+    return [(f"s.{column} IS NULL OR s.{column} = ''", f"{column} is missing")]
+
+
+def _positive_integer(column):
+    return _required(column) + [
+        (f"s.{column} !~ '^[0-9]{{1,9}}$'", f"{column} must be a whole number"),
+        (f"s.{column}::INTEGER = 0", f"{column} must be positive"),
+    ]
+
+
+def _one_of(column, values):
+    allowed = ", ".join(f"'{value}'" for value in values)
+    return _required(column) + [(f"s.{column} NOT IN ({allowed})", f"{column} must be one of {', '.join(values)}")]
+
+
+def _text(column, length):
+    return _required(column) + [(f"length(s.{column}) > {length}", f"{column} is longer than {length} characters")]
+
+
+def _past_date(column):
+    return _required(column) + [
+        (f"s.{column} !~ '{DATE}'", f"{column} must be a date like 2024-01-31"),
+        (f"split_part(s.{column}, '-', 3)::INTEGER > EXTRACT(DAY FROM date_trunc('month', (left(s.{column}, 7) || '-01')::DATE)"
+         f" + INTERVAL '1 month - 1 day')", f"{column} is not a day of its month"),
+        (f"s.{column}::DATE > CURRENT_DATE", f"{column} cannot be in the future"),
+    ]
+
+
+# What each CSV file holds and how its rows are checked and merged. The checks mirror the
+# NOT NULL columns, types, CHECK constraints and keys of the target table (schema.sql and
+# constraints.sql) and run in order, so each rejected row is reported with its first problem.
+# Keys repeated within a file are rejected after that, keeping the first line. Merges run
+# rooms first, so an amenities file can name rooms from the rooms file.
+IMPORTS = {
+    'rooms': {
+        'table': 'Room',
+        'columns': ['hotel_id', 'room_id', 'price', 'capacity', 'view_type', 'extendable', 'status'],
+        'optional': ['status'],
+        'checks': [
+            *_positive_integer('hotel_id'),
+            *_positive_integer('room_id'),
+            *_required('price'),
+            ("s.price !~ '^[0-9]{1,8}(\\.[0-9]{1,2})?$'", "price must be an amount with at most 2 decimals"),
+            ("s.price::NUMERIC = 0", "price must be positive"),
+            *_one_of('capacity', ['single', 'double', 'triple', 'family', 'suite']),
+            *_one_of('view_type', ['sea_view', 'mountain_view', 'both', 'none']),
+            *_one_of('extendable', ['true', 'false']),
+            ("s.status IS NOT NULL AND s.status NOT IN ('Available', 'Booked', 'Occupied', 'Out-of-Order')",
+             "status must be one of Available, Booked, Occupied, Out-of-Order"),
+            ("NOT EXISTS (SELECT 1 FROM Hotel WHERE HotelID = s.hotel_id::INTEGER)", "hotel_id does not exist"),
+            ("EXISTS (SELECT 1 FROM Room WHERE HotelID = s.hotel_id::INTEGER AND RoomID = s.room_id::INTEGER)",
+             "room already exists"),
+        ],
+        'key': "hotel_id::INTEGER, room_id::INTEGER",
+        'merge': """
+            INSERT INTO Room (HotelID, RoomID, Price, Capacity, ViewType, Extendable, Status)
+            SELECT hotel_id::INTEGER, room_id::INTEGER, price::NUMERIC, capacity, view_type,
+                   extendable::BOOLEAN, COALESCE(status, 'Available')
+            FROM {staging} WHERE Error IS NULL
+        """,
+    },
+    'amenities': {
+        'table': 'RoomAmenities',
+        'columns': ['hotel_id', 'room_id', 'amenity'],
+        'optional': [],
+        'checks': [
+            *_positive_integer('hotel_id'),
+            *_positive_integer('room_id'),
+            *_text('amenity', 100),
+            ("NOT EXISTS (SELECT 1 FROM Room WHERE HotelID = s.hotel_id::INTEGER AND RoomID = s.room_id::INTEGER)",
+             "room does not exist"),
+            ("EXISTS (SELECT 1 FROM RoomAmenities WHERE HotelID = s.hotel_id::INTEGER AND RoomID = s.room_id::INTEGER"
+             " AND Amenity = s.amenity)", "amenity already recorded for this room"),
+        ],
+        'key': "hotel_id::INTEGER, room_id::INTEGER, amenity",
+        'merge': """
+            INSERT INTO RoomAmenities (HotelID, RoomID, Amenity)
+            SELECT hotel_id::INTEGER, room_id::INTEGER, amenity
+            FROM {staging} WHERE Error IS NULL
+        """,
+    },
+    'customers': {
+        'table': 'Customer',
+        'columns': ['full_name', 'address', 'id_type', 'id_number', 'registration_date'],
+        'optional': [],
+        'checks': [
+            *_text('full_name', 100),
+            *_text('address', 255),
+            *_one_of('id_type', ['SSN', 'SIN', 'Driving License', 'Passport']),
+            *_text('id_number', 50),
+            ("length(s.id_number) <= 5", "id_number must be longer than 5 characters"),
+            *_past_date('registration_date'),
+            ("EXISTS (SELECT 1 FROM Customer WHERE IDNumber = s.id_number)", "a customer with this id_number already exists"),
+        ],
+        'key': "id_number",
+        'merge': """
+            INSERT INTO Customer (FullName, Address, IDType, IDNumber, RegistrationDate)
+            SELECT full_name, address, id_type, id_number, registration_date::DATE
+            FROM {staging} WHERE Error IS NULL
+        """,
+    },
+}
+
+
+class ImportResult:
+    """Outcome of one CSV file: rows read and merged, the first rejections as (line, reason),
+    and the hotels that gained rooms or amenities."""
+
+    def __init__(self, kind, read, merged, rejections, hotels, seconds):
+        self.kind = kind
+        self.read = read
+        self.merged = merged
+        self.rejected = read - merged
+        self.rejections = rejections
+        self.hotels = hotels
+        self.seconds = seconds
+
+
+class BulkImporter:
+    """Loads rooms, room amenities and customers from CSV files.
+
+    Each file is streamed with COPY into a temporary staging table of text
+    columns, so a malformed value becomes a rejected row instead of failing
+    the load. Rows are then checked a whole table at a time (see IMPORTS),
+    and the valid ones are merged with one INSERT ... SELECT per table.
+    Every file of an import is staged, checked and merged in a single
+    transaction: it either all commits or, on error or ``dry_run``, all
+    rolls back. At most ``max_rejections`` rejections per file are read
+    back for the report.
+    """
+
+    def __init__(self, max_rejections=1000):
+        self.max_rejections = max_rejections
+
+    def init_app(self, app):
+        self.max_rejections = app.config.get('BULK_IMPORT_MAX_REJECTIONS', self.max_rejections)
+
+    def run(self, session, files, dry_run=False):
+        """Import ``{kind: binary file}``; returns {kind: ImportResult}. Raises ValueError on a bad header."""
+        results = {}
+        try:
+            for kind in IMPORTS:
+                if kind in files:
+                    results[kind] = self._import(session, kind, files[kind])
+            if dry_run:
+                session.rollback()
+            else:
+                session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return results
+
+    def _import(self, session, kind, stream):
+        spec = IMPORTS[kind]
+        start = time.perf_counter()
+        staging = f"import_{kind}"
+        header = self._read_header(kind, stream)
+
+        session.execute(text(f"""
+            CREATE TEMP TABLE {staging} (
+                LineNo BIGINT GENERATED ALWAYS AS IDENTITY,
+                {", ".join(f"{column} TEXT" for column in spec['columns'])},
+                Error TEXT
+            ) ON COMMIT DROP
+        """))
+        cursor = session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {staging} ({', '.join(header)}) FROM STDIN WITH (FORMAT csv)", stream)
+        except psycopg2.DataError as e:
+            # Only a file COPY cannot split into rows gets here (a stray quote, a missing column);
+            # COPY counts lines from the first data row.
+            raise ValueError(f"{kind}: {e.diag.message_primary} ({e.diag.context})")
+        finally:
+            cursor.close()
+        session.execute(text(f"ANALYZE {staging}"))
+
+        checks = "\n".join(f"WHEN {condition} THEN '{message}'" for condition, message in spec['checks'])
+        session.execute(text(f"UPDATE {staging} s SET Error = CASE {checks} END"))
+        session.execute(text(f"""
+            UPDATE {staging} s SET Error = 'repeats line ' || (d.first + 1)
+            FROM (SELECT LineNo, first_value(LineNo) OVER (PARTITION BY {spec['key']} ORDER BY LineNo) AS first
+                  FROM {staging} WHERE Error IS NULL) d
+            WHERE s.LineNo = d.LineNo AND d.LineNo <> d.first
+        """))
+
+        merged = session.execute(text(spec['merge'].format(staging=staging))).rowcount
+        read = session.execute(text(f"SELECT COUNT(*) FROM {staging}")).scalar()
+        hotels = []
+        if 'hotel_id' in spec['columns']:
+            hotels = session.execute(text(f"""
+                SELECT DISTINCT hotel_id::INTEGER FROM {staging} WHERE Error IS NULL
+            """)).scalars().all()
+        # Line 1 is the header, so row n of the data is line n + 1.
+        rejections = session.execute(text(f"""
+            SELECT LineNo + 1 AS line, Error FROM {staging}
+            WHERE Error IS NOT NULL
+            ORDER BY LineNo
+            LIMIT :limit
+        """), {'limit': self.max_rejections}).fetchall()
+        return ImportResult(kind, read, merged, [(row.line, row.error) for row in rejections], hotels,
+                            time.perf_counter() - start)
+
+    @staticmethod
+    def _read_header(kind, stream):
+        """Read the header line off ``stream``, leaving it at the first data row."""
+        spec = IMPORTS[kind]
+        line = codecs.decode(stream.readline(), 'utf-8-sig')
+        header = [name.strip().lower() for name in next(csv.reader([line]), [])]
+        unknown = [name for name in header if name not in spec['columns']]
+        missing = [name for name in spec['columns'] if name not in header and name not in spec['optional']]
+        if unknown or missing or len(set(header)) != len(header):
+            raise ValueError(f"{kind}: header must name the columns {', '.join(spec['columns'])} "
+                             f"({', '.join(spec['optional']) or 'none'} optional), each once")
+        return header
+
+
+bulk_import = BulkImporter()
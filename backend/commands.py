@@ -0,0 +1,274 @@
+import click
+import time
+from datetime import date, timedelta
+from flask.cli import with_appcontext
+from sqlalchemy import text
+from app import db
+from availability import availability_index, check_consistency
+from booking_queue import booking_queue
+from bulk_import import IMPORTS, bulk_import
+from idempotency import idempotency_keys
+from retention import archive_retention
+from search import build_search_query
+from sweeper import sweeper
+
+
+@click.command('availability-check')
+@click.option('--days', default=30, help='Number of check-in dates to test, starting today.')
+@click.option('--nights', default=3, help='Length of each tested stay.')
+@with_appcontext
+def availability_check(days, nights):
+    """Compare the in-memory availability index with the SQL overlap checks."""
+    availability_index.build(db.session)
+    mismatches = 0
+
+    for offset in range(days):
+        checkin = date.today() + timedelta(days=offset)
+        checkout = checkin + timedelta(days=nights)
+        if not availability_index.covers(checkin, checkout):
+            break
+
+        only_sql, only_index = check_consistency(availability_index, db.session, checkin, checkout)
+        if only_sql or only_index:
+            mismatches += 1
+            click.echo(f"❌ {checkin} → {checkout}: {len(only_sql)} missing from index, {len(only_index)} wrongly free")
+            for hotel_id, room_id in sorted(only_sql | only_index)[:10]:
+                click.echo(f"   Hotel {hotel_id}, Room {room_id}")
+
+    if mismatches:
+        raise click.ClickException(f"{mismatches} stay(s) disagree with the SQL path.")
+    click.echo(f"✅ Index matches SQL for {days} stays of {nights} night(s) across {len(availability_index.masks)} rooms.")
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _plan_nodes(child)
+
+
+# Search parameter -> the index that has to serve its filter (see build_filters)
+SEARCH_FILTER_INDEXES = {
+    'city': 'idx_hotel_city',
+    'area': 'idx_hotel_address_trgm',
+    'chain': 'idx_hotelchain_name_trgm',
+}
+
+
+@click.command('search-explain')
+@click.option('--area', default=None, help='Area filter to check (defaults to an existing city).')
+@click.option('--chain', default=None, help='Chain filter to check (defaults to part of an existing chain name).')
+@with_appcontext
+def search_explain(area, chain):
+    """EXPLAIN the room search area/chain filters and fail unless each uses its index.
+
+    Sequential scans are disabled for the check so that a small dev database
+    still shows whether an index can serve each filter at all; a scan of
+    another Hotel/HotelChain index (the primary key, say) fails it too.
+    """
+    if area is None:
+        area = db.session.execute(text("SELECT City FROM Hotel ORDER BY HotelID LIMIT 1")).scalar()
+    if chain is None:
+        chain = db.session.execute(text("SELECT LEFT(ChainName, 5) FROM HotelChain ORDER BY HotelChainID LIMIT 1")).scalar()
+
+    checkin = date.today() + timedelta(days=7)
+    cases = {
+        f"exact city '{area}'": {'area': area},
+        "address substring 'street'": {'area': 'street'},
+        f"chain substring '{chain}'": {'chain': chain},
+    }
+
+    failures = 0
+    for label, filters in cases.items():
+        criteria = {'checkin': checkin, 'checkout': checkin + timedelta(days=2), 'sort': 'price', **filters}
+        query, params = build_search_query(db.session, criteria)
+        db.session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params).scalar()[0]['Plan']
+        db.session.rollback()
+
+        nodes = list(_plan_nodes(plan))
+        scanned = [node.get('Relation Name') for node in nodes
+                   if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in ('hotel', 'hotelchain')]
+        used = {node['Index Name'] for node in nodes if 'Index Name' in node}
+        missing = [index for param, index in SEARCH_FILTER_INDEXES.items() if param in params and index not in used]
+        if scanned or missing:
+            failures += 1
+            problems = [f"sequential scan on {', '.join(scanned)}"] if scanned else []
+            problems += [f"{index} not used" for index in missing]
+            click.echo(f"❌ {label}: {'; '.join(problems)}")
+        else:
+            expected = [index for param, index in SEARCH_FILTER_INDEXES.items() if param in params]
+            click.echo(f"✅ {label}: served by {', '.join(expected)}")
+
+    if failures:
+        raise click.ClickException(f"{failures} search filter(s) are not served by their index.")
+
+
+@click.command('idempotency-purge')
+@click.option('--batch-size', default=5000, help='Keys deleted per transaction.')
+@with_appcontext
+def idempotency_purge(batch_size):
+    """Delete idempotency keys whose replay window has passed."""
+    removed = idempotency_keys.purge(db.session, batch_size)
+    click.echo(f"✅ Removed {removed} expired idempotency key(s).")
+
+
+@click.command('booking-worker')
+@click.option('--workers', default=None, type=int, help='Worker threads (defaults to BOOKING_QUEUE_WORKERS).')
+@with_appcontext
+def booking_worker(workers):
+    """Drain the queued-booking table until interrupted."""
+    workers = workers or booking_queue.workers or 1
+    threads = booking_queue.start(db.engine, workers)
+    click.echo(f"🛎️ {len(threads)} booking worker(s) running, batches of {booking_queue.batch_size}. Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        booking_queue.stop()
+
+
+DASHBOARD_DRIFT = text("""
+    WITH expected AS (
+        SELECT b.BookingID, b.HotelID, b.RoomID, c.FullName AS CustomerName, h.HotelName,
+               b.CheckInDate, b.CheckOutDate, b.Status
+        FROM Booking b
+        JOIN Customer c ON c.CustomerID = b.CustomerID
+        JOIN Hotel h ON h.HotelID = b.HotelID
+        WHERE b.Status IN ('Pending', 'Checked-in')
+          AND NOT EXISTS (SELECT 1 FROM Rental r WHERE r.BookingID = b.BookingID)
+    ),
+    counters AS (
+        SELECT h.HotelID,
+               (SELECT COUNT(*) FROM Booking b WHERE b.HotelID = h.HotelID AND b.Status = 'Pending') AS PendingBookings,
+               (SELECT COUNT(*) FROM Rental r WHERE r.HotelID = h.HotelID AND r.Status = 'Ongoing') AS InHouseRentals,
+               (SELECT COUNT(*) FROM Room m WHERE m.HotelID = h.HotelID AND m.Status = 'Out-of-Order') AS OutOfOrderRooms
+        FROM Hotel h
+    )
+    SELECT
+        (SELECT COUNT(*) FROM (
+            (SELECT * FROM expected EXCEPT SELECT * FROM UpcomingArrival)
+            UNION ALL
+            (SELECT * FROM UpcomingArrival EXCEPT SELECT * FROM expected)
+        ) diff) AS Arrivals,
+        (SELECT COUNT(*) FROM counters c
+         LEFT JOIN (
+             SELECT HotelID, SUM(PendingBookings) AS PendingBookings, SUM(InHouseRentals) AS InHouseRentals,
+                    SUM(OutOfOrderRooms) AS OutOfOrderRooms
+             FROM (SELECT HotelID, PendingBookings, InHouseRentals, OutOfOrderRooms FROM HotelDashboard
+                   UNION ALL
+                   SELECT HotelID, PendingBookings, InHouseRentals, OutOfOrderRooms FROM HotelDashboardDelta) amounts
+             GROUP BY HotelID
+         ) d ON d.HotelID = c.HotelID
+         WHERE (COALESCE(d.PendingBookings, 0), COALESCE(d.InHouseRentals, 0), COALESCE(d.OutOfOrderRooms, 0))
+               IS DISTINCT FROM (c.PendingBookings, c.InHouseRentals, c.OutOfOrderRooms)) AS Hotels
+""")
+
+
+@click.command('dashboard-check')
+@with_appcontext
+def dashboard_check():
+    """Compare the employee dashboard read model with Booking, Rental and Room."""
+    drift = db.session.execute(DASHBOARD_DRIFT).fetchone()
+    if drift.arrivals or drift.hotels:
+        raise click.ClickException(
+            f"{drift.arrivals} arrival row(s) and {drift.hotels} hotel counter(s) disagree; "
+            "re-run database/migrations/010_dashboard_read_model.sql (then 018_dashboard_deltas.sql) to rebuild.")
+    click.echo("✅ Dashboard read model matches the source tables.")
+
+
+@click.command('sweep')
+@click.option('--batch-size', default=None, type=int, help='Rows changed per transaction (defaults to SWEEPER_BATCH_SIZE).')
+@with_appcontext
+def sweep(batch_size):
+    """Complete finished rentals, mark no-shows, clear expired holds and fold version and dashboard deltas, in batches."""
+    if batch_size:
+        sweeper.batch_size = batch_size
+    results = sweeper.run(db.session)
+    for task, (rows, batches, seconds) in results.items():
+        click.echo(f"   {task:<22} {rows:7} rows  {batches:4} batch(es)  {seconds * 1000:8.1f} ms")
+    click.echo(sweeper.summary(results))
+
+
+@click.command('archive-partitions')
+@click.option('--years-ahead', default=1, help='Years past the current one to create partitions for.')
+@with_appcontext
+def archive_partitions(years_ahead):
+    """Create the yearly BookingArchive and RentalArchive partitions up to --years-ahead."""
+    this_year = date.today().year
+    try:
+        db.session.execute(text("""
+            SELECT create_archive_partition(parent, year)
+            FROM unnest(ARRAY['BookingArchive', 'RentalArchive']) parent,
+                 generate_series(CAST(:first AS INTEGER), CAST(:last AS INTEGER)) year
+        """), {'first': this_year, 'last': this_year + years_ahead})
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    left = db.session.execute(text("""
+        SELECT (SELECT COUNT(*) FROM BookingArchive_default) + (SELECT COUNT(*) FROM RentalArchive_default)
+    """)).scalar()
+    click.echo(f"✅ Archive partitions exist through {this_year + years_ahead}.")
+    if left:
+        click.echo(f"⚠️ {left} archived row(s) are in a default partition; "
+                   "create_archive_partition(table, year) for their years moves them out.")
+
+
+@click.command('archive-old')
+@click.option('--age-days', default=None, type=int, help='Days after check-out (defaults to ARCHIVE_AFTER_DAYS).')
+@click.option('--batch-size', default=None, type=int, help='Rows per transaction (defaults to ARCHIVE_BATCH_SIZE).')
+@click.option('--max-batches', default=None, type=int, help='Stop each table after this many batches.')
+@with_appcontext
+def archive_old(age_days, batch_size, max_batches):
+    """Move finished bookings and rentals older than --age-days into the archive tables."""
+    if age_days is not None:
+        archive_retention.age_days = age_days
+    if batch_size:
+        archive_retention.batch_size = batch_size
+    results = archive_retention.run(db.session, max_batches)
+    for job, (rows, batches, seconds) in results.items():
+        click.echo(f"   {job:<10} {rows:8} rows  {batches:5} batch(es)  {seconds:8.1f} s")
+    click.echo(f"✅ Archived {sum(rows for rows, _, _ in results.values())} row(s) "
+               f"finished more than {archive_retention.age_days} days ago.")
+
+
+@click.command('import-csv')
+@click.option('--rooms', type=click.File('rb'), help='CSV of rooms: hotel_id, room_id, price, capacity, view_type, extendable[, status].')
+@click.option('--amenities', type=click.File('rb'), help='CSV of room amenities: hotel_id, room_id, amenity.')
+@click.option('--customers', type=click.File('rb'), help='CSV of customers: full_name, address, id_type, id_number, registration_date.')
+@click.option('--dry-run', is_flag=True, help='Check every row and report, but roll the import back.')
+@click.option('--show', default=20, help='Rejected rows listed per file.')
+@with_appcontext
+def import_csv(rooms, amenities, customers, dry_run, show):
+    """Bulk-load rooms, room amenities and customers from CSV files in one transaction."""
+    files = {kind: f for kind, f in (('rooms', rooms), ('amenities', amenities), ('customers', customers)) if f}
+    if not files:
+        raise click.UsageError("Give at least one of --rooms, --amenities, --customers.")
+    try:
+        results = bulk_import.run(db.session, files, dry_run=dry_run)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    for kind, result in results.items():
+        click.echo(f"   {kind:<10} {result.read:9} read  {result.merged:9} into {IMPORTS[kind]['table']:<14}"
+                   f"{result.rejected:7} rejected  {result.seconds:6.1f} s")
+        for line, reason in result.rejections[:show]:
+            click.echo(f"      line {line}: {reason}")
+        if result.rejected > show:
+            click.echo(f"      … and {result.rejected - show} more")
+    if dry_run:
+        click.echo("✅ Dry run: nothing was imported.")
+    else:
+        click.echo(f"✅ Imported {sum(result.merged for result in results.values())} row(s).")
+
+
+def init_app(app):
+    app.cli.add_command(availability_check)
+    app.cli.add_command(search_explain)
+    app.cli.add_command(idempotency_purge)
+    app.cli.add_command(booking_worker)
+    app.cli.add_command(sweep)
+    app.cli.add_command(dashboard_check)
+    app.cli.add_command(archive_partitions)
+    app.cli.add_command(archive_old)
+    app.cli.add_command(import_csv)
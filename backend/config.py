@@ -10,3 +10,60 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.getenv("SECRET_KEY", "dev")
+
+    # In-memory room-night index used by room search (see availability.py)
+    AVAILABILITY_INDEX_ENABLED = True
+    AVAILABILITY_HORIZON_DAYS = 365 # Stays ending after this many days fall back to SQL
+    AVAILABILITY_MAX_AGE = 300 # Seconds before the index is rebuilt from the database
+
+    SEARCH_PAGE_SIZE = 25 # Rooms per page of search results
+
+    # Per-process cache of search result pages (see search_cache.py)
+    SEARCH_CACHE_ENABLED = True
+    SEARCH_CACHE_SIZE = 256 # Pages kept before least-recently-used eviction
+    SEARCH_CACHE_TTL = 60 # Seconds a cached page stays valid
+
+    BULK_BOOKING_MAX_ITEMS = 100 # Rooms accepted by one POST /api/bookings request
+
+    ROOM_HOLD_TTL = 300 # Seconds a room stays held while the customer confirms the booking
+
+    # Concurrency control for book_room, rent_room and convert_booking (see room_locks.py)
+    BOOKING_CONCURRENCY = 'advisory' # 'advisory', 'serializable' or 'none'
+    BOOKING_MAX_RETRIES = 5 # Retries after a serialization failure in 'serializable' mode
+    BOOKING_RETRY_BACKOFF = 0.02 # Seconds before the first retry, doubled each time
+
+    # Idempotency keys for book_room, convert_booking, rent_room and add_payment (see idempotency.py)
+    IDEMPOTENCY_KEY_TTL = 86400 # Seconds a stored response is replayed for a repeated key
+    IDEMPOTENCY_WAIT = 30 # Seconds a duplicate waits for the first attempt before giving up
+    IDEMPOTENCY_POOL_SIZE = 20 # Connections for holding keys, separate from the pool the views use
+
+    # Queued mode for book_room, drained by a pool of booking workers (see booking_queue.py)
+    BOOKING_QUEUE_ENABLED = False # Queue book_room requests instead of booking inline
+    BOOKING_QUEUE_WORKERS = 4 # Worker threads per web process; 0 when `flask booking-worker` runs them
+    BOOKING_QUEUE_BATCH_SIZE = 10 # Requests a worker books per transaction
+    BOOKING_QUEUE_WAIT = 2.0 # Seconds book_room waits for the result before answering with a ticket
+    BOOKING_QUEUE_POLL_INTERVAL = 0.2 # Seconds between queue checks by idle workers and waiting requests
+
+    # Background maintenance: completed rentals, no-shows, expired holds (see sweeper.py)
+    SWEEPER_ENABLED = False # Sweep from a thread in each web process; otherwise run `flask sweep` from cron
+    SWEEPER_INTERVAL = 300 # Seconds between sweeps
+    SWEEPER_BATCH_SIZE = 500 # Rows changed per transaction
+    NO_SHOW_GRACE_DAYS = 1 # Days after check-in before a Pending booking becomes a No-show
+    BOOKING_REQUEST_RETENTION_DAYS = 7 # Days processed queued-booking requests are kept
+
+    # Paging for the employee list pages (see pagination.py)
+    LIST_PAGE_SIZE = 50 # Rows per page
+    LIST_MAX_OFFSET = 5000 # Deepest row reachable by page number when a sort cannot use a cursor
+    LIST_EXACT_COUNT_LIMIT = 10000 # Estimated rows above which totals show the planner's estimate
+
+    # CSV/NDJSON export of the booking and rental archives (see archive_export.py)
+    ARCHIVE_EXPORT_BATCH_SIZE = 2000 # Rows fetched from the server-side cursor and written per chunk
+
+    # Age-based archival of finished bookings and rentals, run by `flask archive-old` (see retention.py)
+    ARCHIVE_AFTER_DAYS = 365 # Days after check-out before a finished booking or rental is archived
+    ARCHIVE_BATCH_SIZE = 1000 # Rows archived per transaction
+    ARCHIVE_PAUSE = 0.1 # Seconds between batches, leaving the database to regular traffic
+
+    # CSV import of rooms, amenities and customers, from `flask import-csv` or the admin upload page (see bulk_import.py)
+    BULK_IMPORT_MAX_REJECTIONS = 1000 # Rejected rows per file listed in the report
+    MAX_CONTENT_LENGTH = 512 * 1024 * 1024 # Largest request body accepted, uploads included
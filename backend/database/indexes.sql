@@ -21,3 +21,114 @@ CREATE INDEX idx_hotel_address ON Hotel(Address);
 -- Index 6: Speed up employee filtering by hotel and position
 DROP INDEX IF EXISTS idx_employee_hotel_position;
 CREATE INDEX idx_employee_hotel_position ON Employee(HotelID, Position);
+
+-- Index 7: Keyset pagination of room search by price (ties broken on the room key)
+DROP INDEX IF EXISTS idx_room_price_key;
+CREATE INDEX idx_room_price_key ON Room(Price, HotelID, RoomID);
+
+-- Index 8: Keyset pagination of room search by capacity rank (must match search.CAPACITY_RANK)
+DROP INDEX IF EXISTS idx_room_capacity_key;
+CREATE INDEX idx_room_capacity_key ON Room((CASE Capacity WHEN 'single' THEN 1 WHEN 'double' THEN 2 WHEN 'triple' THEN 3 WHEN 'family' THEN 4 WHEN 'suite' THEN 5 ELSE 6 END), HotelID, RoomID);
+
+-- Index 9: Overlap lookups on any rental stay (search, booking trigger); active bookings
+-- and ongoing rentals are already covered by the EXCL_*_Room_Stay constraint indexes
+DROP INDEX IF EXISTS idx_rental_stay;
+CREATE INDEX idx_rental_stay ON Rental USING gist (HotelID, RoomID, StayPeriod);
+
+-- Index 10-12: Room search area/chain filters (substring ILIKE needs trigrams, exact city uses the B-tree)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+DROP INDEX IF EXISTS idx_hotel_address_trgm;
+CREATE INDEX idx_hotel_address_trgm ON Hotel USING gin (Address gin_trgm_ops);
+
+DROP INDEX IF EXISTS idx_hotelchain_name_trgm;
+CREATE INDEX idx_hotelchain_name_trgm ON HotelChain USING gin (ChainName gin_trgm_ops);
+
+DROP INDEX IF EXISTS idx_hotel_city;
+CREATE INDEX idx_hotel_city ON Hotel(City);
+
+-- Index 13: Active-booking limit in validate_booking (counts only Pending/Checked-in rows, index-only)
+DROP INDEX IF EXISTS idx_booking_customer_active;
+CREATE INDEX idx_booking_customer_active ON Booking(CustomerID) WHERE Status IN ('Pending', 'Checked-in');
+
+-- Index 14: Expired idempotency keys for the purge job
+DROP INDEX IF EXISTS idx_idempotency_key_expires;
+CREATE INDEX idx_idempotency_key_expires ON IdempotencyKey(ExpiresAt);
+
+-- Index 15: Queued booking requests, claimed oldest first by the booking workers
+DROP INDEX IF EXISTS idx_booking_request_queued;
+CREATE INDEX idx_booking_request_queued ON BookingRequest(RequestID) WHERE Status = 'Queued';
+
+-- Index 16: Sweeper batches of rentals to complete (only Ongoing rows, oldest check-out first)
+DROP INDEX IF EXISTS idx_rental_ongoing_checkout;
+CREATE INDEX idx_rental_ongoing_checkout ON Rental(CheckOutDate) WHERE Status = 'Ongoing';
+
+-- Index 17: Sweeper batches of no-show bookings (only Pending rows, oldest check-in first)
+DROP INDEX IF EXISTS idx_booking_pending_checkin;
+CREATE INDEX idx_booking_pending_checkin ON Booking(CheckInDate) WHERE Status = 'Pending';
+
+-- Index 18-19: Employee dashboard arrivals, per hotel and (for admins) across hotels, by check-in date
+DROP INDEX IF EXISTS idx_upcoming_arrival_hotel;
+CREATE INDEX idx_upcoming_arrival_hotel ON UpcomingArrival(HotelID, CheckInDate);
+DROP INDEX IF EXISTS idx_upcoming_arrival_checkin;
+CREATE INDEX idx_upcoming_arrival_checkin ON UpcomingArrival(CheckInDate);
+
+-- Index 20: Rentals made from a booking (UpcomingArrival refresh)
+DROP INDEX IF EXISTS idx_rental_booking;
+CREATE INDEX idx_rental_booking ON Rental(BookingID);
+
+-- Index 21-22: Employee booking list, newest check-in first, continued from a (CheckInDate, BookingID) cursor
+DROP INDEX IF EXISTS idx_booking_checkin_key;
+CREATE INDEX idx_booking_checkin_key ON Booking(CheckInDate, BookingID);
+DROP INDEX IF EXISTS idx_booking_hotel_checkin_key;
+CREATE INDEX idx_booking_hotel_checkin_key ON Booking(HotelID, CheckInDate, BookingID);
+
+-- Index 23-24: Employee rental list, same as bookings
+DROP INDEX IF EXISTS idx_rental_checkin_key;
+CREATE INDEX idx_rental_checkin_key ON Rental(CheckInDate, RentalID);
+DROP INDEX IF EXISTS idx_rental_hotel_checkin_key;
+CREATE INDEX idx_rental_hotel_checkin_key ON Rental(HotelID, CheckInDate, RentalID);
+
+-- Index 25: Admin room list by room number across hotels
+DROP INDEX IF EXISTS idx_room_roomid_key;
+CREATE INDEX idx_room_roomid_key ON Room(RoomID, HotelID);
+
+-- Index 26-27: Archive lists, newest archived first
+DROP INDEX IF EXISTS idx_booking_archive_date_key;
+CREATE INDEX idx_booking_archive_date_key ON BookingArchive(ArchiveDate, BookingID);
+DROP INDEX IF EXISTS idx_rental_archive_date_key;
+CREATE INDEX idx_rental_archive_date_key ON RentalArchive(ArchiveDate, RentalID);
+
+-- Index 28-29: Archive lists and exports of one hotel, newest archived first
+DROP INDEX IF EXISTS idx_booking_archive_hotel;
+CREATE INDEX idx_booking_archive_hotel ON BookingArchive(HotelID, ArchiveDate, BookingID);
+DROP INDEX IF EXISTS idx_rental_archive_hotel;
+CREATE INDEX idx_rental_archive_hotel ON RentalArchive(HotelID, ArchiveDate, RentalID);
+
+-- Index 30-31: A customer's archived bookings and rentals
+DROP INDEX IF EXISTS idx_booking_archive_customer;
+CREATE INDEX idx_booking_archive_customer ON BookingArchive(CustomerID);
+DROP INDEX IF EXISTS idx_rental_archive_customer;
+CREATE INDEX idx_rental_archive_customer ON RentalArchive(CustomerID);
+
+-- Index 32-33: Retention job batches, oldest check-out first (only rows in a finished state)
+DROP INDEX IF EXISTS idx_booking_finished_checkout;
+CREATE INDEX idx_booking_finished_checkout ON Booking(CheckOutDate) WHERE Status IN ('Cancelled', 'No-show', 'Checked-in');
+DROP INDEX IF EXISTS idx_rental_completed_checkout;
+CREATE INDEX idx_rental_completed_checkout ON Rental(CheckOutDate) WHERE Status = 'Completed';
+
+-- Index 34: A customer's rentals (archived in one go before a customer delete cascades to them)
+DROP INDEX IF EXISTS idx_rental_customer;
+CREATE INDEX idx_rental_customer ON Rental(CustomerID);
+
+-- Index 35: Dashboard counter deltas of one hotel, added to its HotelDashboard row on read
+DROP INDEX IF EXISTS idx_hotel_dashboard_delta_hotel;
+CREATE INDEX idx_hotel_dashboard_delta_hotel ON HotelDashboardDelta(HotelID);
+
+-- Index 36: Availability version deltas of one hotel, counted into its search ETag
+DROP INDEX IF EXISTS idx_availability_version_delta_hotel;
+CREATE INDEX idx_availability_version_delta_hotel ON AvailabilityVersionDelta(HotelID);
+
+-- Index 37: Expired idempotency completions for the purge job
+DROP INDEX IF EXISTS idx_idempotency_completion_expires;
+CREATE INDEX idx_idempotency_completion_expires ON IdempotencyCompletion(ExpiresAt);
@@ -0,0 +1,37 @@
+-- Migration 001: Add the RoomSummary projection to an existing database
+-- Run after triggers.sql so new changes are tracked while the backfill runs.
+CREATE TABLE IF NOT EXISTS RoomSummary (
+    HotelID INTEGER NOT NULL,
+    RoomID INTEGER NOT NULL,
+    Amenities TEXT,
+    AmenityCount INTEGER NOT NULL DEFAULT 0,
+    LatestProblem VARCHAR(255),
+    PRIMARY KEY (HotelID, RoomID),
+    FOREIGN KEY (HotelID, RoomID) REFERENCES Room(HotelID, RoomID) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+INSERT INTO RoomSummary (HotelID, RoomID, Amenities, AmenityCount, LatestProblem)
+SELECT
+    r.HotelID,
+    r.RoomID,
+    a.Amenities,
+    COALESCE(a.AmenityCount, 0),
+    p.Problem
+FROM Room r
+LEFT JOIN (
+    SELECT HotelID, RoomID, string_agg(Amenity, ', ' ORDER BY Amenity) AS Amenities, COUNT(*) AS AmenityCount
+    FROM RoomAmenities
+    GROUP BY HotelID, RoomID
+) a ON a.HotelID = r.HotelID AND a.RoomID = r.RoomID
+LEFT JOIN (
+    SELECT DISTINCT ON (HotelID, RoomID) HotelID, RoomID, Problem
+    FROM RoomProblems
+    WHERE Resolved = FALSE
+    ORDER BY HotelID, RoomID, ReportDate DESC, Problem
+) p ON p.HotelID = r.HotelID AND p.RoomID = r.RoomID
+ON CONFLICT (HotelID, RoomID) DO UPDATE
+SET Amenities = EXCLUDED.Amenities,
+    AmenityCount = EXCLUDED.AmenityCount,
+    LatestProblem = EXCLUDED.LatestProblem;
+
+ANALYZE RoomSummary;
@@ -0,0 +1,61 @@
+-- Migration 002: Range-typed stay periods with GiST exclusion constraints
+-- Adds Booking/Rental.StayPeriod, refuses to continue if existing rows already
+-- overlap, then adds the exclusion constraints and GiST indexes.
+-- Re-run triggers.sql afterwards so the overlap triggers use StayPeriod.
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE Booking
+    ADD COLUMN IF NOT EXISTS StayPeriod DATERANGE
+        GENERATED ALWAYS AS (daterange(CheckInDate, CheckOutDate, '[)')) STORED;
+
+ALTER TABLE Rental
+    ADD COLUMN IF NOT EXISTS StayPeriod DATERANGE
+        GENERATED ALWAYS AS (daterange(CheckInDate, CheckOutDate, '[)')) STORED;
+
+DO $$
+DECLARE
+    booking_conflicts INTEGER;
+    rental_conflicts INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO booking_conflicts
+    FROM Booking b1
+    JOIN Booking b2
+      ON b1.HotelID = b2.HotelID AND b1.RoomID = b2.RoomID
+     AND b1.BookingID < b2.BookingID
+     AND b1.StayPeriod && b2.StayPeriod
+    WHERE b1.Status IN ('Pending', 'Checked-in')
+      AND b2.Status IN ('Pending', 'Checked-in');
+
+    SELECT COUNT(*) INTO rental_conflicts
+    FROM Rental r1
+    JOIN Rental r2
+      ON r1.HotelID = r2.HotelID AND r1.RoomID = r2.RoomID
+     AND r1.RentalID < r2.RentalID
+     AND r1.StayPeriod && r2.StayPeriod
+    WHERE r1.Status = 'Ongoing' AND r2.Status = 'Ongoing';
+
+    IF booking_conflicts > 0 OR rental_conflicts > 0 THEN
+        RAISE EXCEPTION 'Found % overlapping active booking pair(s) and % overlapping ongoing rental pair(s); resolve them before migrating.',
+            booking_conflicts, rental_conflicts;
+    END IF;
+END $$;
+
+ALTER TABLE Booking DROP CONSTRAINT IF EXISTS EXCL_Booking_Room_Stay;
+ALTER TABLE Booking
+    ADD CONSTRAINT EXCL_Booking_Room_Stay EXCLUDE USING gist (HotelID WITH =, RoomID WITH =, StayPeriod WITH &&)
+        WHERE (Status IN ('Pending', 'Checked-in'));
+
+ALTER TABLE Rental DROP CONSTRAINT IF EXISTS EXCL_Rental_Room_Stay;
+ALTER TABLE Rental
+    ADD CONSTRAINT EXCL_Rental_Room_Stay EXCLUDE USING gist (HotelID WITH =, RoomID WITH =, StayPeriod WITH &&)
+        WHERE (Status = 'Ongoing');
+
+DROP INDEX IF EXISTS idx_rental_stay;
+CREATE INDEX idx_rental_stay ON Rental USING gist (HotelID, RoomID, StayPeriod);
+
+COMMIT;
+
+ANALYZE Booking;
+ANALYZE Rental;
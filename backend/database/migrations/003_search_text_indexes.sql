@@ -0,0 +1,18 @@
+-- Migration 003: Trigram indexes for area/chain search and a normalized Hotel.City
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE Hotel
+    ADD COLUMN IF NOT EXISTS City VARCHAR(255)
+        GENERATED ALWAYS AS (LOWER(TRIM(SPLIT_PART(Address, ',', 2)))) STORED;
+
+DROP INDEX IF EXISTS idx_hotel_address_trgm;
+CREATE INDEX idx_hotel_address_trgm ON Hotel USING gin (Address gin_trgm_ops);
+
+DROP INDEX IF EXISTS idx_hotelchain_name_trgm;
+CREATE INDEX idx_hotelchain_name_trgm ON HotelChain USING gin (ChainName gin_trgm_ops);
+
+DROP INDEX IF EXISTS idx_hotel_city;
+CREATE INDEX idx_hotel_city ON Hotel(City);
+
+ANALYZE Hotel;
+ANALYZE HotelChain;
@@ -0,0 +1,10 @@
+-- Migration 004: Per-hotel availability version counters for the search API ETags
+-- Re-run triggers.sql afterwards so writes start bumping the counters.
+CREATE TABLE IF NOT EXISTS AvailabilityVersion (
+    HotelID INTEGER PRIMARY KEY,
+    Version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO AvailabilityVersion (HotelID, Version)
+SELECT HotelID, 0 FROM Hotel
+ON CONFLICT (HotelID) DO NOTHING;
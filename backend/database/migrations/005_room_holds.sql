@@ -0,0 +1,21 @@
+-- Migration 005: Short-lived room holds taken before a booking is confirmed
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+CREATE UNLOGGED TABLE IF NOT EXISTS RoomHold (
+    HoldID SERIAL PRIMARY KEY,
+    HotelID INTEGER NOT NULL,
+    RoomID INTEGER NOT NULL,
+    CustomerID INTEGER NOT NULL,
+    CheckInDate DATE NOT NULL,
+    CheckOutDate DATE NOT NULL,
+    StayPeriod DATERANGE GENERATED ALWAYS AS (daterange(CheckInDate, CheckOutDate, '[)')) STORED,
+    ExpiresAt TIMESTAMPTZ NOT NULL,
+    FOREIGN KEY (HotelID, RoomID) REFERENCES Room(HotelID, RoomID) ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (CustomerID) REFERENCES Customer(CustomerID) ON DELETE CASCADE
+);
+
+ALTER TABLE RoomHold DROP CONSTRAINT IF EXISTS CHK_RoomHold_Date_Order;
+ALTER TABLE RoomHold DROP CONSTRAINT IF EXISTS EXCL_RoomHold_Room_Stay;
+ALTER TABLE RoomHold
+    ADD CONSTRAINT CHK_RoomHold_Date_Order CHECK (CheckOutDate > CheckInDate),
+    ADD CONSTRAINT EXCL_RoomHold_Room_Stay EXCLUDE USING gist (HotelID WITH =, RoomID WITH =, StayPeriod WITH &&);
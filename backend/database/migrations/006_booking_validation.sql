@@ -0,0 +1,8 @@
+-- Migration 006: Single-pass Booking validation
+-- Re-run triggers.sql first: it replaces trg_prevent_problematic_booking,
+-- trg_limit_active_bookings and trg_prevent_overlapping_booking with
+-- trg_validate_booking and limits trg_update_room_status_booking to updates.
+DROP INDEX IF EXISTS idx_booking_customer_active;
+CREATE INDEX idx_booking_customer_active ON Booking(CustomerID) WHERE Status IN ('Pending', 'Checked-in');
+
+ANALYZE Booking;
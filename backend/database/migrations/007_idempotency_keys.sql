@@ -0,0 +1,19 @@
+-- Migration 007: Idempotency keys for booking, rental and payment POSTs
+CREATE TABLE IF NOT EXISTS IdempotencyKey (
+    UserType VARCHAR(20) NOT NULL,
+    UserID INTEGER NOT NULL,
+    Endpoint VARCHAR(100) NOT NULL,
+    IdemKey VARCHAR(255) NOT NULL,
+    RequestHash CHAR(64) NOT NULL,
+    ResponseStatus INTEGER,
+    ResponseType VARCHAR(100),
+    ResponseLocation TEXT,
+    ResponseBody TEXT,
+    Flashes JSONB NOT NULL DEFAULT '[]',
+    CreatedAt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    ExpiresAt TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (UserType, UserID, Endpoint, IdemKey)
+);
+
+DROP INDEX IF EXISTS idx_idempotency_key_expires;
+CREATE INDEX idx_idempotency_key_expires ON IdempotencyKey(ExpiresAt);
@@ -0,0 +1,20 @@
+-- Migration 008: Queue table for queued booking mode
+CREATE TABLE IF NOT EXISTS BookingRequest (
+    RequestID BIGSERIAL PRIMARY KEY,
+    CustomerID INTEGER NOT NULL,
+    HotelID INTEGER NOT NULL,
+    RoomID INTEGER NOT NULL,
+    CheckInDate DATE NOT NULL,
+    CheckOutDate DATE NOT NULL,
+    HoldID INTEGER,
+    Status VARCHAR(20) NOT NULL DEFAULT 'Queued' CHECK (Status IN ('Queued', 'Booked', 'Failed')),
+    Message VARCHAR(255),
+    BookingID INTEGER,
+    CreatedAt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    ProcessedAt TIMESTAMPTZ,
+    FOREIGN KEY (CustomerID) REFERENCES Customer(CustomerID) ON DELETE CASCADE,
+    FOREIGN KEY (HotelID, RoomID) REFERENCES Room(HotelID, RoomID) ON DELETE CASCADE
+);
+
+DROP INDEX IF EXISTS idx_booking_request_queued;
+CREATE INDEX idx_booking_request_queued ON BookingRequest(RequestID) WHERE Status = 'Queued';
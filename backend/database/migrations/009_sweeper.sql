@@ -0,0 +1,13 @@
+-- Migration 009: No-show bookings and sweeper indexes
+-- Re-run triggers.sql first: update_room_status_booking releases the room of a no-show.
+ALTER TABLE Booking DROP CONSTRAINT IF EXISTS CHK_Booking_Status;
+ALTER TABLE Booking
+    ADD CONSTRAINT CHK_Booking_Status CHECK (Status IN ('Pending', 'Checked-in', 'Cancelled', 'No-show'));
+
+-- Index 16: Sweeper batches of rentals to complete (only Ongoing rows, oldest check-out first)
+DROP INDEX IF EXISTS idx_rental_ongoing_checkout;
+CREATE INDEX idx_rental_ongoing_checkout ON Rental(CheckOutDate) WHERE Status = 'Ongoing';
+
+-- Index 17: Sweeper batches of no-show bookings (only Pending rows, oldest check-in first)
+DROP INDEX IF EXISTS idx_booking_pending_checkin;
+CREATE INDEX idx_booking_pending_checkin ON Booking(CheckInDate) WHERE Status = 'Pending';
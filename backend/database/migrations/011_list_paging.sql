@@ -0,0 +1,23 @@
+-- Migration 011: Keyset indexes for the paged employee list pages
+
+-- Index 21-22: Employee booking list, newest check-in first, continued from a (CheckInDate, BookingID) cursor
+DROP INDEX IF EXISTS idx_booking_checkin_key;
+CREATE INDEX idx_booking_checkin_key ON Booking(CheckInDate, BookingID);
+DROP INDEX IF EXISTS idx_booking_hotel_checkin_key;
+CREATE INDEX idx_booking_hotel_checkin_key ON Booking(HotelID, CheckInDate, BookingID);
+
+-- Index 23-24: Employee rental list, same as bookings
+DROP INDEX IF EXISTS idx_rental_checkin_key;
+CREATE INDEX idx_rental_checkin_key ON Rental(CheckInDate, RentalID);
+DROP INDEX IF EXISTS idx_rental_hotel_checkin_key;
+CREATE INDEX idx_rental_hotel_checkin_key ON Rental(HotelID, CheckInDate, RentalID);
+
+-- Index 25: Admin room list by room number across hotels
+DROP INDEX IF EXISTS idx_room_roomid_key;
+CREATE INDEX idx_room_roomid_key ON Room(RoomID, HotelID);
+
+-- Index 26-27: Archive lists, newest archived first
+DROP INDEX IF EXISTS idx_booking_archive_date_key;
+CREATE INDEX idx_booking_archive_date_key ON BookingArchive(ArchiveDate, BookingID);
+DROP INDEX IF EXISTS idx_rental_archive_date_key;
+CREATE INDEX idx_rental_archive_date_key ON RentalArchive(ArchiveDate, RentalID);
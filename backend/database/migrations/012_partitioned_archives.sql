@@ -0,0 +1,173 @@
+-- Migration 012: Partitioned archive tables with HotelID and CustomerID
+-- Run with psql in autocommit mode (the backfill commits every batch), then re-run triggers.sql
+-- so archive_booking and archive_rental fill the new columns.
+--
+-- The old tables are renamed to *_old and copied over 10000 rows per transaction; they are
+-- dropped at the end only if every row made it across. Old rows carry no IDs, so HotelID and
+-- CustomerID are recovered from HotelName and CustomerName where that name is unique, and stay
+-- NULL otherwise. Rows archived while the migration runs are written to the new tables by the
+-- old trigger functions and get the same treatment at the end.
+
+ALTER TABLE BookingArchive RENAME TO BookingArchive_old;
+ALTER TABLE RentalArchive RENAME TO RentalArchive_old;
+ALTER TABLE BookingArchive_old RENAME CONSTRAINT bookingarchive_pkey TO bookingarchive_old_pkey;
+ALTER TABLE RentalArchive_old RENAME CONSTRAINT rentalarchive_pkey TO rentalarchive_old_pkey;
+DROP INDEX IF EXISTS idx_booking_archive_date_key;
+DROP INDEX IF EXISTS idx_rental_archive_date_key;
+
+-- Booking Archive Table (partitioned by year of ArchiveDate, see create_archive_partition below)
+CREATE TABLE BookingArchive (
+    BookingID INTEGER NOT NULL,
+    CustomerID INTEGER,
+    HotelID INTEGER,
+    CustomerName VARCHAR(100) NOT NULL,
+    HotelName VARCHAR(100) NOT NULL,
+    RoomIdentifier VARCHAR(20) NOT NULL,
+    BookingDate DATE NOT NULL,
+    CheckInDate DATE NOT NULL,
+    CheckOutDate DATE NOT NULL,
+    Status VARCHAR(20) NOT NULL,
+    ArchiveDate DATE NOT NULL DEFAULT CURRENT_DATE,
+    PRIMARY KEY (BookingID, ArchiveDate)
+) PARTITION BY RANGE (ArchiveDate);
+
+-- Rental Archive Table (partitioned like BookingArchive)
+CREATE TABLE RentalArchive (
+    RentalID INTEGER NOT NULL,
+    CustomerID INTEGER,
+    HotelID INTEGER,
+    CustomerName VARCHAR(100) NOT NULL,
+    HotelName VARCHAR(100) NOT NULL,
+    RoomIdentifier VARCHAR(20) NOT NULL,
+    EmployeeName VARCHAR(100),
+    BookingID INTEGER,
+    CheckInDate DATE NOT NULL,
+    CheckOutDate DATE NOT NULL,
+    Status VARCHAR(20) NOT NULL,
+    PaymentAmount DECIMAL(10, 2) NOT NULL,
+    PaymentDate DATE,
+    PaymentMethod VARCHAR(50),
+    ArchiveDate DATE NOT NULL DEFAULT CURRENT_DATE,
+    PRIMARY KEY (RentalID, ArchiveDate)
+) PARTITION BY RANGE (ArchiveDate);
+
+CREATE TABLE BookingArchive_default PARTITION OF BookingArchive DEFAULT;
+CREATE TABLE RentalArchive_default PARTITION OF RentalArchive DEFAULT;
+
+CREATE OR REPLACE FUNCTION create_archive_partition(parent TEXT, year INTEGER) RETURNS VOID AS $$
+DECLARE
+    part TEXT := lower(parent) || '_' || year;
+    lo DATE := make_date(year, 1, 1);
+    hi DATE := make_date(year + 1, 1, 1);
+BEGIN
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', part, lower(parent));
+    EXECUTE format('WITH moved AS (DELETE FROM %I WHERE ArchiveDate >= $1 AND ArchiveDate < $2 RETURNING *)
+                    INSERT INTO %I SELECT * FROM moved', lower(parent) || '_default', part) USING lo, hi;
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', lower(parent), part, lo, hi);
+END;
+$$ LANGUAGE plpgsql;
+
+-- One partition for every year that has archived rows, through next year.
+SELECT create_archive_partition(parent, year)
+FROM unnest(ARRAY['BookingArchive', 'RentalArchive']) parent,
+     generate_series(
+         LEAST((SELECT EXTRACT(YEAR FROM MIN(ArchiveDate)) FROM BookingArchive_old),
+               (SELECT EXTRACT(YEAR FROM MIN(ArchiveDate)) FROM RentalArchive_old),
+               EXTRACT(YEAR FROM CURRENT_DATE))::INTEGER,
+         EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 1) year;
+
+-- Index 26-27: Archive lists, newest archived first
+CREATE INDEX idx_booking_archive_date_key ON BookingArchive(ArchiveDate, BookingID);
+CREATE INDEX idx_rental_archive_date_key ON RentalArchive(ArchiveDate, RentalID);
+
+-- Index 28-29: Archive lists and exports of one hotel, newest archived first
+CREATE INDEX idx_booking_archive_hotel ON BookingArchive(HotelID, ArchiveDate, BookingID);
+CREATE INDEX idx_rental_archive_hotel ON RentalArchive(HotelID, ArchiveDate, RentalID);
+
+-- Index 30-31: A customer's archived bookings and rentals
+CREATE INDEX idx_booking_archive_customer ON BookingArchive(CustomerID);
+CREATE INDEX idx_rental_archive_customer ON RentalArchive(CustomerID);
+
+-- Names that identify exactly one hotel or customer, for recovering the IDs of old rows.
+CREATE TEMP TABLE archive_hotel_names AS
+    SELECT HotelName AS Name, MIN(HotelID) AS ID FROM Hotel GROUP BY HotelName HAVING COUNT(*) = 1;
+CREATE TEMP TABLE archive_customer_names AS
+    SELECT FullName AS Name, MIN(CustomerID) AS ID FROM Customer GROUP BY FullName HAVING COUNT(*) = 1;
+CREATE UNIQUE INDEX ON archive_hotel_names(Name);
+CREATE UNIQUE INDEX ON archive_customer_names(Name);
+ANALYZE archive_hotel_names, archive_customer_names;
+
+DO $$
+DECLARE
+    last_id INTEGER := (SELECT MIN(BookingID) - 1 FROM BookingArchive_old);
+    copied INTEGER;
+BEGIN
+    LOOP
+        WITH batch AS (
+            INSERT INTO BookingArchive (
+                BookingID, CustomerID, HotelID, CustomerName, HotelName, RoomIdentifier,
+                BookingDate, CheckInDate, CheckOutDate, Status, ArchiveDate
+            )
+            SELECT o.BookingID, c.ID, h.ID, o.CustomerName, o.HotelName, o.RoomIdentifier,
+                   o.BookingDate, o.CheckInDate, o.CheckOutDate, o.Status, o.ArchiveDate
+            FROM (SELECT * FROM BookingArchive_old WHERE BookingID > last_id ORDER BY BookingID LIMIT 10000) o
+            LEFT JOIN archive_customer_names c ON c.Name = o.CustomerName
+            LEFT JOIN archive_hotel_names h ON h.Name = o.HotelName
+            RETURNING BookingID
+        )
+        SELECT COUNT(*), MAX(BookingID) INTO copied, last_id FROM batch;
+        EXIT WHEN copied = 0;
+        COMMIT;
+    END LOOP;
+END $$;
+
+DO $$
+DECLARE
+    last_id INTEGER := (SELECT MIN(RentalID) - 1 FROM RentalArchive_old);
+    copied INTEGER;
+BEGIN
+    LOOP
+        WITH batch AS (
+            INSERT INTO RentalArchive (
+                RentalID, CustomerID, HotelID, CustomerName, HotelName, RoomIdentifier, EmployeeName, BookingID,
+                CheckInDate, CheckOutDate, Status, PaymentAmount, PaymentDate, PaymentMethod, ArchiveDate
+            )
+            SELECT o.RentalID, c.ID, h.ID, o.CustomerName, o.HotelName, o.RoomIdentifier, o.EmployeeName, o.BookingID,
+                   o.CheckInDate, o.CheckOutDate, o.Status, o.PaymentAmount, o.PaymentDate, o.PaymentMethod, o.ArchiveDate
+            FROM (SELECT * FROM RentalArchive_old WHERE RentalID > last_id ORDER BY RentalID LIMIT 10000) o
+            LEFT JOIN archive_customer_names c ON c.Name = o.CustomerName
+            LEFT JOIN archive_hotel_names h ON h.Name = o.HotelName
+            RETURNING RentalID
+        )
+        SELECT COUNT(*), MAX(RentalID) INTO copied, last_id FROM batch;
+        EXIT WHEN copied = 0;
+        COMMIT;
+    END LOOP;
+END $$;
+
+-- Rows the old trigger functions archived into the new tables while the copy ran.
+UPDATE BookingArchive a
+SET HotelID = (SELECT ID FROM archive_hotel_names WHERE Name = a.HotelName),
+    CustomerID = (SELECT ID FROM archive_customer_names WHERE Name = a.CustomerName)
+WHERE a.HotelID IS NULL AND a.CustomerID IS NULL
+  AND NOT EXISTS (SELECT 1 FROM BookingArchive_old o WHERE o.BookingID = a.BookingID);
+UPDATE RentalArchive a
+SET HotelID = (SELECT ID FROM archive_hotel_names WHERE Name = a.HotelName),
+    CustomerID = (SELECT ID FROM archive_customer_names WHERE Name = a.CustomerName)
+WHERE a.HotelID IS NULL AND a.CustomerID IS NULL
+  AND NOT EXISTS (SELECT 1 FROM RentalArchive_old o WHERE o.RentalID = a.RentalID);
+
+DO $$
+BEGIN
+    IF (SELECT COUNT(*) FROM BookingArchive_old) > (SELECT COUNT(*) FROM BookingArchive)
+       OR (SELECT COUNT(*) FROM RentalArchive_old) > (SELECT COUNT(*) FROM RentalArchive) THEN
+        RAISE EXCEPTION 'Archive backfill incomplete; BookingArchive_old and RentalArchive_old were kept';
+    END IF;
+    DROP TABLE BookingArchive_old;
+    DROP TABLE RentalArchive_old;
+END $$;
+
+ANALYZE BookingArchive, RentalArchive;
@@ -0,0 +1,8 @@
+-- Migration 013: Age-based archival of finished bookings and rentals
+-- Re-run triggers.sql as well: archive_booking and archive_rental can now be switched off per transaction.
+
+-- Index 32-33: Retention job batches, oldest check-out first (only rows in a finished state)
+DROP INDEX IF EXISTS idx_booking_finished_checkout;
+CREATE INDEX idx_booking_finished_checkout ON Booking(CheckOutDate) WHERE Status IN ('Cancelled', 'No-show', 'Checked-in');
+DROP INDEX IF EXISTS idx_rental_completed_checkout;
+CREATE INDEX idx_rental_completed_checkout ON Rental(CheckOutDate) WHERE Status = 'Completed';
@@ -0,0 +1,7 @@
+-- Migration 014: Statement-level archive triggers
+-- Re-run triggers.sql: archive_booking and archive_rental become AFTER DELETE ... FOR EACH STATEMENT
+-- triggers over transition tables, and Customer and Hotel deletes archive their stays up front.
+
+-- Index 34: A customer's rentals (archived in one go before a customer delete cascades to them)
+DROP INDEX IF EXISTS idx_rental_customer;
+CREATE INDEX idx_rental_customer ON Rental(CustomerID);
@@ -0,0 +1,11 @@
+-- Migration 015: Statement-level RoomProblems status trigger
+-- Re-run triggers.sql first: it replaces trg_mark_out_of_order, trg_mark_room_out_of_order,
+-- trg_restore_available_status and trg_restore_status_on_delete with one function,
+-- sync_room_status_from_problems, fired once per INSERT, UPDATE and DELETE statement.
+
+-- Rooms the old per-row triggers left Available despite an open problem.
+UPDATE Room r
+SET Status = 'Out-of-Order'
+WHERE r.Status = 'Available'
+  AND EXISTS (SELECT 1 FROM RoomProblems p
+              WHERE p.HotelID = r.HotelID AND p.RoomID = r.RoomID AND p.Resolved = FALSE);
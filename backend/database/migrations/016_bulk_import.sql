@@ -0,0 +1,7 @@
+-- Migration 016: Statement-level insert triggers for bulk room imports
+-- Re-run triggers.sql: inserts into Room and RoomAmenities now refresh RoomSummary, bump
+-- AvailabilityVersion and count Out-of-Order rooms once per statement
+-- (trg_room_summary_room, trg_room_summary_amenities_insert, trg_availability_version_room_insert,
+-- trg_availability_version_amenities_insert, trg_dashboard_room_insert). Updates and deletes keep
+-- their per-row triggers. Nothing else changes: flask import-csv stages its CSV files in
+-- temporary tables.
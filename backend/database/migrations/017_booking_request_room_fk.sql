@@ -0,0 +1,10 @@
+-- Migration 017: BookingRequest must name an existing room
+-- Databases that ran migration 008 before it gained the foreign key get it here; requests
+-- for rooms that no longer exist could never be booked and are dropped first.
+DELETE FROM BookingRequest q
+WHERE NOT EXISTS (SELECT 1 FROM Room r WHERE r.HotelID = q.HotelID AND r.RoomID = q.RoomID);
+
+ALTER TABLE BookingRequest DROP CONSTRAINT IF EXISTS bookingrequest_hotelid_roomid_fkey;
+ALTER TABLE BookingRequest
+    ADD CONSTRAINT bookingrequest_hotelid_roomid_fkey
+    FOREIGN KEY (HotelID, RoomID) REFERENCES Room(HotelID, RoomID) ON DELETE CASCADE;
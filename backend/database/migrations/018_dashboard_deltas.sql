@@ -0,0 +1,36 @@
+-- Migration 018: Append-only dashboard counter deltas
+-- Re-run triggers.sql after this, so adjust_hotel_dashboard appends to HotelDashboardDelta
+-- instead of updating HotelDashboard; `flask sweep` folds the deltas back in.
+
+-- Hotel Dashboard Delta (counter changes appended by triggers; the dashboard adds them to HotelDashboard on read)
+CREATE TABLE IF NOT EXISTS HotelDashboardDelta (
+    DeltaID BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    HotelID INTEGER NOT NULL,
+    PendingBookings INTEGER NOT NULL DEFAULT 0,
+    InHouseRentals INTEGER NOT NULL DEFAULT 0,
+    OutOfOrderRooms INTEGER NOT NULL DEFAULT 0
+);
+
+-- Index 35: Dashboard counter deltas of one hotel, added to its HotelDashboard row on read
+DROP INDEX IF EXISTS idx_hotel_dashboard_delta_hotel;
+CREATE INDEX idx_hotel_dashboard_delta_hotel ON HotelDashboardDelta(HotelID);
+
+-- Counters are recomputed from scratch. Deltas are dropped in the same statement, so the
+-- ones it drops are exactly the ones already in the recount; confirm with `flask dashboard-check`.
+WITH dropped AS (
+    DELETE FROM HotelDashboardDelta
+)
+INSERT INTO HotelDashboard (HotelID, PendingBookings, InHouseRentals, OutOfOrderRooms)
+SELECT
+    h.HotelID,
+    (SELECT COUNT(*) FROM Booking b WHERE b.HotelID = h.HotelID AND b.Status = 'Pending'),
+    (SELECT COUNT(*) FROM Rental r WHERE r.HotelID = h.HotelID AND r.Status = 'Ongoing'),
+    (SELECT COUNT(*) FROM Room m WHERE m.HotelID = h.HotelID AND m.Status = 'Out-of-Order')
+FROM Hotel h
+ON CONFLICT (HotelID) DO UPDATE
+SET PendingBookings = EXCLUDED.PendingBookings,
+    InHouseRentals = EXCLUDED.InHouseRentals,
+    OutOfOrderRooms = EXCLUDED.OutOfOrderRooms;
+
+ANALYZE HotelDashboardDelta;
+ANALYZE HotelDashboard;
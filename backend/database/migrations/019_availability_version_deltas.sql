@@ -0,0 +1,16 @@
+-- Migration 019: Append-only availability version deltas
+-- Re-run triggers.sql after this, so bump_availability_version appends to
+-- AvailabilityVersionDelta instead of updating AvailabilityVersion; `flask sweep` folds
+-- the deltas back in. Existing counters stay as they are, so current ETags stay valid.
+
+-- Availability Version Delta (one row appended by triggers per write that can change a hotel's search results)
+CREATE TABLE IF NOT EXISTS AvailabilityVersionDelta (
+    DeltaID BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    HotelID INTEGER NOT NULL
+);
+
+-- Index 36: Availability version deltas of one hotel, counted into its search ETag
+DROP INDEX IF EXISTS idx_availability_version_delta_hotel;
+CREATE INDEX idx_availability_version_delta_hotel ON AvailabilityVersionDelta(HotelID);
+
+ANALYZE AvailabilityVersionDelta;
@@ -0,0 +1,17 @@
+-- Migration 020: Idempotency completions
+-- A keyed POST now records its key here in the same transaction as its write, so a retry
+-- whose IdempotencyKey row was lost after the write committed is not run a second time.
+CREATE TABLE IF NOT EXISTS IdempotencyCompletion (
+    UserType VARCHAR(20) NOT NULL,
+    UserID INTEGER NOT NULL,
+    Endpoint VARCHAR(100) NOT NULL,
+    IdemKey VARCHAR(255) NOT NULL,
+    RequestHash CHAR(64) NOT NULL,
+    CompletedAt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    ExpiresAt TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (UserType, UserID, Endpoint, IdemKey)
+);
+
+-- Index 37: Expired idempotency completions for the purge job
+DROP INDEX IF EXISTS idx_idempotency_completion_expires;
+CREATE INDEX idx_idempotency_completion_expires ON IdempotencyCompletion(ExpiresAt);
@@ -32,6 +32,7 @@ CREATE TABLE Hotel (
     Category VARCHAR(50) NOT NULL,
     Num_Rooms INTEGER NOT NULL,
     ManagerID INTEGER,
+    City VARCHAR(255) GENERATED ALWAYS AS (LOWER(TRIM(SPLIT_PART(Address, ',', 2)))) STORED,
     FOREIGN KEY (HotelChainID) REFERENCES HotelChain(HotelChainID) ON DELETE CASCADE
 );
 
@@ -119,6 +120,7 @@ CREATE TABLE Booking (
     CheckInDate DATE NOT NULL,
     CheckOutDate DATE NOT NULL,
     Status VARCHAR(20) NOT NULL,
+    StayPeriod DATERANGE GENERATED ALWAYS AS (daterange(CheckInDate, CheckOutDate, '[)')) STORED,
     FOREIGN KEY (CustomerID) REFERENCES Customer(CustomerID) ON DELETE CASCADE,
     FOREIGN KEY (HotelID, RoomID) REFERENCES Room(HotelID, RoomID) ON DELETE CASCADE
 );
@@ -137,15 +139,18 @@ CREATE TABLE Rental (
     PaymentAmount DECIMAL(10, 2) NOT NULL,
     PaymentDate DATE NOT NULL,
     PaymentMethod VARCHAR(50) NOT NULL,
+    StayPeriod DATERANGE GENERATED ALWAYS AS (daterange(CheckInDate, CheckOutDate, '[)')) STORED,
     FOREIGN KEY (CustomerID) REFERENCES Customer(CustomerID) ON DELETE CASCADE,
     FOREIGN KEY (HotelID, RoomID) REFERENCES Room(HotelID, RoomID) ON DELETE CASCADE,
     FOREIGN KEY (EmployeeID) REFERENCES Employee(EmployeeID) ON DELETE SET NULL,
     FOREIGN KEY (BookingID) REFERENCES Booking(BookingID) ON DELETE SET NULL
 );
 
--- Booking Archive Table
+-- Booking Archive Table (partitioned by year of ArchiveDate, see create_archive_partition below)
 CREATE TABLE BookingArchive (
-    BookingID INTEGER PRIMARY KEY,
+    BookingID INTEGER NOT NULL,
+    CustomerID INTEGER,
+    HotelID INTEGER,
     CustomerName VARCHAR(100) NOT NULL,
     HotelName VARCHAR(100) NOT NULL,
     RoomIdentifier VARCHAR(20) NOT NULL,
@@ -153,12 +158,15 @@ CREATE TABLE BookingArchive (
     CheckInDate DATE NOT NULL,
     CheckOutDate DATE NOT NULL,
     Status VARCHAR(20) NOT NULL,
-    ArchiveDate DATE NOT NULL DEFAULT CURRENT_DATE
-);
+    ArchiveDate DATE NOT NULL DEFAULT CURRENT_DATE,
+    PRIMARY KEY (BookingID, ArchiveDate)
+) PARTITION BY RANGE (ArchiveDate);
 
--- Rental Archive Table
+-- Rental Archive Table (partitioned like BookingArchive)
 CREATE TABLE RentalArchive (
-    RentalID INTEGER PRIMARY KEY,
+    RentalID INTEGER NOT NULL,
+    CustomerID INTEGER,
+    HotelID INTEGER,
     CustomerName VARCHAR(100) NOT NULL,
     HotelName VARCHAR(100) NOT NULL,
     RoomIdentifier VARCHAR(20) NOT NULL,
@@ -170,5 +178,152 @@ CREATE TABLE RentalArchive (
     PaymentAmount DECIMAL(10, 2) NOT NULL,
     PaymentDate DATE,
     PaymentMethod VARCHAR(50),
-    ArchiveDate DATE NOT NULL DEFAULT CURRENT_DATE
+    ArchiveDate DATE NOT NULL DEFAULT CURRENT_DATE,
+    PRIMARY KEY (RentalID, ArchiveDate)
+) PARTITION BY RANGE (ArchiveDate);
+
+-- Archive partitions: one per year, plus a default partition for years nobody created yet.
+-- HotelID and CustomerID are copied from the deleted row; no foreign keys, since the archive outlives both.
+CREATE TABLE BookingArchive_default PARTITION OF BookingArchive DEFAULT;
+CREATE TABLE RentalArchive_default PARTITION OF RentalArchive DEFAULT;
+
+-- Creates the partition of bookingarchive or rentalarchive for one year, moving any rows
+-- for that year out of the default partition first. Does nothing if it already exists.
+CREATE OR REPLACE FUNCTION create_archive_partition(parent TEXT, year INTEGER) RETURNS VOID AS $$
+DECLARE
+    part TEXT := lower(parent) || '_' || year;
+    lo DATE := make_date(year, 1, 1);
+    hi DATE := make_date(year + 1, 1, 1);
+BEGIN
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', part, lower(parent));
+    EXECUTE format('WITH moved AS (DELETE FROM %I WHERE ArchiveDate >= $1 AND ArchiveDate < $2 RETURNING *)
+                    INSERT INTO %I SELECT * FROM moved', lower(parent) || '_default', part) USING lo, hi;
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', lower(parent), part, lo, hi);
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_archive_partition(parent, year)
+FROM unnest(ARRAY['BookingArchive', 'RentalArchive']) parent,
+     generate_series(EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 1) year;
+
+-- Room Summary (one row per room, maintained by triggers for room search)
+CREATE TABLE RoomSummary (
+    HotelID INTEGER NOT NULL,
+    RoomID INTEGER NOT NULL,
+    Amenities TEXT,
+    AmenityCount INTEGER NOT NULL DEFAULT 0,
+    LatestProblem VARCHAR(255),
+    PRIMARY KEY (HotelID, RoomID),
+    FOREIGN KEY (HotelID, RoomID) REFERENCES Room(HotelID, RoomID) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+-- Availability Version (per-hotel write counters, folded in from AvailabilityVersionDelta by the sweeper)
+-- No foreign key: rows for deleted hotels are harmless and a cascade must not block the bump.
+CREATE TABLE AvailabilityVersion (
+    HotelID INTEGER PRIMARY KEY,
+    Version BIGINT NOT NULL DEFAULT 0
+);
+
+-- Availability Version Delta (one row appended by triggers per write that can change a hotel's search results)
+-- A hotel's version is its AvailabilityVersion plus its delta count. Insert-only, so writes never wait on each other for it.
+CREATE TABLE AvailabilityVersionDelta (
+    DeltaID BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    HotelID INTEGER NOT NULL
+);
+
+-- Room Hold (short-lived claim on a room for a stay while the customer confirms the booking)
+-- Unlogged: holds only live for minutes, so losing them in a crash is harmless.
+CREATE UNLOGGED TABLE RoomHold (
+    HoldID SERIAL PRIMARY KEY,
+    HotelID INTEGER NOT NULL,
+    RoomID INTEGER NOT NULL,
+    CustomerID INTEGER NOT NULL,
+    CheckInDate DATE NOT NULL,
+    CheckOutDate DATE NOT NULL,
+    StayPeriod DATERANGE GENERATED ALWAYS AS (daterange(CheckInDate, CheckOutDate, '[)')) STORED,
+    ExpiresAt TIMESTAMPTZ NOT NULL,
+    FOREIGN KEY (HotelID, RoomID) REFERENCES Room(HotelID, RoomID) ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (CustomerID) REFERENCES Customer(CustomerID) ON DELETE CASCADE
+);
+
+-- Idempotency Key (response of a keyed POST, replayed when the same request is retried)
+CREATE TABLE IdempotencyKey (
+    UserType VARCHAR(20) NOT NULL,
+    UserID INTEGER NOT NULL,
+    Endpoint VARCHAR(100) NOT NULL,
+    IdemKey VARCHAR(255) NOT NULL,
+    RequestHash CHAR(64) NOT NULL,
+    ResponseStatus INTEGER,
+    ResponseType VARCHAR(100),
+    ResponseLocation TEXT,
+    ResponseBody TEXT,
+    Flashes JSONB NOT NULL DEFAULT '[]',
+    CreatedAt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    ExpiresAt TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (UserType, UserID, Endpoint, IdemKey)
+);
+
+-- Idempotency Completion (a keyed POST's write committed; inserted in the write's own transaction)
+-- Lets a retry tell a finished write from a failed one when the IdempotencyKey row was lost.
+CREATE TABLE IdempotencyCompletion (
+    UserType VARCHAR(20) NOT NULL,
+    UserID INTEGER NOT NULL,
+    Endpoint VARCHAR(100) NOT NULL,
+    IdemKey VARCHAR(255) NOT NULL,
+    RequestHash CHAR(64) NOT NULL,
+    CompletedAt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    ExpiresAt TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (UserType, UserID, Endpoint, IdemKey)
+);
+
+-- Booking Request (book_room requests queued for the booking workers in queued mode)
+CREATE TABLE BookingRequest (
+    RequestID BIGSERIAL PRIMARY KEY,
+    CustomerID INTEGER NOT NULL,
+    HotelID INTEGER NOT NULL,
+    RoomID INTEGER NOT NULL,
+    CheckInDate DATE NOT NULL,
+    CheckOutDate DATE NOT NULL,
+    HoldID INTEGER,
+    Status VARCHAR(20) NOT NULL DEFAULT 'Queued' CHECK (Status IN ('Queued', 'Booked', 'Failed')),
+    Message VARCHAR(255),
+    BookingID INTEGER,
+    CreatedAt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    ProcessedAt TIMESTAMPTZ,
+    FOREIGN KEY (CustomerID) REFERENCES Customer(CustomerID) ON DELETE CASCADE,
+    FOREIGN KEY (HotelID, RoomID) REFERENCES Room(HotelID, RoomID) ON DELETE CASCADE
+);
+
+-- Upcoming Arrival (employee dashboard read model: one row per active booking not yet turned into a rental)
+-- Kept by triggers; no foreign keys, so cascades never have to wait on it. Rows are removed with their booking.
+CREATE TABLE UpcomingArrival (
+    BookingID INTEGER PRIMARY KEY,
+    HotelID INTEGER NOT NULL,
+    RoomID INTEGER NOT NULL,
+    CustomerName VARCHAR(100) NOT NULL,
+    HotelName VARCHAR(255) NOT NULL,
+    CheckInDate DATE NOT NULL,
+    CheckOutDate DATE NOT NULL,
+    Status VARCHAR(20) NOT NULL
+);
+
+-- Hotel Dashboard (per-hotel counters for the employee dashboard, folded in from HotelDashboardDelta by the sweeper)
+CREATE TABLE HotelDashboard (
+    HotelID INTEGER PRIMARY KEY,
+    PendingBookings INTEGER NOT NULL DEFAULT 0,
+    InHouseRentals INTEGER NOT NULL DEFAULT 0,
+    OutOfOrderRooms INTEGER NOT NULL DEFAULT 0
+);
+
+-- Hotel Dashboard Delta (counter changes appended by triggers; the dashboard adds them to HotelDashboard on read)
+-- Insert-only, so booking, rental and room writes never wait on each other for a hotel's counters.
+CREATE TABLE HotelDashboardDelta (
+    DeltaID BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    HotelID INTEGER NOT NULL,
+    PendingBookings INTEGER NOT NULL DEFAULT 0,
+    InHouseRentals INTEGER NOT NULL DEFAULT 0,
+    OutOfOrderRooms INTEGER NOT NULL DEFAULT 0
 );
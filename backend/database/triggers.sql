@@ -1,52 +1,84 @@
--- Trigger 1: Prevent booking a room with unresolved problems
+-- Trigger 1: Validate new bookings in one pass (replaces the separate problem,
+-- active-booking-limit and overlap triggers; the error messages are unchanged
+-- and checked in the order those triggers used to fire) and set the room status
 DROP TRIGGER IF EXISTS trg_prevent_problematic_booking ON Booking;
-DROP FUNCTION IF EXISTS prevent_problematic_booking CASCADE;
-
-CREATE OR REPLACE FUNCTION prevent_problematic_booking() RETURNS TRIGGER AS $$
-BEGIN
-    IF EXISTS (
-        SELECT 1
-        FROM RoomProblems
-        WHERE HotelID = NEW.HotelID
-          AND RoomID = NEW.RoomID
-          AND Resolved = FALSE
-    ) THEN
-        RAISE EXCEPTION '⛔ Cannot book room with unresolved problems.';
-    END IF;
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
-
-CREATE TRIGGER trg_prevent_problematic_booking
-BEFORE INSERT ON Booking
-FOR EACH ROW
-EXECUTE FUNCTION prevent_problematic_booking();
-
--- Trigger 2: Enforce max 5 active bookings per customer
 DROP TRIGGER IF EXISTS trg_limit_active_bookings ON Booking;
+DROP TRIGGER IF EXISTS trg_prevent_overlapping_booking ON Booking;
+DROP TRIGGER IF EXISTS trg_validate_booking ON Booking;
+DROP FUNCTION IF EXISTS prevent_problematic_booking CASCADE;
 DROP FUNCTION IF EXISTS limit_active_bookings CASCADE;
+DROP FUNCTION IF EXISTS prevent_overlapping_booking CASCADE;
+DROP FUNCTION IF EXISTS validate_booking CASCADE;
 
-CREATE OR REPLACE FUNCTION limit_active_bookings() RETURNS TRIGGER AS $$
+CREATE OR REPLACE FUNCTION validate_booking() RETURNS TRIGGER AS $$
 DECLARE
+    -- Generated columns are not filled in yet for BEFORE triggers
+    new_stay DATERANGE := daterange(NEW.CheckInDate, NEW.CheckOutDate, '[)');
     active_bookings_count INTEGER;
+    overlapping BOOLEAN;
+    has_problems BOOLEAN;
+    new_room_status VARCHAR(20);
 BEGIN
-    SELECT COUNT(*) INTO active_bookings_count
-    FROM Booking
-    WHERE CustomerID = NEW.CustomerID
-      AND Status IN ('Pending', 'Checked-in');
+    -- One query for all three checks; the count stops at the limit
+    SELECT
+        (SELECT COUNT(*) FROM (
+            SELECT 1 FROM Booking
+            WHERE CustomerID = NEW.CustomerID
+              AND Status IN ('Pending', 'Checked-in')
+            LIMIT 5
+        ) active),
+        EXISTS (
+            SELECT 1 FROM Booking
+            WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID
+              AND Status IN ('Pending', 'Checked-in')
+              AND StayPeriod && new_stay
+        ) OR EXISTS (
+            SELECT 1 FROM Rental
+            WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID
+              AND StayPeriod && new_stay
+        ),
+        EXISTS (
+            SELECT 1 FROM RoomProblems
+            WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID
+              AND Resolved = FALSE
+        )
+    INTO active_bookings_count, overlapping, has_problems;
 
     IF active_bookings_count >= 5 THEN
         RAISE EXCEPTION '❌ Customer already has 5 or more active bookings.';
     END IF;
 
+    IF overlapping THEN
+        RAISE EXCEPTION '⛔ Cannot book: Room already booked or rented for selected dates.';
+    END IF;
+
+    IF has_problems THEN
+        RAISE EXCEPTION '⛔ Cannot book room with unresolved problems.';
+    END IF;
+
+    -- What trg_update_room_status_booking used to do after each insert,
+    -- skipped when the room already has that status
+    new_room_status := CASE NEW.Status
+        WHEN 'Pending' THEN 'Booked'
+        WHEN 'Checked-in' THEN 'Occupied'
+        WHEN 'Cancelled' THEN 'Available'
+    END;
+
+    IF new_room_status IS NOT NULL THEN
+        UPDATE Room
+        SET Status = new_room_status
+        WHERE RoomID = NEW.RoomID AND HotelID = NEW.HotelID
+          AND Status IS DISTINCT FROM new_room_status;
+    END IF;
+
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_limit_active_bookings
+CREATE TRIGGER trg_validate_booking
 BEFORE INSERT ON Booking
 FOR EACH ROW
-EXECUTE FUNCTION limit_active_bookings();
+EXECUTE FUNCTION validate_booking();
 
 -- Trigger 3: Prevent cancellation on the day of check-in
 DROP TRIGGER IF EXISTS trg_prevent_late_cancellation ON Booking;
@@ -75,97 +107,125 @@ BEFORE UPDATE ON Booking
 FOR EACH ROW
 EXECUTE FUNCTION prevent_late_cancellation();
 
--- Trigger 4: Archive booking before deletion
+-- Trigger 4: Archive deleted bookings, one joined INSERT per DELETE statement
+-- Rows whose customer or hotel is being deleted too were archived by archive_stays_of_deleted_parent,
+-- while the names could still be read; the joins skip them here.
 DROP TRIGGER IF EXISTS trg_archive_booking ON Booking;
 DROP FUNCTION IF EXISTS archive_booking CASCADE;
 
 CREATE OR REPLACE FUNCTION archive_booking() RETURNS TRIGGER AS $$
-DECLARE
-    hotel_name TEXT;
-    room_code TEXT;
 BEGIN
-    SELECT HotelName INTO hotel_name
-    FROM Hotel WHERE HotelID = OLD.HotelID;
-
-    room_code := 'Room ' || OLD.RoomID;
-
     INSERT INTO BookingArchive (
-        BookingID, CustomerName, HotelName, RoomIdentifier, 
+        BookingID, CustomerID, HotelID, CustomerName, HotelName, RoomIdentifier,
         BookingDate, CheckInDate, CheckOutDate, Status
     )
-    SELECT
-        OLD.BookingID,
-        c.FullName,
-        hotel_name,
-        room_code,
-        OLD.BookingDate,
-        OLD.CheckInDate,
-        OLD.CheckOutDate,
-        OLD.Status
-    FROM Customer c
-    WHERE c.CustomerID = OLD.CustomerID;
-
-    RETURN OLD;
+    SELECT o.BookingID, o.CustomerID, o.HotelID, c.FullName, h.HotelName, 'Room ' || o.RoomID,
+           o.BookingDate, o.CheckInDate, o.CheckOutDate, o.Status
+    FROM deleted_bookings o
+    JOIN Customer c ON c.CustomerID = o.CustomerID
+    JOIN Hotel h ON h.HotelID = o.HotelID
+    ON CONFLICT DO NOTHING;
+
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
 CREATE TRIGGER trg_archive_booking
-BEFORE DELETE ON Booking
-FOR EACH ROW
+AFTER DELETE ON Booking
+REFERENCING OLD TABLE AS deleted_bookings
+FOR EACH STATEMENT
 EXECUTE FUNCTION archive_booking();
 
--- Trigger 5: Archive rental before deletion
+-- Trigger 5: Archive deleted rentals, one joined INSERT per DELETE statement (as Trigger 4)
 DROP TRIGGER IF EXISTS trg_archive_rental ON Rental;
 DROP FUNCTION IF EXISTS archive_rental CASCADE;
 
 CREATE OR REPLACE FUNCTION archive_rental() RETURNS TRIGGER AS $$
-DECLARE
-    hotel_name TEXT;
-    employee_name TEXT;
-    customer_name TEXT;
-    room_code TEXT;
 BEGIN
-    SELECT HotelName INTO hotel_name
-    FROM Hotel WHERE HotelID = OLD.HotelID;
+    INSERT INTO RentalArchive (
+        RentalID, CustomerID, HotelID, CustomerName, HotelName, RoomIdentifier,
+        EmployeeName, BookingID, CheckInDate, CheckOutDate,
+        Status, PaymentAmount, PaymentDate, PaymentMethod
+    )
+    SELECT o.RentalID, o.CustomerID, o.HotelID, c.FullName, h.HotelName, 'Room ' || o.RoomID,
+           e.FullName, o.BookingID, o.CheckInDate, o.CheckOutDate,
+           o.Status, o.PaymentAmount, o.PaymentDate, o.PaymentMethod
+    FROM deleted_rentals o
+    JOIN Customer c ON c.CustomerID = o.CustomerID
+    JOIN Hotel h ON h.HotelID = o.HotelID
+    LEFT JOIN Employee e ON e.EmployeeID = o.EmployeeID
+    ON CONFLICT DO NOTHING;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_archive_rental
+AFTER DELETE ON Rental
+REFERENCING OLD TABLE AS deleted_rentals
+FOR EACH STATEMENT
+EXECUTE FUNCTION archive_rental();
 
-    SELECT FullName INTO employee_name
-    FROM Employee WHERE EmployeeID = OLD.EmployeeID;
+-- Trigger 5b: Archive a customer's or hotel's bookings and rentals before the delete cascades to them
+-- By the time the cascaded deletes fire Trigger 4 and 5 the customer or hotel row is gone, and its name with it.
+DROP TRIGGER IF EXISTS trg_archive_customer_stays ON Customer;
+DROP TRIGGER IF EXISTS trg_archive_hotel_stays ON Hotel;
+DROP FUNCTION IF EXISTS archive_stays_of_deleted_parent CASCADE;
 
-    SELECT FullName INTO customer_name
-    FROM Customer WHERE CustomerID = OLD.CustomerID;
+CREATE OR REPLACE FUNCTION archive_stays_of_deleted_parent() RETURNS TRIGGER AS $$
+DECLARE
+    hid INTEGER;
+    cid INTEGER;
+BEGIN
+    IF TG_TABLE_NAME = 'hotel' THEN
+        hid := OLD.HotelID;
+    ELSE
+        cid := OLD.CustomerID;
+    END IF;
 
-    room_code := 'Room ' || OLD.RoomID;
+    INSERT INTO BookingArchive (
+        BookingID, CustomerID, HotelID, CustomerName, HotelName, RoomIdentifier,
+        BookingDate, CheckInDate, CheckOutDate, Status
+    )
+    SELECT b.BookingID, b.CustomerID, b.HotelID, c.FullName, h.HotelName, 'Room ' || b.RoomID,
+           b.BookingDate, b.CheckInDate, b.CheckOutDate, b.Status
+    FROM Booking b
+    JOIN Customer c ON c.CustomerID = b.CustomerID
+    JOIN Hotel h ON h.HotelID = b.HotelID
+    WHERE b.HotelID = hid OR b.CustomerID = cid
+    ON CONFLICT DO NOTHING;
 
     INSERT INTO RentalArchive (
-        RentalID, CustomerName, HotelName, RoomIdentifier, 
-        EmployeeName, BookingID, CheckInDate, CheckOutDate, 
+        RentalID, CustomerID, HotelID, CustomerName, HotelName, RoomIdentifier,
+        EmployeeName, BookingID, CheckInDate, CheckOutDate,
         Status, PaymentAmount, PaymentDate, PaymentMethod
     )
-    VALUES (
-        OLD.RentalID,
-        customer_name,
-        hotel_name,
-        room_code,
-        employee_name,
-        OLD.BookingID,
-        OLD.CheckInDate,
-        OLD.CheckOutDate,
-        OLD.Status,
-        OLD.PaymentAmount,
-        OLD.PaymentDate,
-        OLD.PaymentMethod
-    );
+    SELECT r.RentalID, r.CustomerID, r.HotelID, c.FullName, h.HotelName, 'Room ' || r.RoomID,
+           e.FullName, r.BookingID, r.CheckInDate, r.CheckOutDate,
+           r.Status, r.PaymentAmount, r.PaymentDate, r.PaymentMethod
+    FROM Rental r
+    JOIN Customer c ON c.CustomerID = r.CustomerID
+    JOIN Hotel h ON h.HotelID = r.HotelID
+    LEFT JOIN Employee e ON e.EmployeeID = r.EmployeeID
+    WHERE r.HotelID = hid OR r.CustomerID = cid
+    ON CONFLICT DO NOTHING;
 
     RETURN OLD;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_archive_rental
-BEFORE DELETE ON Rental
+CREATE TRIGGER trg_archive_customer_stays
+BEFORE DELETE ON Customer
 FOR EACH ROW
-EXECUTE FUNCTION archive_rental();
+EXECUTE FUNCTION archive_stays_of_deleted_parent();
 
--- Trigger 6: Adjust room status based on booking updates (Checked-in → Occupied, Cancelled → Available)
+CREATE TRIGGER trg_archive_hotel_stays
+BEFORE DELETE ON Hotel
+FOR EACH ROW
+EXECUTE FUNCTION archive_stays_of_deleted_parent();
+
+-- Trigger 6: Adjust room status based on booking updates (Checked-in → Occupied, Cancelled/No-show → Available)
+-- New bookings are handled by validate_booking.
 DROP TRIGGER IF EXISTS trg_update_room_status_booking ON Booking;
 DROP FUNCTION IF EXISTS update_room_status_booking CASCADE;
 
@@ -188,6 +248,12 @@ BEGIN
         UPDATE Room
         SET Status = 'Available'
         WHERE RoomID = NEW.RoomID AND HotelID = NEW.HotelID;
+
+    -- When booking becomes No-show → release the room unless someone else is in it
+    ELSIF NEW.Status = 'No-show' AND (OLD.Status IS DISTINCT FROM 'No-show') THEN
+        UPDATE Room
+        SET Status = 'Available'
+        WHERE RoomID = NEW.RoomID AND HotelID = NEW.HotelID AND Status = 'Booked';
     END IF;
 
     RETURN NEW;
@@ -195,7 +261,7 @@ END;
 $$ LANGUAGE plpgsql;
 
 CREATE TRIGGER trg_update_room_status_booking
-AFTER INSERT OR UPDATE ON Booking
+AFTER UPDATE ON Booking
 FOR EACH ROW
 EXECUTE FUNCTION update_room_status_booking();
 
@@ -284,212 +350,493 @@ BEFORE DELETE ON Room
 FOR EACH ROW
 EXECUTE FUNCTION prevent_deleting_active_rooms();
 
--- Trigger function to set room status to 'Out-of-Order' when a problem is reported and the room is currently available
+-- Room status from RoomProblems, once per affected room per statement
+-- A room with unresolved problems goes from Available to Out-of-Order. Once an update or delete
+-- leaves an Out-of-Order room with none, it is Available again. Replaces the per-row
+-- mark_out_of_order_if_available, mark_room_out_of_order, restore_status_if_all_resolved and
+-- restore_status_after_problem_delete.
 DROP TRIGGER IF EXISTS trg_mark_out_of_order ON RoomProblems;
+DROP TRIGGER IF EXISTS trg_mark_room_out_of_order ON RoomProblems;
+DROP TRIGGER IF EXISTS trg_restore_available_status ON RoomProblems;
+DROP TRIGGER IF EXISTS trg_restore_status_on_delete ON RoomProblems;
 DROP FUNCTION IF EXISTS mark_out_of_order_if_available CASCADE;
+DROP FUNCTION IF EXISTS mark_room_out_of_order CASCADE;
+DROP FUNCTION IF EXISTS restore_status_if_all_resolved CASCADE;
+DROP FUNCTION IF EXISTS restore_status_after_problem_delete CASCADE;
+DROP FUNCTION IF EXISTS sync_room_status_from_problems CASCADE;
 
-CREATE OR REPLACE FUNCTION mark_out_of_order_if_available() RETURNS TRIGGER AS $$
+CREATE OR REPLACE FUNCTION sync_room_status_from_problems() RETURNS TRIGGER AS $$
+DECLARE
+    hids INTEGER[];
+    rids INTEGER[];
 BEGIN
-    -- Only affect rooms that are currently Available
-    IF EXISTS (
-        SELECT 1 FROM Room
-        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID AND Status = 'Available'
-    ) THEN
-        UPDATE Room
-        SET Status = 'Out-of-Order'
-        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID;
+    -- Transition tables exist only for the event each trigger was created for.
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(HotelID), array_agg(RoomID) INTO hids, rids
+        FROM (SELECT DISTINCT HotelID, RoomID FROM new_problems) a;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(HotelID), array_agg(RoomID) INTO hids, rids
+        FROM (SELECT HotelID, RoomID FROM old_problems UNION SELECT HotelID, RoomID FROM new_problems) a;
+    ELSE
+        SELECT array_agg(HotelID), array_agg(RoomID) INTO hids, rids
+        FROM (SELECT DISTINCT HotelID, RoomID FROM old_problems) a;
     END IF;
 
-    RETURN NEW;
+    UPDATE Room r
+    SET Status = CASE r.Status WHEN 'Available' THEN 'Out-of-Order' ELSE 'Available' END
+    FROM unnest(hids, rids) AS a(HotelID, RoomID)
+    WHERE r.HotelID = a.HotelID AND r.RoomID = a.RoomID
+      AND CASE r.Status
+            WHEN 'Available' THEN EXISTS (
+                SELECT 1 FROM RoomProblems p
+                WHERE p.HotelID = r.HotelID AND p.RoomID = r.RoomID AND p.Resolved = FALSE)
+            -- A new report never clears Out-of-Order (staff may have set it by hand).
+            WHEN 'Out-of-Order' THEN TG_OP <> 'INSERT' AND NOT EXISTS (
+                SELECT 1 FROM RoomProblems p
+                WHERE p.HotelID = r.HotelID AND p.RoomID = r.RoomID AND p.Resolved = FALSE)
+            ELSE FALSE
+          END;
+
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_mark_out_of_order
+CREATE TRIGGER trg_room_status_problems_insert
 AFTER INSERT ON RoomProblems
-FOR EACH ROW
-EXECUTE FUNCTION mark_out_of_order_if_available();
+REFERENCING NEW TABLE AS new_problems
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_room_status_from_problems();
 
--- Trigger function to restore room status to 'Available' when all problems for the room are resolved
-DROP TRIGGER IF EXISTS trg_restore_available_status ON RoomProblems;
-DROP FUNCTION IF EXISTS restore_status_if_all_resolved CASCADE;
+CREATE TRIGGER trg_room_status_problems_update
+AFTER UPDATE ON RoomProblems
+REFERENCING OLD TABLE AS old_problems NEW TABLE AS new_problems
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_room_status_from_problems();
+
+CREATE TRIGGER trg_room_status_problems_delete
+AFTER DELETE ON RoomProblems
+REFERENCING OLD TABLE AS old_problems
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_room_status_from_problems();
 
-CREATE OR REPLACE FUNCTION restore_status_if_all_resolved() RETURNS TRIGGER AS $$
+-- Trigger function to restrict problem reporting to only Available or Out-of-Order rooms
+DROP TRIGGER IF EXISTS trg_restrict_problem_reporting ON RoomProblems;
+DROP FUNCTION IF EXISTS restrict_problem_reporting CASCADE;
+
+CREATE OR REPLACE FUNCTION restrict_problem_reporting() RETURNS TRIGGER AS $$
 DECLARE
-    current_status TEXT;
+    room_status TEXT;
 BEGIN
-    SELECT Status INTO current_status
+    SELECT Status INTO room_status
     FROM Room
     WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID;
 
-    IF current_status = 'Out-of-Order' AND NOT EXISTS (
-        SELECT 1 FROM RoomProblems
-        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID AND Resolved = FALSE
-    ) THEN
-        UPDATE Room
-        SET Status = 'Available'
-        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID;
+    IF room_status NOT IN ('Available', 'Out-of-Order') THEN
+        RAISE EXCEPTION '❌ You can only report problems for rooms that are Available or Out-of-Order. Current status: %', room_status;
     END IF;
 
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_restore_available_status
-AFTER UPDATE OF Resolved ON RoomProblems
+CREATE TRIGGER trg_restrict_problem_reporting
+BEFORE INSERT ON RoomProblems
 FOR EACH ROW
-WHEN (NEW.Resolved = TRUE)
-EXECUTE FUNCTION restore_status_if_all_resolved();
+EXECUTE FUNCTION restrict_problem_reporting();
 
--- Trigger function to mark a room as 'Out-of-Order' when a new problem is reported while it's currently 'Available'
-DROP TRIGGER IF EXISTS trg_mark_room_out_of_order ON RoomProblems;
-DROP FUNCTION IF EXISTS mark_room_out_of_order CASCADE;
+-- Trigger function to prevent inserting a rental that overlaps with an existing booking or ongoing rental
+DROP TRIGGER IF EXISTS trg_prevent_overlapping_rental ON Rental;
+DROP FUNCTION IF EXISTS prevent_overlapping_rental CASCADE;
 
-CREATE OR REPLACE FUNCTION mark_room_out_of_order() RETURNS TRIGGER AS $$
+CREATE OR REPLACE FUNCTION prevent_overlapping_rental() RETURNS TRIGGER AS $$
 DECLARE
-    current_status TEXT;
+    new_stay DATERANGE := daterange(NEW.CheckInDate, NEW.CheckOutDate, '[)');
 BEGIN
-    SELECT Status INTO current_status
-    FROM Room
-    WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID;
-
-    IF current_status = 'Available' THEN
-        UPDATE Room
-        SET Status = 'Out-of-Order'
-        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID;
+    -- Check for overlapping bookings, excluding the current one if provided
+    IF EXISTS (
+        SELECT 1 FROM Booking
+        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID
+          AND Status IN ('Pending', 'Checked-in')
+          AND StayPeriod && new_stay
+          AND (BookingID IS DISTINCT FROM NEW.BookingID)  -- Exclude the one being converted
+    ) OR EXISTS (
+        SELECT 1 FROM Rental
+        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID
+          AND Status = 'Ongoing'
+          AND StayPeriod && new_stay
+    ) THEN
+        RAISE EXCEPTION '⛔ Cannot rent: Room already booked or rented for selected dates.';
     END IF;
 
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_mark_room_out_of_order
-AFTER INSERT ON RoomProblems
+CREATE TRIGGER trg_prevent_overlapping_rental
+BEFORE INSERT ON Rental
 FOR EACH ROW
-EXECUTE FUNCTION mark_room_out_of_order();
+EXECUTE FUNCTION prevent_overlapping_rental();
 
--- Trigger: Restore room status to 'Available' on delete only if status was Out-of-Order
-CREATE OR REPLACE FUNCTION restore_status_after_problem_delete() RETURNS TRIGGER AS $$
-DECLARE
-    current_status TEXT;
-    has_unresolved BOOLEAN;
+-- Trigger function to keep RoomSummary current as amenities and problems change
+DROP FUNCTION IF EXISTS refresh_room_summary CASCADE;
+
+CREATE OR REPLACE FUNCTION refresh_room_summary(p_hotel_id INTEGER, p_room_id INTEGER) RETURNS VOID AS $$
 BEGIN
-    -- Check if there are unresolved problems for the same room
-    SELECT EXISTS (
-        SELECT 1 FROM RoomProblems
-        WHERE HotelID = OLD.HotelID AND RoomID = OLD.RoomID AND Resolved = FALSE
-    ) INTO has_unresolved;
-
-    -- Get the current room status
-    SELECT Status INTO current_status
-    FROM Room
-    WHERE HotelID = OLD.HotelID AND RoomID = OLD.RoomID;
+    -- Rooms that no longer exist have their summary removed by the cascade
+    IF NOT EXISTS (SELECT 1 FROM Room WHERE HotelID = p_hotel_id AND RoomID = p_room_id) THEN
+        RETURN;
+    END IF;
 
-    -- Only update the status to 'Available' if it was 'Out-of-Order' AND there are no more unresolved problems
-    IF current_status = 'Out-of-Order' AND NOT has_unresolved THEN
-        UPDATE Room
-        SET Status = 'Available'
-        WHERE HotelID = OLD.HotelID AND RoomID = OLD.RoomID;
+    INSERT INTO RoomSummary (HotelID, RoomID, Amenities, AmenityCount, LatestProblem)
+    SELECT
+        p_hotel_id,
+        p_room_id,
+        (SELECT string_agg(Amenity, ', ' ORDER BY Amenity) FROM RoomAmenities
+         WHERE HotelID = p_hotel_id AND RoomID = p_room_id),
+        (SELECT COUNT(*) FROM RoomAmenities
+         WHERE HotelID = p_hotel_id AND RoomID = p_room_id),
+        (SELECT Problem FROM RoomProblems
+         WHERE HotelID = p_hotel_id AND RoomID = p_room_id AND Resolved = FALSE
+         ORDER BY ReportDate DESC, Problem
+         LIMIT 1)
+    ON CONFLICT (HotelID, RoomID) DO UPDATE
+    SET Amenities = EXCLUDED.Amenities,
+        AmenityCount = EXCLUDED.AmenityCount,
+        LatestProblem = EXCLUDED.LatestProblem;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_room_summary_room ON Room;
+DROP TRIGGER IF EXISTS trg_room_summary_amenities ON RoomAmenities;
+DROP TRIGGER IF EXISTS trg_room_summary_amenities_insert ON RoomAmenities;
+DROP TRIGGER IF EXISTS trg_room_summary_problems ON RoomProblems;
+DROP FUNCTION IF EXISTS sync_room_summary CASCADE;
+DROP FUNCTION IF EXISTS sync_room_summary_inserted CASCADE;
+
+CREATE OR REPLACE FUNCTION sync_room_summary() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_room_summary(OLD.HotelID, OLD.RoomID);
     END IF;
 
-    RETURN OLD;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND (NEW.HotelID, NEW.RoomID) IS DISTINCT FROM (OLD.HotelID, OLD.RoomID)) THEN
+        PERFORM refresh_room_summary(NEW.HotelID, NEW.RoomID);
+    END IF;
+
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-DROP TRIGGER IF EXISTS trg_restore_status_on_delete ON RoomProblems;
+-- Inserted rooms and amenities are summarised once per statement, so a bulk import
+-- does not refresh the same room once per amenity.
+CREATE OR REPLACE FUNCTION sync_room_summary_inserted() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO RoomSummary (HotelID, RoomID, Amenities, AmenityCount, LatestProblem)
+    SELECT r.HotelID, r.RoomID, a.Amenities, a.AmenityCount, p.Problem
+    FROM (SELECT DISTINCT HotelID, RoomID FROM inserted_rows) r
+    CROSS JOIN LATERAL (
+        SELECT string_agg(Amenity, ', ' ORDER BY Amenity) AS Amenities, COUNT(*) AS AmenityCount
+        FROM RoomAmenities
+        WHERE HotelID = r.HotelID AND RoomID = r.RoomID
+    ) a
+    LEFT JOIN LATERAL (
+        SELECT Problem FROM RoomProblems
+        WHERE HotelID = r.HotelID AND RoomID = r.RoomID AND Resolved = FALSE
+        ORDER BY ReportDate DESC, Problem
+        LIMIT 1
+    ) p ON TRUE
+    ON CONFLICT (HotelID, RoomID) DO UPDATE
+    SET Amenities = EXCLUDED.Amenities,
+        AmenityCount = EXCLUDED.AmenityCount,
+        LatestProblem = EXCLUDED.LatestProblem;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_restore_status_on_delete
-AFTER DELETE ON RoomProblems
+CREATE TRIGGER trg_room_summary_room
+AFTER INSERT ON Room
+REFERENCING NEW TABLE AS inserted_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_room_summary_inserted();
+
+CREATE TRIGGER trg_room_summary_amenities_insert
+AFTER INSERT ON RoomAmenities
+REFERENCING NEW TABLE AS inserted_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_room_summary_inserted();
+
+CREATE TRIGGER trg_room_summary_amenities
+AFTER UPDATE OR DELETE ON RoomAmenities
 FOR EACH ROW
-EXECUTE FUNCTION restore_status_after_problem_delete();
+EXECUTE FUNCTION sync_room_summary();
 
--- Trigger function to restrict problem reporting to only Available or Out-of-Order rooms
-DROP TRIGGER IF EXISTS trg_restrict_problem_reporting ON RoomProblems;
-DROP FUNCTION IF EXISTS restrict_problem_reporting CASCADE;
+CREATE TRIGGER trg_room_summary_problems
+AFTER INSERT OR UPDATE OR DELETE ON RoomProblems
+FOR EACH ROW
+EXECUTE FUNCTION sync_room_summary();
 
-CREATE OR REPLACE FUNCTION restrict_problem_reporting() RETURNS TRIGGER AS $$
-DECLARE
-    room_status TEXT;
+-- Trigger functions to bump a hotel's availability version for every write that can change search results
+DROP FUNCTION IF EXISTS bump_availability_version(INTEGER) CASCADE;
+
+CREATE OR REPLACE FUNCTION bump_availability_version(p_hotel_id INTEGER) RETURNS VOID AS $$
 BEGIN
-    SELECT Status INTO room_status
-    FROM Room
-    WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID;
+    -- Appended rather than added to the hotel's AvailabilityVersion row, which every booking
+    -- and rental of the hotel would otherwise lock until commit; the sweeper folds deltas in.
+    INSERT INTO AvailabilityVersionDelta (HotelID) VALUES (p_hotel_id);
+END;
+$$ LANGUAGE plpgsql;
 
-    IF room_status NOT IN ('Available', 'Out-of-Order') THEN
-        RAISE EXCEPTION '❌ You can only report problems for rooms that are Available or Out-of-Order. Current status: %', room_status;
+DROP TRIGGER IF EXISTS trg_availability_version_booking ON Booking;
+DROP TRIGGER IF EXISTS trg_availability_version_rental ON Rental;
+DROP TRIGGER IF EXISTS trg_availability_version_room ON Room;
+DROP TRIGGER IF EXISTS trg_availability_version_room_insert ON Room;
+DROP TRIGGER IF EXISTS trg_availability_version_amenities ON RoomAmenities;
+DROP TRIGGER IF EXISTS trg_availability_version_amenities_insert ON RoomAmenities;
+DROP TRIGGER IF EXISTS trg_availability_version_problems ON RoomProblems;
+DROP TRIGGER IF EXISTS trg_availability_version_hotel ON Hotel;
+DROP TRIGGER IF EXISTS trg_availability_version_chain ON HotelChain;
+DROP FUNCTION IF EXISTS sync_availability_version CASCADE;
+DROP FUNCTION IF EXISTS sync_chain_availability_version CASCADE;
+DROP FUNCTION IF EXISTS sync_availability_version_inserted CASCADE;
+
+CREATE OR REPLACE FUNCTION sync_availability_version() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_availability_version(OLD.HotelID);
     END IF;
 
-    RETURN NEW;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.HotelID IS DISTINCT FROM OLD.HotelID) THEN
+        PERFORM bump_availability_version(NEW.HotelID);
+    END IF;
+
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_restrict_problem_reporting
-BEFORE INSERT ON RoomProblems
+-- Bulk inserts of rooms and amenities bump each hotel once per statement
+CREATE OR REPLACE FUNCTION sync_availability_version_inserted() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_availability_version(HotelID) FROM (SELECT DISTINCT HotelID FROM inserted_rows) h;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_chain_availability_version() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_availability_version(HotelID) FROM Hotel WHERE HotelChainID = NEW.HotelChainID;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_availability_version_booking
+AFTER INSERT OR UPDATE OR DELETE ON Booking
 FOR EACH ROW
-EXECUTE FUNCTION restrict_problem_reporting();
+EXECUTE FUNCTION sync_availability_version();
 
--- Trigger function to prevent inserting a booking that overlaps with an existing booking or rental
-DROP TRIGGER IF EXISTS trg_prevent_overlapping_booking ON Booking;
-DROP FUNCTION IF EXISTS prevent_overlapping_booking CASCADE;
+CREATE TRIGGER trg_availability_version_rental
+AFTER INSERT OR UPDATE OR DELETE ON Rental
+FOR EACH ROW
+EXECUTE FUNCTION sync_availability_version();
+
+CREATE TRIGGER trg_availability_version_room_insert
+AFTER INSERT ON Room
+REFERENCING NEW TABLE AS inserted_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_availability_version_inserted();
+
+CREATE TRIGGER trg_availability_version_room
+AFTER UPDATE OR DELETE ON Room
+FOR EACH ROW
+EXECUTE FUNCTION sync_availability_version();
+
+CREATE TRIGGER trg_availability_version_amenities_insert
+AFTER INSERT ON RoomAmenities
+REFERENCING NEW TABLE AS inserted_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_availability_version_inserted();
+
+CREATE TRIGGER trg_availability_version_amenities
+AFTER UPDATE OR DELETE ON RoomAmenities
+FOR EACH ROW
+EXECUTE FUNCTION sync_availability_version();
 
-CREATE OR REPLACE FUNCTION prevent_overlapping_booking() RETURNS TRIGGER AS $$
+CREATE TRIGGER trg_availability_version_problems
+AFTER INSERT OR UPDATE OR DELETE ON RoomProblems
+FOR EACH ROW
+EXECUTE FUNCTION sync_availability_version();
+
+CREATE TRIGGER trg_availability_version_hotel
+AFTER UPDATE ON Hotel
+FOR EACH ROW
+EXECUTE FUNCTION sync_availability_version();
+
+CREATE TRIGGER trg_availability_version_chain
+AFTER UPDATE ON HotelChain
+FOR EACH ROW
+EXECUTE FUNCTION sync_chain_availability_version();
+
+-- Trigger functions to keep the employee dashboard read model (UpcomingArrival, HotelDashboardDelta) current
+DROP FUNCTION IF EXISTS refresh_upcoming_arrival(INTEGER) CASCADE;
+DROP FUNCTION IF EXISTS adjust_hotel_dashboard(INTEGER, INTEGER, INTEGER, INTEGER) CASCADE;
+
+CREATE OR REPLACE FUNCTION refresh_upcoming_arrival(p_booking_id INTEGER) RETURNS VOID AS $$
 BEGIN
-    IF EXISTS (
-        SELECT 1 FROM Booking
-        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID
-          AND Status IN ('Pending', 'Checked-in')
-          AND (
-              NEW.CheckInDate < CheckOutDate AND NEW.CheckOutDate > CheckInDate
-          )
-    ) OR EXISTS (
-        SELECT 1 FROM Rental
-        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID
-          AND (
-              NEW.CheckInDate < CheckOutDate AND NEW.CheckOutDate > CheckInDate
-          )
-    ) THEN
-        RAISE EXCEPTION '⛔ Cannot book: Room already booked or rented for selected dates.';
+    DELETE FROM UpcomingArrival WHERE BookingID = p_booking_id;
+
+    INSERT INTO UpcomingArrival (BookingID, HotelID, RoomID, CustomerName, HotelName, CheckInDate, CheckOutDate, Status)
+    SELECT b.BookingID, b.HotelID, b.RoomID, c.FullName, h.HotelName, b.CheckInDate, b.CheckOutDate, b.Status
+    FROM Booking b
+    JOIN Customer c ON c.CustomerID = b.CustomerID
+    JOIN Hotel h ON h.HotelID = b.HotelID
+    WHERE b.BookingID = p_booking_id
+      AND b.Status IN ('Pending', 'Checked-in')
+      AND NOT EXISTS (SELECT 1 FROM Rental r WHERE r.BookingID = b.BookingID);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION adjust_hotel_dashboard(p_hotel_id INTEGER, p_pending INTEGER, p_in_house INTEGER, p_out_of_order INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF p_hotel_id IS NULL OR (p_pending = 0 AND p_in_house = 0 AND p_out_of_order = 0) THEN
+        RETURN;
     END IF;
 
-    RETURN NEW;
+    -- Appended rather than added to the hotel's HotelDashboard row, which every booking and
+    -- rental of the hotel would otherwise lock until commit; the sweeper folds deltas in.
+    INSERT INTO HotelDashboardDelta (HotelID, PendingBookings, InHouseRentals, OutOfOrderRooms)
+    VALUES (p_hotel_id, p_pending, p_in_house, p_out_of_order);
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_prevent_overlapping_booking
-BEFORE INSERT ON Booking
-FOR EACH ROW
-EXECUTE FUNCTION prevent_overlapping_booking();
+DROP TRIGGER IF EXISTS trg_dashboard_booking ON Booking;
+DROP TRIGGER IF EXISTS trg_dashboard_rental ON Rental;
+DROP TRIGGER IF EXISTS trg_dashboard_room ON Room;
+DROP TRIGGER IF EXISTS trg_dashboard_room_insert ON Room;
+DROP TRIGGER IF EXISTS trg_dashboard_customer ON Customer;
+DROP TRIGGER IF EXISTS trg_dashboard_hotel ON Hotel;
+DROP FUNCTION IF EXISTS sync_dashboard_booking CASCADE;
+DROP FUNCTION IF EXISTS sync_dashboard_rental CASCADE;
+DROP FUNCTION IF EXISTS sync_dashboard_room CASCADE;
+DROP FUNCTION IF EXISTS sync_dashboard_rooms_inserted CASCADE;
+DROP FUNCTION IF EXISTS sync_dashboard_names CASCADE;
+
+CREATE OR REPLACE FUNCTION sync_dashboard_booking() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.HotelID = OLD.HotelID THEN
+        PERFORM adjust_hotel_dashboard(NEW.HotelID, (NEW.Status = 'Pending')::INTEGER - (OLD.Status = 'Pending')::INTEGER, 0, 0);
+    ELSE
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM adjust_hotel_dashboard(OLD.HotelID, -(OLD.Status = 'Pending')::INTEGER, 0, 0);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM adjust_hotel_dashboard(NEW.HotelID, (NEW.Status = 'Pending')::INTEGER, 0, 0);
+        END IF;
+    END IF;
 
--- Trigger function to prevent inserting a rental that overlaps with an existing booking or ongoing rental
-DROP TRIGGER IF EXISTS trg_prevent_overlapping_rental ON Rental;
-DROP FUNCTION IF EXISTS prevent_overlapping_rental CASCADE;
+    IF TG_OP = 'DELETE' THEN
+        PERFORM refresh_upcoming_arrival(OLD.BookingID);
+    ELSE
+        PERFORM refresh_upcoming_arrival(NEW.BookingID);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
 
-CREATE OR REPLACE FUNCTION prevent_overlapping_rental() RETURNS TRIGGER AS $$
+CREATE OR REPLACE FUNCTION sync_dashboard_rental() RETURNS TRIGGER AS $$
 BEGIN
-    -- Check for overlapping bookings, excluding the current one if provided
-    IF EXISTS (
-        SELECT 1 FROM Booking
-        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID
-          AND Status IN ('Pending', 'Checked-in')
-          AND (
-              NEW.CheckInDate < CheckOutDate AND NEW.CheckOutDate > CheckInDate
-          )
-          AND (BookingID IS DISTINCT FROM NEW.BookingID)  -- Exclude the one being converted
-    ) OR EXISTS (
-        SELECT 1 FROM Rental
-        WHERE HotelID = NEW.HotelID AND RoomID = NEW.RoomID
-          AND Status = 'Ongoing'
-          AND (
-              NEW.CheckInDate < CheckOutDate AND NEW.CheckOutDate > CheckInDate
-          )
-    ) THEN
-        RAISE EXCEPTION '⛔ Cannot rent: Room already booked or rented for selected dates.';
+    IF TG_OP = 'UPDATE' AND NEW.HotelID = OLD.HotelID THEN
+        PERFORM adjust_hotel_dashboard(NEW.HotelID, 0, (NEW.Status = 'Ongoing')::INTEGER - (OLD.Status = 'Ongoing')::INTEGER, 0);
+    ELSE
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM adjust_hotel_dashboard(OLD.HotelID, 0, -(OLD.Status = 'Ongoing')::INTEGER, 0);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM adjust_hotel_dashboard(NEW.HotelID, 0, (NEW.Status = 'Ongoing')::INTEGER, 0);
+        END IF;
     END IF;
 
-    RETURN NEW;
+    -- A booking leaves the arrivals list once a rental points at it
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.BookingID IS NOT NULL
+       AND (TG_OP = 'DELETE' OR NEW.BookingID IS DISTINCT FROM OLD.BookingID) THEN
+        PERFORM refresh_upcoming_arrival(OLD.BookingID);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.BookingID IS NOT NULL
+       AND (TG_OP = 'INSERT' OR NEW.BookingID IS DISTINCT FROM OLD.BookingID) THEN
+        PERFORM refresh_upcoming_arrival(NEW.BookingID);
+    END IF;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_prevent_overlapping_rental
-BEFORE INSERT ON Rental
+CREATE OR REPLACE FUNCTION sync_dashboard_room() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.HotelID = OLD.HotelID THEN
+        PERFORM adjust_hotel_dashboard(NEW.HotelID, 0, 0, (NEW.Status = 'Out-of-Order')::INTEGER - (OLD.Status = 'Out-of-Order')::INTEGER);
+    ELSE
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM adjust_hotel_dashboard(OLD.HotelID, 0, 0, -(OLD.Status = 'Out-of-Order')::INTEGER);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM adjust_hotel_dashboard(NEW.HotelID, 0, 0, (NEW.Status = 'Out-of-Order')::INTEGER);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_dashboard_rooms_inserted() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM adjust_hotel_dashboard(HotelID, 0, 0, out_of_order)
+    FROM (SELECT HotelID, COUNT(*) FILTER (WHERE Status = 'Out-of-Order')::INTEGER AS out_of_order
+          FROM inserted_rows GROUP BY HotelID) h;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Names are copied into UpcomingArrival, so renames are copied too
+CREATE OR REPLACE FUNCTION sync_dashboard_names() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'customer' THEN
+        UPDATE UpcomingArrival a SET CustomerName = NEW.FullName
+        FROM Booking b
+        WHERE b.BookingID = a.BookingID AND b.CustomerID = NEW.CustomerID;
+    ELSE
+        UPDATE UpcomingArrival SET HotelName = NEW.HotelName WHERE HotelID = NEW.HotelID;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_dashboard_booking
+AFTER INSERT OR UPDATE OR DELETE ON Booking
 FOR EACH ROW
-EXECUTE FUNCTION prevent_overlapping_rental();
+EXECUTE FUNCTION sync_dashboard_booking();
+
+CREATE TRIGGER trg_dashboard_rental
+AFTER INSERT OR UPDATE OR DELETE ON Rental
+FOR EACH ROW
+EXECUTE FUNCTION sync_dashboard_rental();
+
+CREATE TRIGGER trg_dashboard_room_insert
+AFTER INSERT ON Room
+REFERENCING NEW TABLE AS inserted_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_dashboard_rooms_inserted();
+
+CREATE TRIGGER trg_dashboard_room
+AFTER UPDATE OF Status, HotelID OR DELETE ON Room
+FOR EACH ROW
+EXECUTE FUNCTION sync_dashboard_room();
+
+CREATE TRIGGER trg_dashboard_customer
+AFTER UPDATE OF FullName ON Customer
+FOR EACH ROW
+WHEN (OLD.FullName IS DISTINCT FROM NEW.FullName)
+EXECUTE FUNCTION sync_dashboard_names();
+
+CREATE TRIGGER trg_dashboard_hotel
+AFTER UPDATE OF HotelName ON Hotel
+FOR EACH ROW
+WHEN (OLD.HotelName IS DISTINCT FROM NEW.HotelName)
+EXECUTE FUNCTION sync_dashboard_names();
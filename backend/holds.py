@@ -0,0 +1,133 @@
+from sqlalchemy import text
+from room_locks import ROOM_LOCK_KEY
+
+# The same per-room advisory lock as room_writes, taken with the try_ variant
+# so a second caller gets an immediate "no" instead of queueing behind the first.
+ROOM_LOCK = f"pg_try_advisory_xact_lock({ROOM_LOCK_KEY})"
+
+_STAY = "daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')"
+
+_HELD_BY_OTHER = f"""
+            SELECT 1 FROM RoomHold
+            WHERE HotelID = :hid AND RoomID = :rid AND ExpiresAt > now()
+              AND CustomerID IS DISTINCT FROM :cid
+              AND StayPeriod && {_STAY}
+"""
+
+HELD_MESSAGE = '⏳ This room is on hold for another customer. Please try again in a few minutes.'
+
+# Cheap, index-backed version of what the Booking triggers would reject, plus
+# holds owned by other customers. Returns the first reason, if any.
+_CONFLICT_QUERY = text(f"""
+    SELECT CASE
+        WHEN EXISTS ({_HELD_BY_OTHER}) THEN '{HELD_MESSAGE}'
+        WHEN EXISTS (
+            SELECT 1 FROM Booking
+            WHERE HotelID = :hid AND RoomID = :rid
+              AND Status IN ('Pending', 'Checked-in')
+              AND StayPeriod && {_STAY}
+        ) OR EXISTS (
+            SELECT 1 FROM Rental
+            WHERE HotelID = :hid AND RoomID = :rid
+              AND StayPeriod && {_STAY}
+        ) THEN '⛔ Cannot book: Room already booked or rented for selected dates.'
+        WHEN EXISTS (
+            SELECT 1 FROM RoomProblems
+            WHERE HotelID = :hid AND RoomID = :rid AND Resolved = FALSE
+        ) THEN '⛔ Cannot book room with unresolved problems.'
+    END
+""")
+
+# Active holds, as an extra NOT EXISTS for room search
+ACTIVE_HOLD = """
+                SELECT 1 FROM RoomHold rh
+                WHERE rh.HotelID = r.HotelID AND rh.RoomID = r.RoomID
+                AND rh.ExpiresAt > now()
+                AND rh.StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+            """
+
+
+class HoldUnavailable(Exception):
+    """The room cannot be held or booked right now; the message is shown to the user."""
+
+
+class RoomHolds:
+    """Short TTL holds on (HotelID, RoomID, stay) ahead of a booking.
+
+    Taking a hold costs one advisory try-lock and a few index lookups, so the
+    customers who lose a race for a popular room are turned away before any
+    Booking INSERT (and its triggers) runs.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+
+    def init_app(self, app):
+        self.ttl = app.config.get('ROOM_HOLD_TTL', self.ttl)
+
+    def check_room(self, session, customer_id, hotel_id, room_id, checkin, checkout):
+        """Fail fast if the room is contended, held by someone else or already taken.
+
+        Must run inside the transaction that goes on to hold or book the room:
+        the advisory lock is released at commit or rollback.
+        """
+        params = {'cid': customer_id, 'hid': hotel_id, 'rid': room_id, 'checkin': checkin, 'checkout': checkout}
+        if not session.execute(text(f"SELECT {ROOM_LOCK}"), params).scalar():
+            raise HoldUnavailable("⏳ Someone else is booking this room right now. Please try again.")
+        reason = session.execute(_CONFLICT_QUERY, params).scalar()
+        if reason:
+            raise HoldUnavailable(reason)
+
+    def check_not_held(self, session, customer_id, hotel_id, room_id, checkin, checkout):
+        """Raise HoldUnavailable if another customer holds the room for part of the stay.
+
+        For writes that take a room without going through a hold (walk-in
+        rentals); no trigger checks holds, so a held room would otherwise be
+        taken from under the customer confirming it. Run it after the room's
+        ``room_writes.lock_room``; in ``advisory`` mode that lock also turns
+        away new holds on the room until commit.
+        """
+        params = {'cid': customer_id, 'hid': hotel_id, 'rid': room_id, 'checkin': checkin, 'checkout': checkout}
+        if session.execute(text(f"SELECT EXISTS ({_HELD_BY_OTHER})"), params).scalar():
+            raise HoldUnavailable(HELD_MESSAGE)
+
+    def acquire(self, session, customer_id, hotel_id, room_id, checkin, checkout):
+        """Hold the room for ``ttl`` seconds; returns the (holdid, expiresat) row.
+
+        Raises HoldUnavailable. The caller commits.
+        """
+        self.check_room(session, customer_id, hotel_id, room_id, checkin, checkout)
+        params = {'cid': customer_id, 'hid': hotel_id, 'rid': room_id,
+                  'checkin': checkin, 'checkout': checkout, 'ttl': self.ttl}
+
+        # Still under the room lock: clear expired holds and this customer's
+        # own overlapping hold so the exclusion constraint only sees live ones.
+        session.execute(text(f"""
+            DELETE FROM RoomHold
+            WHERE HotelID = :hid AND RoomID = :rid
+              AND (ExpiresAt <= now() OR (CustomerID = :cid AND StayPeriod && {_STAY}))
+        """), params)
+        return session.execute(text("""
+            INSERT INTO RoomHold (HotelID, RoomID, CustomerID, CheckInDate, CheckOutDate, ExpiresAt)
+            VALUES (:hid, :rid, :cid, :checkin, :checkout, now() + make_interval(secs => :ttl))
+            RETURNING HoldID, ExpiresAt
+        """), params).fetchone()
+
+    def claim(self, session, hold_id, customer_id):
+        """Consume a live hold; returns its room and stay, or None if it expired."""
+        return session.execute(text("""
+            DELETE FROM RoomHold
+            WHERE HoldID = :hold AND CustomerID = :cid AND ExpiresAt > now()
+            RETURNING HotelID, RoomID, CheckInDate, CheckOutDate
+        """), {'hold': hold_id, 'cid': customer_id}).fetchone()
+
+    def release(self, session, hold_id, customer_id):
+        """Give a hold back early; returns its room and stay, or None."""
+        return session.execute(text("""
+            DELETE FROM RoomHold
+            WHERE HoldID = :hold AND CustomerID = :cid
+            RETURNING HotelID, RoomID, CheckInDate, CheckOutDate
+        """), {'hold': hold_id, 'cid': customer_id}).fetchone()
+
+
+room_holds = RoomHolds()
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import uuid
+from functools import wraps
+from flask import flash, g, has_request_context, make_response, redirect, request, session, url_for
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeout
+from app import db
+
+# lock_not_available: a duplicate waited longer than lock_timeout for the first attempt
+LOCK_TIMEOUT_SQLSTATE = '55P03'
+
+_KEY = "UserType = :utype AND UserID = :uid AND Endpoint = :endpoint AND IdemKey = :key"
+
+_DELETE_EXPIRED = text(f"""
+    WITH completion AS (DELETE FROM IdempotencyCompletion WHERE {_KEY} AND ExpiresAt <= now())
+    DELETE FROM IdempotencyKey WHERE {_KEY} AND ExpiresAt <= now()
+""")
+
+# Blocks while another transaction holds an uncommitted row for the same key.
+_CLAIM = text("""
+    INSERT INTO IdempotencyKey (UserType, UserID, Endpoint, IdemKey, RequestHash, ExpiresAt)
+    VALUES (:utype, :uid, :endpoint, :key, :hash, now() + make_interval(secs => :ttl))
+    ON CONFLICT (UserType, UserID, Endpoint, IdemKey) DO NOTHING
+    RETURNING 1
+""")
+
+_STORED = text(f"""
+    SELECT RequestHash, ResponseStatus, ResponseType, ResponseLocation, ResponseBody, Flashes
+    FROM IdempotencyKey WHERE {_KEY}
+""")
+
+# Written by the view's own transaction when it commits, so it exists exactly when the write does.
+_MARK = text("""
+    INSERT INTO IdempotencyCompletion (UserType, UserID, Endpoint, IdemKey, RequestHash, ExpiresAt)
+    VALUES (:utype, :uid, :endpoint, :key, :hash, now() + make_interval(secs => :ttl))
+    ON CONFLICT (UserType, UserID, Endpoint, IdemKey) DO NOTHING
+""")
+
+_COMPLETED = text(f"SELECT RequestHash FROM IdempotencyCompletion WHERE {_KEY}")
+
+_STORE = text(f"""
+    UPDATE IdempotencyKey
+    SET ResponseStatus = :status, ResponseType = :mimetype, ResponseLocation = :location,
+        ResponseBody = :body, Flashes = CAST(:flashes AS JSONB)
+    WHERE {_KEY}
+""")
+
+
+def _request_hash():
+    fields = sorted((k, v) for k, v in request.form.items(multi=True) if k != 'idempotency_key')
+    return hashlib.sha256(json.dumps(fields).encode()).hexdigest()
+
+
+def _replay(stored):
+    for category, message in stored.flashes:
+        flash(message, category)
+    response = make_response(stored.responsebody, stored.responsestatus)
+    response.mimetype = stored.responsetype
+    if stored.responselocation:
+        response.headers['Location'] = stored.responselocation
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+class IdempotencyKeys:
+    """Client-supplied idempotency keys for POSTs that take rooms or money.
+
+    Every attempt of one logical request carries the same key, either as an
+    ``Idempotency-Key`` header or an ``idempotency_key`` form field. The first
+    attempt inserts the key's row on a connection of its own and keeps that
+    transaction open while the view runs, then stores the response with it.
+    Those connections come from a separate pool of ``pool_size``, so keyed
+    requests (and duplicates waiting on them) can never take every connection
+    of the shared pool and leave the views they wrap unable to get one; when
+    this pool is exhausted the request is turned away after ``wait`` seconds.
+    A duplicate arriving meanwhile blocks on the insert until the first commits
+    and is answered from the stored response without running the view.
+
+    The view's first commit on ``db.session`` also records the key in
+    IdempotencyCompletion, in the same transaction as its write. If the key's
+    row is then lost (a crash before it is stored, an exception after the view
+    committed, a failed store), the retry finds the completion and answers
+    "already processed" instead of running the write again. If the first
+    attempt raises before committing anything, the duplicate runs the view
+    itself. Requests without a key behave as before.
+    """
+
+    def __init__(self, ttl=86400, wait=30, pool_size=20):
+        self.ttl = ttl
+        self.wait = wait
+        self.pool_size = pool_size
+        self.engine = None
+
+    def init_app(self, app):
+        self.ttl = app.config.get('IDEMPOTENCY_KEY_TTL', self.ttl)
+        self.wait = app.config.get('IDEMPOTENCY_WAIT', self.wait)
+        self.pool_size = app.config.get('IDEMPOTENCY_POOL_SIZE', self.pool_size)
+        self.engine = create_engine(app.config['SQLALCHEMY_DATABASE_URI'], pool_size=self.pool_size,
+                                    max_overflow=0, pool_timeout=self.wait, pool_pre_ping=True)
+        app.jinja_env.globals['new_idempotency_key'] = lambda: uuid.uuid4().hex
+        event.listen(db.session, 'before_commit', self._mark_completed)
+        event.listen(db.session, 'after_commit', self._completed)
+        event.listen(db.session, 'after_rollback', self._rolled_back)
+
+    # g.idempotency_pending holds the key until a commit of the view has recorded it
+    @staticmethod
+    def _mark_completed(db_session):
+        if has_request_context() and g.get('idempotency_pending'):
+            db_session.execute(_MARK, g.idempotency_pending)
+            db_session.info['idempotency_marked'] = True
+
+    @staticmethod
+    def _completed(db_session):
+        if db_session.info.pop('idempotency_marked', False) and has_request_context():
+            g.idempotency_pending = None
+
+    @staticmethod
+    def _rolled_back(db_session):
+        db_session.info.pop('idempotency_marked', None)
+
+    def protect(self, view):
+        """Decorator for a POST view; keys are scoped to the logged-in user and endpoint."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get('Idempotency-Key') or request.form.get('idempotency_key')
+            if request.method != 'POST' or not key or 'user_type' not in session:
+                return view(*args, **kwargs)
+            if len(key) > 255:
+                flash("❌ Invalid idempotency key.", "danger")
+                return redirect(request.referrer or url_for('root'))
+
+            params = {'utype': session['user_type'], 'uid': session['user_id'], 'endpoint': request.endpoint,
+                      'key': key, 'hash': _request_hash(), 'ttl': self.ttl}
+
+            try:
+                conn = self.engine.connect()
+            except PoolTimeout:
+                flash("⏳ We are handling a lot of requests right now. Please try again shortly.", "warning")
+                return redirect(request.referrer or url_for('root'))
+
+            with conn:
+                try:
+                    conn.execute(text("SELECT set_config('lock_timeout', :wait, true)"),
+                                 {'wait': f"{int(self.wait * 1000)}ms"})
+                    conn.execute(_DELETE_EXPIRED, params)
+                    owner = conn.execute(_CLAIM, params).scalar()
+                except DBAPIError as e:
+                    conn.rollback()
+                    if getattr(e.orig, 'pgcode', None) != LOCK_TIMEOUT_SQLSTATE:
+                        raise
+                    flash("⏳ This request is still being processed. Please check again shortly.", "warning")
+                    return redirect(request.referrer or url_for('root'))
+
+                if not owner:
+                    stored = conn.execute(_STORED, params).fetchone()
+                    conn.rollback()
+                    if stored.requesthash != params['hash']:
+                        flash("❌ This request was already submitted with different details.", "danger")
+                        return redirect(request.referrer or url_for('root'))
+                    return _replay(stored)
+
+                flashed = len(session.get('_flashes', []))
+                try:
+                    completed = conn.execute(_COMPLETED, params).scalar()
+                    if completed is not None and completed != params['hash']:
+                        conn.rollback()
+                        flash("❌ This request was already submitted with different details.", "danger")
+                        return redirect(request.referrer or url_for('root'))
+                    if completed is not None:
+                        # The write committed but its response was never stored
+                        flash("✅ This request was already processed.", "info")
+                        response = redirect(request.referrer or url_for('root'))
+                    else:
+                        g.idempotency_pending = params
+                        try:
+                            response = make_response(view(*args, **kwargs))
+                        finally:
+                            g.idempotency_pending = None
+                    conn.execute(_STORE, {
+                        **params,
+                        'status': response.status_code,
+                        'mimetype': response.mimetype,
+                        'location': response.headers.get('Location'),
+                        'body': response.get_data(as_text=True),
+                        'flashes': json.dumps(session.get('_flashes', [])[flashed:])
+                    })
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                return response
+
+        return wrapper
+
+    def purge(self, session, batch_size=5000):
+        """Delete expired keys and completions in batches, committing each; returns the number of keys removed."""
+        removed = 0
+        for table in ('IdempotencyKey', 'IdempotencyCompletion'):
+            while True:
+                deleted = session.execute(text(f"""
+                    DELETE FROM {table}
+                    WHERE ctid IN (SELECT ctid FROM {table} WHERE ExpiresAt <= now() LIMIT :batch)
+                """), {'batch': batch_size}).rowcount
+                session.commit()
+                if table == 'IdempotencyKey':
+                    removed += deleted
+                if deleted < batch_size:
+                    break
+        return removed
+
+
+idempotency_keys = IdempotencyKeys()
@@ -0,0 +1,161 @@
+from flask import request, url_for
+from sqlalchemy import text
+from search import decode_cursor, encode_cursor
+
+
+def parse_order(order):
+    """Split an ORDER BY clause into [(expression, 'ASC' | 'DESC'), ...]."""
+    terms, depth, start = [], 0, 0
+    for i, char in enumerate(order + ','):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            term = order[start:i].strip()
+            start = i + 1
+            expression, _, direction = term.rpartition(' ')
+            if direction.upper() in ('ASC', 'DESC'):
+                terms.append((expression.strip(), direction.upper()))
+            else:
+                terms.append((term, 'ASC'))
+    return terms
+
+
+def keyset_condition(terms, prefix='cursor'):
+    """WHERE condition for the rows after a cursor over ``terms``; parameters are ``prefix_0``..."""
+    if len({direction for _, direction in terms}) == 1:
+        # One direction throughout: a row comparison, which an index can serve directly.
+        op = '>' if terms[0][1] == 'ASC' else '<'
+        columns = ", ".join(expression for expression, _ in terms)
+        values = ", ".join(f":{prefix}_{i}" for i in range(len(terms)))
+        return f"({columns}) {op} ({values})"
+    ors = []
+    for i, (expression, direction) in enumerate(terms):
+        ands = [f"{terms[j][0]} = :{prefix}_{j}" for j in range(i)]
+        ands.append(f"{expression} {'>' if direction == 'ASC' else '<'} :{prefix}_{i}")
+        ors.append("(" + " AND ".join(ands) + ")")
+    return "(" + " OR ".join(ors) + ")"
+
+
+class Page:
+    def __init__(self, rows, total, total_exact, first_url=None, prev_url=None, next_url=None,
+                 number=None, truncated=False):
+        self.rows = rows
+        self.total = total
+        self.total_exact = total_exact
+        self.first_url = first_url
+        self.prev_url = prev_url
+        self.next_url = next_url
+        self.number = number
+        self.truncated = truncated
+
+
+class Paginator:
+    """Server-side paging for the employee list pages.
+
+    Pages are keyset pages: the list is ordered by the page's sort plus its
+    primary key, and the next page starts after the last row shown (encoded
+    in a ``cursor`` argument, as in room search), so page 500 costs the same
+    as page 1 when an index covers the sort. Sorts on a nullable column
+    cannot be continued from a cursor and fall back to ``page`` numbers with
+    OFFSET, capped at ``max_offset`` rows.
+
+    Totals are exact while the planner expects at most ``exact_count_limit``
+    rows, and the planner's estimate beyond that, shown as "about N".
+    """
+
+    def __init__(self, page_size=50, max_offset=5000, exact_count_limit=10000):
+        self.page_size = page_size
+        self.max_offset = max_offset
+        self.exact_count_limit = exact_count_limit
+
+    def init_app(self, app):
+        self.page_size = app.config.get('LIST_PAGE_SIZE', self.page_size)
+        self.max_offset = app.config.get('LIST_MAX_OFFSET', self.max_offset)
+        self.exact_count_limit = app.config.get('LIST_EXACT_COUNT_LIMIT', self.exact_count_limit)
+
+    def count(self, session, from_, where, params):
+        """Returns (total, exact): exact for small results, the planner's estimate otherwise."""
+        plan = session.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {from_} WHERE {where}"), params).scalar()
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate > self.exact_count_limit:
+            return estimate, False
+        return session.execute(text(f"SELECT COUNT(*) FROM {from_} WHERE {where}"), params).scalar(), True
+
+    def paginate(self, session, columns, from_, order, key, where=(), params=None, nullable=(), types=None):
+        """Fetch the page of ``SELECT columns FROM from_ WHERE where ORDER BY order`` the request asks for.
+
+        ``key`` is the unique key (a column or a tuple of integer columns)
+        that breaks ties in ``order``; ``nullable`` names columns that may be
+        NULL, which rules out keyset paging for sorts that use them.
+        ``types`` maps each sort expression other than the key to its SQL type
+        (as in search.SORTS), so a tampered cursor is rejected before the query.
+        """
+        params = dict(params or {})
+        keys = (key,) if isinstance(key, str) else tuple(key)
+        terms = parse_order(order)
+        tie = terms[-1][1]
+        terms += [(column, tie) for column in keys if column not in [expression for expression, _ in terms]]
+
+        where = list(where)
+        where_sql = " AND ".join(where) or "TRUE"
+        total, total_exact = self.count(session, from_, where_sql, params)
+
+        args = request.args.to_dict()
+        args.pop('cursor', None)
+        args.pop('page', None)
+        sort_columns = ", ".join(f"{expression} AS sort_key_{i}" for i, (expression, _) in enumerate(terms))
+        order_sql = ", ".join(f"{expression} {direction}" for expression, direction in terms)
+        params['page_limit'] = self.page_size + 1
+
+        if not any(column in expression for expression, _ in terms for column in nullable):
+            cursor = request.args.get('cursor')
+            if cursor:
+                try:
+                    values = decode_cursor(cursor, size=len(terms), ids=len(keys),
+                                           types=[types[expression] for expression, _ in terms[:-len(keys)]])
+                except ValueError:
+                    values = None
+                if values is not None:
+                    where.append(keyset_condition(terms))
+                    params.update({f"cursor_{i}": value for i, value in enumerate(values)})
+            rows = session.execute(text(f"""
+                SELECT {columns}, {sort_columns} FROM {from_}
+                WHERE {" AND ".join(where) or "TRUE"}
+                ORDER BY {order_sql}
+                LIMIT :page_limit
+            """), params).fetchall()
+            page = Page(rows[:self.page_size], total, total_exact)
+            if cursor:
+                page.first_url = url_for(request.endpoint, **request.view_args, **args)
+            if len(rows) > self.page_size:
+                last = rows[self.page_size - 1]._mapping
+                page.next_url = url_for(request.endpoint, **request.view_args, **args,
+                                        cursor=encode_cursor(last[f"sort_key_{i}"] for i in range(len(terms))))
+            return page
+
+        number = max(request.args.get('page', 1, type=int), 1)
+        last_page = self.max_offset // self.page_size + 1
+        truncated = number >= last_page
+        number = min(number, last_page)
+        params['page_offset'] = (number - 1) * self.page_size
+        rows = session.execute(text(f"""
+            SELECT {columns} FROM {from_}
+            WHERE {where_sql}
+            ORDER BY {order_sql}
+            LIMIT :page_limit OFFSET :page_offset
+        """), params).fetchall()
+        page = Page(rows[:self.page_size], total, total_exact, number=number)
+        if number > 1:
+            page.first_url = url_for(request.endpoint, **request.view_args, **args)
+            page.prev_url = url_for(request.endpoint, **request.view_args, **args, page=number - 1)
+        if len(rows) > self.page_size:
+            if truncated:
+                page.truncated = True
+            else:
+                page.next_url = url_for(request.endpoint, **request.view_args, **args, page=number + 1)
+        return page
+
+
+paginator = Paginator()
@@ -0,0 +1,77 @@
+import time
+from sqlalchemy import text
+
+# Each batch is one DELETE; the statement-level archive triggers copy it into the archive
+# with one joined INSERT. Rentals go first: deleting a booking nulls Rental.BookingID,
+# which the rental archive keeps.
+JOBS = {
+    'rentals': text("""
+        DELETE FROM Rental
+        WHERE RentalID IN (
+            SELECT RentalID FROM Rental
+            WHERE Status = 'Completed' AND CheckOutDate < CURRENT_DATE - :age
+            ORDER BY CheckOutDate
+            LIMIT :batch
+            FOR UPDATE SKIP LOCKED
+        )
+    """),
+    'bookings': text("""
+        DELETE FROM Booking
+        WHERE BookingID IN (
+            SELECT BookingID FROM Booking
+            WHERE Status IN ('Cancelled', 'No-show', 'Checked-in') AND CheckOutDate < CURRENT_DATE - :age
+            ORDER BY CheckOutDate
+            LIMIT :batch
+            FOR UPDATE SKIP LOCKED
+        )
+    """),
+}
+
+
+class ArchiveRetention:
+    """Moves finished bookings and rentals into the archive tables once they are old.
+
+    Completed rentals, and Cancelled, No-show and Checked-in bookings, whose
+    check-out is more than ``age_days`` ago are deleted ``batch_size`` rows
+    per statement, and the archive triggers copy each batch with one joined
+    INSERT. Each batch commits on its own and the job sleeps ``pause``
+    seconds between batches, so it never holds many locks or hogs the database while the
+    hotels are busy. Rows a request is writing are skipped until next time.
+
+    Run it with ``flask archive-old``, from cron say.
+    """
+
+    def __init__(self, age_days=365, batch_size=1000, pause=0.1):
+        self.age_days = age_days
+        self.batch_size = batch_size
+        self.pause = pause
+
+    def init_app(self, app):
+        self.age_days = app.config.get('ARCHIVE_AFTER_DAYS', self.age_days)
+        self.batch_size = app.config.get('ARCHIVE_BATCH_SIZE', self.batch_size)
+        self.pause = app.config.get('ARCHIVE_PAUSE', self.pause)
+
+    def run(self, session, max_batches=None):
+        """Archive every old enough row, or ``max_batches`` batches per table; returns {job: (rows, batches, seconds)}."""
+        params = {'age': self.age_days, 'batch': self.batch_size}
+        results = {}
+        for job, statement in JOBS.items():
+            start = time.perf_counter()
+            rows = batches = 0
+            while max_batches is None or batches < max_batches:
+                try:
+                    archived = session.execute(statement, params).rowcount
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    raise
+                rows += archived
+                batches += 1
+                if archived < self.batch_size:
+                    break
+                time.sleep(self.pause)
+            results[job] = (rows, batches, time.perf_counter() - start)
+        return results
+
+
+archive_retention = ArchiveRetention()
@@ -0,0 +1,103 @@
+from datetime import date
+from flask import Blueprint, current_app, jsonify, request, session
+from app import db
+from availability import availability_index
+from bookings import bulk_book
+from room_locks import room_writes
+from search_cache import search_cache
+from search import parse_criteria, room_to_dict, search_etag, search_page
+
+bp_api = Blueprint('api', __name__)
+
+@bp_api.route('/api/search')
+def search():
+    if 'user_type' not in session:
+        return jsonify({'error': 'Login required'}), 401
+
+    try:
+        criteria = parse_criteria(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if criteria['checkin'] >= criteria['checkout']:
+        return jsonify({'error': 'Check-out must be after check-in'}), 400
+
+    cursor = request.args.get("cursor")
+    page_size = current_app.config.get('SEARCH_PAGE_SIZE', 25)
+
+    # The ETag only needs the version counters, so polling clients with an
+    # unchanged page get a 304 without the search query ever running.
+    etag = search_etag(db.session, criteria, cursor, page_size)
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    # Read straight from the database: a page from the per-process cache, or
+    # one narrowed by the per-process availability index, may predate writes
+    # made by other processes that the ETag already reflects.
+    try:
+        rooms, next_cursor, facets = search_page(db.session, criteria, cursor, page_size, use_index=False)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify({
+        'rooms': [room_to_dict(room) for room in rooms],
+        'facets': {facet: [[value, count] for value, _, count in values] for facet, values in facets.items()}
+                  if facets is not None else None,
+        'next': next_cursor,
+    })
+    response.set_etag(etag)
+    return response
+
+
+@bp_api.route('/api/bookings', methods=['POST'])
+def bulk_booking():
+    if 'user_type' not in session:
+        return jsonify({'error': 'Login required'}), 401
+
+    payload = request.get_json(silent=True) or {}
+    raw_items = payload.get('items')
+    best_effort = payload.get('mode') == 'best_effort'
+    max_items = current_app.config.get('BULK_BOOKING_MAX_ITEMS', 100)
+    if not isinstance(raw_items, list) or not raw_items:
+        return jsonify({'error': 'items must be a non-empty list'}), 400
+    if len(raw_items) > max_items:
+        return jsonify({'error': f'At most {max_items} rooms per request'}), 400
+
+    # Customers book for themselves; employees name the customer on each item
+    # and, unless they are admins, may only book rooms in their own hotel.
+    is_employee = session['user_type'] == 'employee'
+    items = []
+    try:
+        for raw in raw_items:
+            item = {
+                'hotel_id': int(raw['hotel_id']),
+                'room_id': int(raw['room_id']),
+                'checkin': date.fromisoformat(raw['checkin']),
+                'checkout': date.fromisoformat(raw['checkout']),
+                'customer_id': int(raw['customer_id']) if is_employee else session['user_id'],
+            }
+            if is_employee and session.get('position') != 'Admin' and item['hotel_id'] != session.get('hotel_id'):
+                return jsonify({'error': 'You can only book rooms in your own hotel'}), 403
+            items.append(item)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Each item needs hotel_id, room_id, checkin and checkout (YYYY-MM-DD)'
+                                 + (' and customer_id' if is_employee else '')}), 400
+
+    def book():
+        # Every room's lock up front and in order, as the booking workers take them
+        for hotel_id, room_id in sorted({(item['hotel_id'], item['room_id']) for item in items}):
+            room_writes.lock_room(db.session, hotel_id, room_id)
+        return bulk_book(db.session, items, best_effort)
+
+    # All-or-nothing inserts nothing unless every item is booked, so committing is safe either way
+    results = room_writes.run(db.session, book)
+    booked = [result for result in results if 'booking_id' in result]
+    if not best_effort and len(booked) < len(results):
+        return jsonify({'booked': 0, 'results': results}), 409
+
+    for result in booked:
+        availability_index.occupy(result['hotel_id'], result['room_id'], result['checkin'], result['checkout'])
+        search_cache.invalidate(result['hotel_id'], result['checkin'], result['checkout'])
+
+    return jsonify({'booked': len(booked), 'results': results}), 201 if booked else 200
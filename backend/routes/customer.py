@@ -1,7 +1,15 @@
-from flask import Blueprint, flash, render_template, request, redirect, url_for, session
+from flask import Blueprint, current_app, flash, jsonify, render_template, request, redirect, url_for, session
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from datetime import date, datetime
 from app import db
+from availability import availability_index
+from booking_queue import booking_queue
+from holds import HoldUnavailable, room_holds
+from idempotency import idempotency_keys
+from room_locks import room_writes
+from search import parse_criteria, cached_search_page, flexible_search, room_to_dict
+from search_cache import search_cache
 
 
 bp_customer = Blueprint('customer', __name__)
@@ -11,118 +19,56 @@ def search_rooms():
     if 'user_type' not in session or session['user_type'] != 'customer':
         return redirect(url_for('auth.login'))
 
-    checkin = request.args.get("checkin")
-    checkout = request.args.get("checkout")
-    sort_by = request.args.get("sort")
-
-    if not checkin or not checkout:
+    if not request.args.get("checkin") or not request.args.get("checkout"):
         return render_template("customer/search.html", rooms=[], checkin=None, checkout=None)
 
     try:
-        checkin = datetime.strptime(checkin, "%Y-%m-%d").date()
-        checkout = datetime.strptime(checkout, "%Y-%m-%d").date()
-        if checkin >= checkout:
-            return render_template("customer/search.html", rooms=[], checkin=checkin, checkout=checkout, error="Check-out must be after check-in")
-    except Exception:
-        return render_template("customer/search.html", rooms=[], checkin=None, checkout=None, error="Invalid dates")
-
-    filters = ["r.Status = 'Available'"]
-    params = {"checkin": checkin, "checkout": checkout}
-
-    if request.args.get("capacity"):
-        filters.append("r.Capacity = :capacity")
-        params["capacity"] = request.args["capacity"]
-
-    if request.args.get("area"):
-        filters.append("h.Address ILIKE :area")
-        params["area"] = f"%{request.args['area']}%"
-
-    if request.args.get("chain"):
-        filters.append("hc.ChainName ILIKE :chain")
-        params["chain"] = f"%{request.args['chain']}%"
-
-    if request.args.get("category"):
-        filters.append("h.Category = :category")
-        params["category"] = request.args["category"]
-
-    if request.args.get("price"):
-        filters.append("r.Price <= :price")
-        params["price"] = request.args["price"]
-
-    if request.args.get("minrooms"):
-        filters.append("h.Num_Rooms >= :minrooms")
-        params["minrooms"] = request.args["minrooms"]
-
-    if request.args.get("minhotelrooms"):
-        filters.append("h.Num_Rooms >= :minhotelrooms")
-        params["minhotelrooms"] = request.args["minhotelrooms"]
-
-    if request.args.get("viewtype"):
-        filters.append("r.ViewType = :viewtype")
-        params["viewtype"] = request.args["viewtype"]
-
-    
-    order_clause = "r.Price"
-    if sort_by == "price_desc":
-        order_clause = "r.Price DESC"
-    elif sort_by == "rating":
-        order_clause = "h.Rating DESC"
-    elif sort_by == "rating_asc":
-        order_clause = "h.Rating ASC"
-    elif sort_by == "category":
-        order_clause = "h.Category"
-    elif sort_by == "capacity":
-        order_clause = "CASE r.Capacity WHEN 'suite' THEN 5 WHEN 'family' THEN 4 WHEN 'triple' THEN 3 WHEN 'double' THEN 2 WHEN 'single' THEN 1 ELSE 6 END DESC"
-    elif sort_by == "capacity_asc":
-        order_clause = "CASE r.Capacity WHEN 'single' THEN 1 WHEN 'double' THEN 2 WHEN 'triple' THEN 3 WHEN 'family' THEN 4 WHEN 'suite' THEN 5 ELSE 6 END ASC"
-    elif sort_by == "amenities":
-        order_clause = """(
-            SELECT COUNT(*) FROM RoomAmenities ra
-            WHERE ra.HotelID = r.HotelID AND ra.RoomID = r.RoomID
-        ) DESC"""
-    elif sort_by == "amenities_least":
-        order_clause = """(
-            SELECT COUNT(*) FROM RoomAmenities ra
-            WHERE ra.HotelID = r.HotelID AND ra.RoomID = r.RoomID
-        ) ASC"""
-
-    query = f"""
-        SELECT r.*, h.HotelName, h.Address, hc.ChainName, h.Rating, h.Num_Rooms,
-            (
-                SELECT string_agg(ra.Amenity, ', ')
-                FROM RoomAmenities ra
-                WHERE ra.HotelID = r.HotelID AND ra.RoomID = r.RoomID
-            ) AS amenities,
-            (
-                SELECT p.Problem
-                FROM RoomProblems p
-                WHERE p.HotelID = r.HotelID AND p.RoomID = r.RoomID AND p.Resolved = FALSE
-                ORDER BY p.ReportDate DESC
-                LIMIT 1
-            ) AS problem_cause
-        FROM Room r
-        JOIN Hotel h ON r.HotelID = h.HotelID
-        JOIN HotelChain hc ON h.HotelChainID = hc.HotelChainID
-        WHERE
-            {' AND '.join(filters)} AND
-            NOT EXISTS (
-                SELECT 1 FROM Booking b
-                WHERE b.RoomID = r.RoomID AND b.HotelID = r.HotelID
-                AND (b.CheckInDate, b.CheckOutDate) OVERLAPS (:checkin, :checkout)
-            ) AND
-            NOT EXISTS (
-                SELECT 1 FROM Rental rt
-                WHERE rt.RoomID = r.RoomID AND rt.HotelID = r.HotelID
-                AND (rt.CheckInDate, rt.CheckOutDate) OVERLAPS (:checkin, :checkout)
-            )
-        ORDER BY {order_clause}
-    """
-    results = db.session.execute(text(query), params).fetchall()
-    return render_template("customer/search.html", rooms=results, checkin=checkin, checkout=checkout)
-
-
-
+        criteria = parse_criteria(request.args)
+    except ValueError as e:
+        if request.args.get("format") == "json":
+            return jsonify({'error': str(e)}), 400
+        return render_template("customer/search.html", rooms=[], checkin=None, checkout=None, error=str(e))
+
+    checkin, checkout = criteria['checkin'], criteria['checkout']
+    if checkin >= checkout:
+        return render_template("customer/search.html", rooms=[], checkin=checkin, checkout=checkout, error="Check-out must be after check-in")
+
+    # A nights value shorter than the date range turns the range into a window
+    # and finds the cheapest stay of that length per room inside it.
+    nights = request.args.get("nights", type=int)
+    flexible = nights is not None and nights < (checkout - checkin).days
+    if nights is not None and nights < 1:
+        return render_template("customer/search.html", rooms=[], checkin=checkin, checkout=checkout, error="Nights must be at least 1")
+
+    cursor = request.args.get("cursor")
+    page_size = current_app.config.get('SEARCH_PAGE_SIZE', 25)
+    facets = None
+    try:
+        if flexible:
+            results, next_cursor = flexible_search(db.session, criteria, nights, cursor, page_size)
+        else:
+            results, next_cursor, facets = cached_search_page(db.session, criteria, cursor, page_size)
+    except ValueError as e:
+        if request.args.get("format") == "json":
+            return jsonify({'error': str(e)}), 400
+        return render_template("customer/search.html", rooms=[], checkin=checkin, checkout=checkout, error=str(e))
+
+    page_args = request.args.to_dict()
+    page_args.pop("cursor", None)
+    next_url = url_for('customer.search_rooms', **page_args, cursor=next_cursor) if next_cursor else None
+    first_url = url_for('customer.search_rooms', **page_args) if cursor else None
+
+    if request.args.get("format") == "json":
+        return jsonify({
+            'rooms': [room_to_dict(room) for room in results],
+            'facets': {facet: [{'value': value, 'label': label, 'count': count} for value, label, count in values]
+                       for facet, values in facets.items()} if facets is not None else None,
+            'next': next_url,
+        })
 
+    return render_template("customer/search.html", rooms=results, checkin=checkin, checkout=checkout,
+                           next_url=next_url, first_url=first_url, flexible=flexible,
+                           facets=facets, page_args=page_args)
 
 
 @bp_customer.route('/customer/bookings')
@@ -146,6 +92,7 @@ def my_bookings():
 
 
 @bp_customer.route('/customer/book', methods=['POST'])
+@idempotency_keys.protect
 def book_room():
     if 'user_type' not in session or session['user_type'] != 'customer':
         flash("You must be logged in to book a room.")
@@ -155,11 +102,36 @@ def book_room():
     hotel_id = request.form.get("hotel_id")
     checkin = request.form.get("checkin")
     checkout = request.form.get("checkout")
+    hold_id = request.form.get("hold_id")
     customer_id = session['user_id']
     today = date.today()
 
-    try:
-        
+    if booking_queue.enabled:
+        try:
+            request_id = booking_queue.enqueue(db.session, customer_id, hotel_id, room_id, checkin, checkout, hold_id)
+        except IntegrityError:
+            # BookingRequest references Room, so a made-up hotel or room never reaches the queue.
+            flash("❌ That room does not exist.", "danger")
+            return redirect(url_for('customer.search_rooms'))
+        if request_id is None:
+            flash("⌛ Your hold on this room has expired. Please search again.", "warning")
+            return redirect(url_for('customer.search_rooms'))
+        return _booking_request_response(booking_queue.wait(db.session, request_id))
+
+    def book():
+        nonlocal hotel_id, room_id, checkin, checkout
+        # A held room is booked exactly as held, queueing for the room lock like
+        # any other write; without a hold, contended or taken rooms are turned
+        # away before the trigger-heavy INSERT (see RoomWrites).
+        if hold_id:
+            hold = room_holds.claim(db.session, hold_id, customer_id)
+            if not hold:
+                return False
+            hotel_id, room_id, checkin, checkout = hold.hotelid, hold.roomid, hold.checkindate, hold.checkoutdate
+            room_writes.lock_room(db.session, hotel_id, room_id)
+        else:
+            room_holds.check_room(db.session, customer_id, hotel_id, room_id, checkin, checkout)
+
         db.session.execute(text("""
             INSERT INTO Booking (CustomerID, HotelID, RoomID, BookingDate, CheckInDate, CheckOutDate, Status)
             VALUES (:cid, :hid, :rid, :bdate, :checkin, :checkout, 'Pending')
@@ -171,7 +143,14 @@ def book_room():
             'checkin': checkin,
             'checkout': checkout
         })
-        db.session.commit()
+        return True
+
+    try:
+        if not room_writes.run(db.session, book):
+            flash("⌛ Your hold on this room has expired. Please search again.", "warning")
+            return redirect(url_for('customer.search_rooms'))
+        availability_index.occupy(hotel_id, room_id, checkin, checkout)
+        search_cache.invalidate(hotel_id, checkin, checkout)
 
         hotel = db.session.execute(
             text("SELECT HotelName FROM Hotel WHERE HotelID = :hid"),
@@ -188,9 +167,110 @@ def book_room():
             checkout=checkout
         )
 
+    except HoldUnavailable as e:
+        flash(str(e), "warning")
+        return redirect(request.referrer or url_for('customer.search_rooms'))
+
+
+def _booking_request_response(booking_request):
+    if booking_request is None:
+        # Its room was deleted, taking the request with it.
+        flash("❌ Booking request not found.")
+        return redirect(url_for('customer.my_bookings'))
+    if booking_request.status == 'Booked':
+        return render_template(
+            "customer/book_success.html",
+            room_id=booking_request.roomid,
+            hotel_name=booking_request.hotelname,
+            checkin=booking_request.checkindate,
+            checkout=booking_request.checkoutdate
+        )
+    if booking_request.status == 'Failed':
+        flash(booking_request.message, "warning")
+        return redirect(url_for('customer.search_rooms'))
+    return render_template("customer/booking_ticket.html", booking_request=booking_request,
+                           poll_seconds=max(1, round(booking_queue.wait_timeout)))
+
+
+@bp_customer.route('/customer/booking-requests/<int:request_id>')
+def booking_request_status(request_id):
+    if 'user_type' not in session or session['user_type'] != 'customer':
+        return redirect(url_for('auth.login'))
+
+    booking_request = booking_queue.status(db.session, request_id)
+    if not booking_request or booking_request.customerid != session['user_id']:
+        if request.args.get('format') == 'json':
+            return jsonify({'error': 'Booking request not found.'}), 404
+        flash("❌ Booking request not found.")
+        return redirect(url_for('customer.my_bookings'))
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'request_id': booking_request.requestid,
+            'status': booking_request.status,
+            'booking_id': booking_request.bookingid,
+            'message': booking_request.message
+        })
+    return _booking_request_response(booking_request)
+
+
+@bp_customer.route('/customer/hold', methods=['POST'])
+def hold_room():
+    if 'user_type' not in session or session['user_type'] != 'customer':
+        flash("You must be logged in to book a room.")
+        return redirect(url_for('auth.login'))
+
+    room_id = request.form.get("room_id")
+    hotel_id = request.form.get("hotel_id")
+    checkin = request.form.get("checkin")
+    checkout = request.form.get("checkout")
+    customer_id = session['user_id']
+
+    try:
+        hold = room_holds.acquire(db.session, customer_id, hotel_id, room_id, checkin, checkout)
+        db.session.commit()
+    except HoldUnavailable as e:
+        db.session.rollback()
+        flash(str(e), "warning")
+        return redirect(request.referrer or url_for('customer.search_rooms'))
+    except Exception:
+        db.session.rollback()
+        raise
+    search_cache.invalidate(hotel_id, checkin, checkout)
+
+    hotel = db.session.execute(
+        text("SELECT HotelName FROM Hotel WHERE HotelID = :hid"),
+        {'hid': hotel_id}
+    ).fetchone()
+
+    return render_template(
+        "customer/book_form.html",
+        hold_id=hold.holdid,
+        expires_at=hold.expiresat,
+        hold_minutes=max(1, room_holds.ttl // 60),
+        room_id=room_id,
+        hotel_name=hotel[0] if hotel else "Unknown Hotel",
+        checkin=checkin,
+        checkout=checkout
+    )
+
+
+@bp_customer.route('/customer/hold/release', methods=['POST'])
+def release_hold():
+    if 'user_type' not in session or session['user_type'] != 'customer':
+        return redirect(url_for('auth.login'))
+
+    try:
+        hold = room_holds.release(db.session, request.form.get("hold_id"), session['user_id'])
+        db.session.commit()
     except Exception:
         db.session.rollback()
         raise
+    if hold:
+        search_cache.invalidate(hold.hotelid, hold.checkindate, hold.checkoutdate, freed=True)
+        flash("↩️ Hold released.", "info")
+
+    return redirect(url_for('customer.search_rooms'))
 
 
 @bp_customer.route('/customer/cancel-booking', methods=['POST'])
@@ -202,12 +282,16 @@ def cancel_booking():
     booking_id = request.form.get('booking_id')
 
     try:
-        db.session.execute(text("""
+        booking = db.session.execute(text("""
             UPDATE Booking
             SET Status = 'Cancelled'
             WHERE BookingID = :bid
-        """), {'bid': booking_id})
+            RETURNING HotelID, RoomID, CheckInDate, CheckOutDate
+        """), {'bid': booking_id}).fetchone()
         db.session.commit()
+        if booking:
+            availability_index.refresh_room(db.session, booking.hotelid, booking.roomid)
+            search_cache.invalidate(booking.hotelid, booking.checkindate, booking.checkoutdate, freed=True)
         flash("✅ Booking successfully cancelled.")
     except Exception:
         db.session.rollback()
@@ -1,7 +1,16 @@
-from flask import Blueprint, flash, render_template, request, redirect, url_for, session
+from flask import Blueprint, current_app, flash, jsonify, render_template, request, redirect, url_for, session
 from sqlalchemy import text
 from datetime import date, datetime
 from app import db
+from archive_export import archive_exports, archive_filters, parse_date_range
+from availability import availability_index
+from bulk_import import IMPORTS, bulk_import
+from holds import HoldUnavailable, room_holds
+from idempotency import idempotency_keys
+from pagination import paginator
+from room_locks import room_writes
+from search import group_search, parse_criteria, parse_group
+from search_cache import search_cache
 
 bp_employee = Blueprint('employee', __name__)
 
@@ -13,31 +22,37 @@ def employee_dashboard():
     position = session.get('position')
     hotel_id = session.get('hotel_id')
 
-    base_query = """
-        SELECT b.BookingID, b.CheckInDate, b.CheckOutDate, b.Status,
-               b.RoomID, h.HotelName, c.FullName AS CustomerName, b.HotelID
-        FROM Booking b
-        JOIN Hotel h ON b.HotelID = h.HotelID
-        JOIN Customer c ON b.CustomerID = c.CustomerID
-        WHERE b.Status IN ('Pending', 'Checked-in')
-          AND b.CheckInDate >= CURRENT_DATE
-          AND NOT EXISTS (
-              SELECT 1 FROM Rental r WHERE r.BookingID = b.BookingID
-          )
-    """
-
+    # UpcomingArrival and HotelDashboardDelta are kept current by triggers (see triggers.sql);
+    # the counters are HotelDashboard plus the deltas the sweeper has not folded in yet
+    hotel_filter = ""
     params = {}
     if position != 'Admin':
-        base_query += " AND b.HotelID = :hid"
+        hotel_filter = "AND HotelID = :hid"
         params['hid'] = hotel_id
 
-    base_query += " ORDER BY b.CheckInDate"
-
-    results = db.session.execute(text(base_query), params).fetchall()
-
-    return render_template("employee/dashboard.html", bookings=results)
+    results = db.session.execute(text(f"""
+        SELECT BookingID, CheckInDate, CheckOutDate, Status, RoomID, HotelName, CustomerName, HotelID
+        FROM UpcomingArrival
+        WHERE CheckInDate >= CURRENT_DATE {hotel_filter}
+        ORDER BY CheckInDate
+    """), params).fetchall()
+
+    summary = db.session.execute(text(f"""
+        SELECT
+            (SELECT COUNT(*) FROM UpcomingArrival WHERE CheckInDate = CURRENT_DATE {hotel_filter}) AS ArrivalsToday,
+            COALESCE(SUM(PendingBookings), 0) AS PendingBookings,
+            COALESCE(SUM(InHouseRentals), 0) AS InHouseRentals,
+            COALESCE(SUM(OutOfOrderRooms), 0) AS OutOfOrderRooms
+        FROM (SELECT HotelID, PendingBookings, InHouseRentals, OutOfOrderRooms FROM HotelDashboard
+              UNION ALL
+              SELECT HotelID, PendingBookings, InHouseRentals, OutOfOrderRooms FROM HotelDashboardDelta) counters
+        WHERE TRUE {hotel_filter}
+    """), params).fetchone()
+
+    return render_template("employee/dashboard.html", bookings=results, summary=summary)
 
 @bp_employee.route('/employee/convert-booking', methods=['POST'])
+@idempotency_keys.protect
 def convert_booking():
     if 'user_type' not in session or session['user_type'] != 'employee':
         flash("You must be logged in as an employee.")
@@ -52,19 +67,19 @@ def convert_booking():
         flash("❌ Access denied.")
         return redirect(url_for('employee.employee_dashboard'))
 
-    try:
+    def convert():
         booking = db.session.execute(text("""
             SELECT * FROM Booking WHERE BookingID = :bid
         """), {'bid': booking_id}).fetchone()
 
         if not booking:
-            flash("❌ Booking not found.")
-            return redirect(url_for('employee.employee_dashboard'))
+            return None, "❌ Booking not found."
 
         
         if position != 'Admin' and booking.hotelid != hotel_id:
-            flash("❌ You are not authorized to convert bookings from other hotels.")
-            return redirect(url_for('employee.employee_dashboard'))
+            return None, "❌ You are not authorized to convert bookings from other hotels."
+
+        room_writes.lock_room(db.session, booking.hotelid, booking.roomid)
 
         db.session.execute(text("""
             UPDATE Booking SET Status = 'Checked-in' WHERE BookingID = :bid
@@ -88,17 +103,21 @@ def convert_booking():
             'checkin': booking.checkindate,
             'checkout': booking.checkoutdate
         })
+        return booking, None
 
-        db.session.commit()
-        flash("✅ Booking converted to rental.")
+    booking, error = room_writes.run(db.session, convert)
+    if error:
+        flash(error)
+        return redirect(url_for('employee.employee_dashboard'))
 
-    except Exception:
-        db.session.rollback()
-        raise
+    availability_index.occupy(booking.hotelid, booking.roomid, booking.checkindate, booking.checkoutdate)
+    search_cache.invalidate(booking.hotelid, booking.checkindate, booking.checkoutdate)
+    flash("✅ Booking converted to rental.")
 
     return redirect(url_for('employee.employee_dashboard'))
 
 @bp_employee.route('/employee/rent-room', methods=['GET', 'POST'])
+@idempotency_keys.protect
 def rent_room():
     if 'user_type' not in session or session['user_type'] != 'employee':
         flash("You must be logged in as an employee.")
@@ -134,7 +153,9 @@ def rent_room():
             flash("❌ Customer ID and Name do not match any existing customer.")
             return redirect(url_for('employee.rent_room'))
 
-        try:
+        def rent():
+            room_writes.lock_room(db.session, hotel_id, room_id)
+            room_holds.check_not_held(db.session, customer_id, hotel_id, room_id, checkin, checkout)
             db.session.execute(text("""
                 INSERT INTO Rental (
                     CustomerID, HotelID, RoomID, EmployeeID,
@@ -156,7 +177,11 @@ def rent_room():
                 "payment_amount": payment_amount,
                 "payment_method": payment_method
             })
-            db.session.commit()
+
+        try:
+            room_writes.run(db.session, rent)
+            availability_index.occupy(hotel_id, room_id, checkin, checkout)
+            search_cache.invalidate(hotel_id, checkin, checkout)
 
             hotel = db.session.execute(text("""
                 SELECT HotelName FROM Hotel WHERE HotelID = :hid
@@ -174,6 +199,10 @@ def rent_room():
                 current_date=date.today()
             )
 
+        except HoldUnavailable as e:
+            flash(str(e), "warning")
+            return redirect(url_for('employee.rent_room'))
+
         except Exception:
             db.session.rollback()
             raise
@@ -196,11 +225,10 @@ def manage_customers():
     }
     order_clause = sort_map.get(sort, "CustomerID")
 
-    customers = db.session.execute(text(f"""
-        SELECT * FROM Customer ORDER BY {order_clause}
-    """)).fetchall()
+    page = paginator.paginate(db.session, "*", "Customer", order_clause, key="CustomerID",
+                              types={"FullName": "TEXT", "RegistrationDate": "DATE", "IDType": "TEXT"})
 
-    return render_template("employee/customers.html", customers=customers, sort=sort)
+    return render_template("employee/customers.html", customers=page.rows, page=page, sort=sort)
 
 
 @bp_employee.route('/employee/customers/add', methods=['GET', 'POST'])
@@ -236,6 +264,36 @@ def add_customer():
 
     return render_template("employee/customer_form.html", customer=None)
 
+@bp_employee.route('/employee/import', methods=['GET', 'POST'])
+def bulk_import_csv():
+    if 'user_type' not in session or session['user_type'] != 'employee' or session.get('position') != 'Admin':
+        flash("❌ Only admins can import data.")
+        return redirect(url_for('employee.employee_dashboard'))
+
+    results = None
+    dry_run = False
+    if request.method == 'POST':
+        files = {kind: request.files[kind].stream for kind in IMPORTS
+                 if kind in request.files and request.files[kind].filename}
+        dry_run = request.form.get('dry_run') == 'true'
+        if not files:
+            flash("❌ Choose at least one CSV file.")
+            return redirect(url_for('employee.bulk_import_csv'))
+
+        try:
+            results = bulk_import.run(db.session, files, dry_run=dry_run)
+        except ValueError as e:
+            flash(f"❌ {e}")
+            return redirect(url_for('employee.bulk_import_csv'))
+
+        if not dry_run:
+            availability_index.invalidate()
+            for hid in {hid for result in results.values() for hid in result.hotels}:
+                search_cache.invalidate(hid, freed=True)
+            flash(f"✅ Imported {sum(result.merged for result in results.values())} row(s).")
+
+    return render_template("employee/bulk_import.html", imports=IMPORTS, results=results, dry_run=dry_run)
+
 @bp_employee.route('/employee/customers/edit/<int:customer_id>', methods=['GET', 'POST'])
 def edit_customer(customer_id):
     if 'user_type' not in session or session['user_type'] != 'employee' or session.get('position') != 'Admin':
@@ -289,6 +347,8 @@ def delete_customer(customer_id):
     try:
         db.session.execute(text("DELETE FROM Customer WHERE CustomerID = :cid"), {'cid': customer_id})
         db.session.commit()
+        availability_index.invalidate()
+        search_cache.clear()
         flash("🗑️ Customer deleted successfully.")
     except Exception:
         db.session.rollback()
@@ -317,28 +377,19 @@ def manage_employees():
     order_clause = sort_map.get(sort, "EmployeeID")
 
     if position == 'Admin':
-        query = text(f"""
-            SELECT EmployeeID, FullName, Address, Position, SSN, HotelID
-            FROM Employee
-            ORDER BY {order_clause}
-        """)
-        params = {}
+        where, params = [], {}
 
     elif position == 'Manager':
-        query = text(f"""
-            SELECT EmployeeID, FullName, Address, Position, SSN, HotelID
-            FROM Employee
-            WHERE HotelID = :hid
-            ORDER BY {order_clause}
-        """)
-        params = {'hid': hotel_id}
+        where, params = ["HotelID = :hid"], {'hid': hotel_id}
 
     else:
         flash("❌ Access denied.")
         return redirect(url_for('employee.employee_dashboard'))
 
-    employees = db.session.execute(query, params).fetchall()
-    return render_template("employee/employees.html", employees=employees, sort=sort)
+    page = paginator.paginate(db.session, "EmployeeID, FullName, Address, Position, SSN, HotelID", "Employee",
+                              order_clause, key="EmployeeID", where=where, params=params, nullable=("HotelID",),
+                              types={"FullName": "TEXT", "Address": "TEXT", "Position": "TEXT", "SSN": "TEXT"})
+    return render_template("employee/employees.html", employees=page.rows, page=page, sort=sort)
 
 
 @bp_employee.route('/employee/employees/add', methods=['GET', 'POST'])
@@ -569,11 +620,11 @@ def manage_hotels():
 
     order_clause = sort_map.get(sort, "HotelID")
 
-    hotels = db.session.execute(text(f"""
-        SELECT * FROM Hotel ORDER BY {order_clause}
-    """)).fetchall()
+    page = paginator.paginate(db.session, "*", "Hotel", order_clause, key="HotelID",
+                              types={"HotelName": "TEXT", "Address": "TEXT", "Category": "TEXT",
+                                     "Num_Rooms": "INTEGER", "Rating": "INTEGER"})
 
-    return render_template("employee/hotels.html", hotels=hotels, sort=sort)
+    return render_template("employee/hotels.html", hotels=page.rows, page=page, sort=sort)
 
 
 
@@ -698,6 +749,8 @@ def edit_hotel(hotel_id):
                 'hid': hotel_id
             })
             db.session.commit()
+            # Name, address, chain, category, size and rating are all filtered on or shown in results
+            search_cache.invalidate(hotel_id, freed=True)
             flash("✅ Hotel updated successfully.")
             return redirect(url_for('employee.manage_hotels'))
 
@@ -724,6 +777,8 @@ def delete_hotel(hotel_id):
     try:
         db.session.execute(text("DELETE FROM Hotel WHERE HotelID = :hid"), {'hid': hotel_id})
         db.session.commit()
+        availability_index.invalidate()
+        search_cache.invalidate(hotel_id)
         flash("✅ Hotel deleted successfully.")
     except Exception:
         db.session.rollback()
@@ -755,17 +810,17 @@ def manage_rooms():
     order_clause = sort_map.get(sort, 'RoomID ASC')
 
     if position == 'Admin':
-        query = text(f"SELECT * FROM Room ORDER BY {order_clause}")
-        params = {}
+        where, params = [], {}
     elif position == 'Manager':
-        query = text(f"SELECT * FROM Room WHERE HotelID = :hid ORDER BY {order_clause}")
-        params = {'hid': hotel_id}
+        where, params = ["HotelID = :hid"], {'hid': hotel_id}
     else:
         flash("❌ Access denied.")
         return redirect(url_for('employee.employee_dashboard'))
 
-    rooms = db.session.execute(query, params).fetchall()
-    return render_template("employee/rooms.html", rooms=rooms, sort=sort)
+    page = paginator.paginate(db.session, "*", "Room", order_clause, key=("HotelID", "RoomID"),
+                              where=where, params=params,
+                              types={"Price": "NUMERIC", sort_map['capacity']: "INTEGER", "Status": "TEXT", "ViewType": "TEXT"})
+    return render_template("employee/rooms.html", rooms=page.rows, page=page, sort=sort)
 
 
 
@@ -820,6 +875,8 @@ def add_room():
                 'status': status
             })
             db.session.commit()
+            availability_index.invalidate()
+            search_cache.invalidate(hotel_id_input, freed=True)
             flash("✅ Room added successfully.")
             return redirect(url_for('employee.manage_rooms'))
 
@@ -898,6 +955,9 @@ def edit_room(room_id):
                 'rid': room_id
             })
             db.session.commit()
+            availability_index.invalidate()
+            search_cache.invalidate(room.hotelid)
+            search_cache.invalidate(hotel_id_input, freed=True)
             flash("✅ Room updated successfully.")
             return redirect(url_for('employee.manage_rooms'))
 
@@ -922,6 +982,8 @@ def delete_room(hotel_id, room_id):
             {'hid': hotel_id, 'rid': room_id}
         )
         db.session.commit()
+        availability_index.refresh_room(db.session, hotel_id, room_id)
+        search_cache.invalidate(hotel_id)
         flash("✅ Room deleted successfully.")
     except Exception:
         db.session.rollback()
@@ -1018,6 +1080,7 @@ def add_room_problem():
                 'rdate': report_date
             })
             db.session.commit()
+            search_cache.invalidate(hotel_id_form)
             flash("✅ Room problem reported successfully.")
             return redirect(url_for('employee.manage_room_problems'))
 
@@ -1028,6 +1091,173 @@ def add_room_problem():
     return render_template("employee/room_problem_form.html", mode='add', hotel_id=hotel_id, current_date=date.today().isoformat())
 
 
+# Most rooms one bulk report or resolve may name.
+MAX_BULK_ROOMS = 1000
+
+
+def parse_room_list(spec):
+    """Room IDs from a list like ``301-320, 325``; raises ValueError on a bad or oversized list."""
+    rooms = set()
+    for part in spec.replace(' ', '').split(','):
+        if not part:
+            continue
+        low, _, high = part.partition('-')
+        low, high = int(low), int(high or low)
+        if low < 1 or high < low or high - low >= MAX_BULK_ROOMS:
+            raise ValueError(part)
+        rooms.update(range(low, high + 1))
+        if len(rooms) > MAX_BULK_ROOMS:
+            raise ValueError(part)
+    if not rooms:
+        raise ValueError(spec)
+    return sorted(rooms)
+
+
+@bp_employee.route('/employee/problems/bulk-report', methods=['GET', 'POST'])
+def bulk_report_room_problems():
+    if 'user_type' not in session or session['user_type'] != 'employee':
+        return redirect(url_for('auth.login'))
+
+    position = session.get('position')
+    hotel_id = session.get('hotel_id') if position == 'Manager' else None
+
+    if request.method == 'POST':
+        try:
+            hotel_id_form = int(request.form.get('hotel_id'))
+            rooms = parse_room_list(request.form.get('rooms', ''))
+            report_date = date.fromisoformat(request.form.get('report_date', ''))
+        except (TypeError, ValueError):
+            flash(f"❌ Invalid input: give a hotel, rooms like 301-320, 325 (at most {MAX_BULK_ROOMS}) and a report date.")
+            return redirect(url_for('employee.bulk_report_room_problems'))
+        problem = request.form.get('problem', '').strip()
+
+        if not problem:
+            flash("❌ Problem description cannot be empty.")
+            return redirect(url_for('employee.bulk_report_room_problems'))
+        if report_date > date.today():
+            flash("❌ Report date cannot be in the future.")
+            return redirect(url_for('employee.bulk_report_room_problems'))
+        if position == 'Manager' and hotel_id != hotel_id_form:
+            flash("⚠️ Managers can only report problems for their own hotel.")
+            return redirect(url_for('employee.manage_room_problems'))
+
+        try:
+            # One statement for every room, so the status trigger runs once. Rooms that do not
+            # exist, or that are Booked or Occupied (which restrict_problem_reporting refuses),
+            # are skipped; a resolved problem reported again is reopened.
+            counts = db.session.execute(text("""
+                WITH rooms AS (
+                    SELECT HotelID, RoomID, Status IN ('Available', 'Out-of-Order') AS reportable
+                    FROM Room
+                    WHERE HotelID = :hid AND RoomID = ANY(:rooms)
+                ), reported AS (
+                    INSERT INTO RoomProblems (HotelID, RoomID, Problem, ReportDate, Resolved)
+                    SELECT HotelID, RoomID, :prob, :rdate, FALSE
+                    FROM rooms
+                    WHERE reportable
+                    ON CONFLICT (HotelID, RoomID, Problem) DO UPDATE
+                    SET ReportDate = EXCLUDED.ReportDate, Resolved = FALSE
+                    WHERE RoomProblems.Resolved
+                    RETURNING 1
+                )
+                SELECT (SELECT COUNT(*) FROM reported) AS reported,
+                       COUNT(*) AS found,
+                       COUNT(*) FILTER (WHERE NOT reportable) AS busy
+                FROM rooms
+            """), {
+                'hid': hotel_id_form,
+                'rooms': rooms,
+                'prob': problem,
+                'rdate': report_date
+            }).fetchone()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        search_cache.invalidate(hotel_id_form)
+        skipped = [
+            (len(rooms) - counts.found, "no such room"),
+            (counts.busy, "Booked or Occupied"),
+            (counts.found - counts.busy - counts.reported, "already reported"),
+        ]
+        flash(f"✅ Problem reported for {counts.reported} room(s)."
+              + "".join(f" {count} skipped ({reason})." for count, reason in skipped if count))
+        return redirect(url_for('employee.manage_room_problems'))
+
+    return render_template("employee/room_problem_bulk_form.html", mode='report', hotel_id=hotel_id,
+                           current_date=date.today().isoformat())
+
+
+@bp_employee.route('/employee/problems/bulk-resolve', methods=['GET', 'POST'])
+def bulk_resolve_room_problems():
+    if 'user_type' not in session or session['user_type'] != 'employee':
+        return redirect(url_for('auth.login'))
+
+    position = session.get('position')
+    hotel_id = session.get('hotel_id') if position == 'Manager' else None
+
+    if request.method == 'POST':
+        selected = request.form.getlist('selected')
+        if selected:
+            # Ticked on the problem list, as "hotel:room:problem".
+            try:
+                keys = [value.split(':', 2) for value in selected]
+                hids = [int(hid) for hid, _, _ in keys]
+                rids = [int(rid) for _, rid, _ in keys]
+                probs = [prob for _, _, prob in keys]
+            except ValueError:
+                flash("❌ Invalid problem selection.")
+                return redirect(url_for('employee.manage_room_problems'))
+            if position == 'Manager' and set(hids) != {hotel_id}:
+                flash("⚠️ Managers can only resolve problems in their own hotel.")
+                return redirect(url_for('employee.manage_room_problems'))
+            query = text("""
+                UPDATE RoomProblems p
+                SET Resolved = TRUE
+                FROM unnest(CAST(:hids AS INTEGER[]), CAST(:rids AS INTEGER[]), CAST(:probs AS TEXT[])) AS s(HotelID, RoomID, Problem)
+                WHERE p.HotelID = s.HotelID AND p.RoomID = s.RoomID AND p.Problem = s.Problem
+                  AND p.Resolved = FALSE
+                RETURNING p.HotelID
+            """)
+            params = {'hids': hids, 'rids': rids, 'probs': probs}
+        else:
+            try:
+                hotel_id_form = int(request.form.get('hotel_id'))
+                rooms = parse_room_list(request.form.get('rooms', ''))
+            except (TypeError, ValueError):
+                flash(f"❌ Invalid input: give a hotel and rooms like 301-320, 325 (at most {MAX_BULK_ROOMS}).")
+                return redirect(url_for('employee.bulk_resolve_room_problems'))
+            if position == 'Manager' and hotel_id != hotel_id_form:
+                flash("⚠️ Managers can only resolve problems in their own hotel.")
+                return redirect(url_for('employee.manage_room_problems'))
+            # Without a description every open problem in those rooms is resolved.
+            problem = request.form.get('problem', '').strip()
+            query = text("""
+                UPDATE RoomProblems
+                SET Resolved = TRUE
+                WHERE HotelID = :hid AND RoomID = ANY(:rooms) AND Resolved = FALSE
+                  AND (CAST(:prob AS TEXT) IS NULL OR Problem = :prob)
+                RETURNING HotelID
+            """)
+            params = {'hid': hotel_id_form, 'rooms': rooms, 'prob': problem or None}
+
+        try:
+            resolved = db.session.execute(query, params).scalars().all()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        for hid in set(resolved):
+            search_cache.invalidate(hid, freed=True)
+        flash(f"✅ {len(resolved)} problem(s) resolved.")
+        return redirect(url_for('employee.manage_room_problems'))
+
+    return render_template("employee/room_problem_bulk_form.html", mode='resolve', hotel_id=hotel_id,
+                           current_date=date.today().isoformat())
+
+
 @bp_employee.route('/employee/problems/edit/<int:room_id>/<path:problem>', methods=['GET', 'POST'])
 def edit_room_problem(room_id, problem):
     if 'user_type' not in session or session['user_type'] != 'employee':
@@ -1073,6 +1303,7 @@ def edit_room_problem(room_id, problem):
                 'old_prob': problem
             })
             db.session.commit()
+            search_cache.invalidate(room_problem.hotelid, freed=True)
             flash("✅ Room problem updated.")
             return redirect(url_for('employee.manage_room_problems'))
 
@@ -1115,6 +1346,7 @@ def delete_room_problem(room_id, problem):
             'prob': problem
         })
         db.session.commit()
+        search_cache.invalidate(problem_row.hotelid, freed=True)
         flash("✅ Room problem deleted.")
     except Exception:
         db.session.rollback()
@@ -1147,29 +1379,21 @@ def view_bookings():
     order_clause = order_map.get(sort, 'b.CheckInDate DESC')
 
     if position == 'Admin':
-        query = text(f"""
-            SELECT b.BookingID, c.FullName AS CustomerName, h.HotelName, b.RoomID,
-                   b.BookingDate, b.CheckInDate, b.CheckOutDate, b.Status
-            FROM Booking b
-            JOIN Customer c ON b.CustomerID = c.CustomerID
-            JOIN Hotel h ON b.HotelID = h.HotelID
-            ORDER BY {order_clause}
-        """)
-        params = {}
+        where, params = [], {}
     else:
-        query = text(f"""
-            SELECT b.BookingID, c.FullName AS CustomerName, h.HotelName, b.RoomID,
-                   b.BookingDate, b.CheckInDate, b.CheckOutDate, b.Status
-            FROM Booking b
+        where, params = ["b.HotelID = :hid"], {'hid': hotel_id}
+
+    page = paginator.paginate(db.session, """
+            b.BookingID, c.FullName AS CustomerName, h.HotelName, b.RoomID,
+            b.BookingDate, b.CheckInDate, b.CheckOutDate, b.Status
+        """, """
+            Booking b
             JOIN Customer c ON b.CustomerID = c.CustomerID
             JOIN Hotel h ON b.HotelID = h.HotelID
-            WHERE b.HotelID = :hid
-            ORDER BY {order_clause}
-        """)
-        params = {'hid': hotel_id}
-
-    bookings = db.session.execute(query, params).fetchall()
-    return render_template("employee/view_bookings.html", bookings=bookings, sort=sort)
+        """, order_clause, key="b.BookingID", where=where, params=params,
+        types={"b.CheckInDate": "DATE", "b.BookingDate": "DATE", "c.FullName": "TEXT", "h.HotelName": "TEXT",
+               "b.Status": "TEXT"})
+    return render_template("employee/view_bookings.html", bookings=page.rows, page=page, sort=sort)
 
 
 @bp_employee.route('/employee/bookings/delete/<int:booking_id>', methods=['POST'])
@@ -1178,8 +1402,14 @@ def delete_booking(booking_id):
         return redirect(url_for('auth.login'))
 
     try:
-        db.session.execute(text("DELETE FROM Booking WHERE BookingID = :bid"), {'bid': booking_id})
+        booking = db.session.execute(
+            text("DELETE FROM Booking WHERE BookingID = :bid RETURNING HotelID, RoomID, CheckInDate, CheckOutDate"),
+            {'bid': booking_id}
+        ).fetchone()
         db.session.commit()
+        if booking:
+            availability_index.refresh_room(db.session, booking.hotelid, booking.roomid)
+            search_cache.invalidate(booking.hotelid, booking.checkindate, booking.checkoutdate, freed=True)
         flash("✅ Booking archived and deleted.")
     except Exception:
         db.session.rollback()
@@ -1212,45 +1442,23 @@ def view_rentals():
     }
     order_clause = sort_options.get(sort, 'r.CheckInDate DESC')
 
-    
-    db.session.execute(text("""
-        UPDATE Rental
-        SET Status = 'Completed'
-        WHERE Status != 'Completed'
-          AND CURRENT_DATE > CheckOutDate;
-    """))
-    db.session.execute(text("""
-        UPDATE Rental
-        SET Status = 'Ongoing'
-        WHERE Status NOT IN ('Completed')
-          AND CURRENT_DATE BETWEEN CheckInDate AND CheckOutDate;
-    """))
-    db.session.commit()
-
+    # Rental statuses are kept current by the sweeper (see sweeper.py)
     if position == 'Admin':
-        query = text(f"""
-            SELECT r.RentalID, c.FullName AS CustomerName, h.HotelName, r.RoomID,
-                   r.CheckInDate, r.CheckOutDate, r.Status, r.PaymentAmount, r.PaymentMethod
-            FROM Rental r
-            JOIN Customer c ON r.CustomerID = c.CustomerID
-            JOIN Hotel h ON r.HotelID = h.HotelID
-            ORDER BY {order_clause}
-        """)
-        params = {}
+        where, params = [], {}
     else:
-        query = text(f"""
-            SELECT r.RentalID, c.FullName AS CustomerName, h.HotelName, r.RoomID,
-                   r.CheckInDate, r.CheckOutDate, r.Status, r.PaymentAmount, r.PaymentMethod
-            FROM Rental r
+        where, params = ["r.HotelID = :hid"], {'hid': hotel_id}
+
+    page = paginator.paginate(db.session, """
+            r.RentalID, c.FullName AS CustomerName, h.HotelName, r.RoomID,
+            r.CheckInDate, r.CheckOutDate, r.Status, r.PaymentAmount, r.PaymentMethod
+        """, """
+            Rental r
             JOIN Customer c ON r.CustomerID = c.CustomerID
             JOIN Hotel h ON r.HotelID = h.HotelID
-            WHERE r.HotelID = :hid
-            ORDER BY {order_clause}
-        """)
-        params = {'hid': hotel_id}
-
-    rentals = db.session.execute(query, params).fetchall()
-    return render_template("employee/view_rentals.html", rentals=rentals, sort=sort)
+        """, order_clause, key="r.RentalID", where=where, params=params,
+        types={"r.CheckInDate": "DATE", "c.FullName": "TEXT", "h.HotelName": "TEXT", "r.Status": "TEXT",
+               "r.PaymentAmount": "NUMERIC"})
+    return render_template("employee/view_rentals.html", rentals=page.rows, page=page, sort=sort)
 
 @bp_employee.route('/employee/rentals/delete/<int:rental_id>', methods=['POST'])
 def delete_rental(rental_id):
@@ -1259,11 +1467,15 @@ def delete_rental(rental_id):
 
     try:
 
-        db.session.execute(text("""
+        rental = db.session.execute(text("""
             DELETE FROM Rental WHERE RentalID = :rid
-        """), {'rid': rental_id})
+            RETURNING HotelID, RoomID, CheckInDate, CheckOutDate
+        """), {'rid': rental_id}).fetchone()
 
         db.session.commit()
+        if rental:
+            availability_index.refresh_room(db.session, rental.hotelid, rental.roomid)
+            search_cache.invalidate(rental.hotelid, rental.checkindate, rental.checkoutdate, freed=True)
         flash("✅ Rental archived and deleted.")
     except Exception:
         db.session.rollback()
@@ -1274,6 +1486,7 @@ def delete_rental(rental_id):
 
 
 @bp_employee.route('/employee/rentals/payment', methods=['POST'])
+@idempotency_keys.protect
 def add_payment():
     if 'user_type' not in session or session['user_type'] != 'employee':
         return redirect(url_for('auth.login'))
@@ -1326,21 +1539,25 @@ def view_booking_archive():
     }
     order_clause = order_map.get(sort, 'ArchiveDate DESC')
 
-    if position == 'Admin':
-        query = text(f"SELECT * FROM BookingArchive ORDER BY {order_clause}")
-        params = {}
-    else:
-        query = text(f"""
-            SELECT * FROM BookingArchive 
-            WHERE HotelName IN (
-                SELECT HotelName FROM Hotel WHERE HotelID = :hid
-            )
-            ORDER BY {order_clause}
-        """)
-        params = {'hid': hotel_id}
+    try:
+        date_from, date_to = parse_date_range(request.args)
+    except ValueError:
+        flash("❌ Invalid date range.", "danger")
+        date_from = date_to = None
 
-    archived_bookings = db.session.execute(query, params).fetchall()
-    return render_template("employee/booking_archive.html", bookings=archived_bookings, sort=sort)
+    # Only admins see (and filter) every hotel's archive; anyone else without a hotel sees nothing.
+    if position == 'Admin':
+        hotel_id = request.args.get('hotel_id', type=int)
+    where, params = archive_filters(date_from, date_to, hotel_id, any_hotel=position == 'Admin')
+
+    page = paginator.paginate(db.session, "*", "BookingArchive", order_clause, key="BookingID",
+                              where=where, params=params,
+                              types={"ArchiveDate": "DATE", "BookingDate": "DATE", "CheckInDate": "DATE",
+                                     "CustomerName": "TEXT", "HotelName": "TEXT"})
+    hotels = []
+    if position == 'Admin':
+        hotels = db.session.execute(text("SELECT HotelID, HotelName FROM Hotel ORDER BY HotelName")).fetchall()
+    return render_template("employee/booking_archive.html", bookings=page.rows, page=page, sort=sort, hotels=hotels)
 
 
 
@@ -1369,18 +1586,112 @@ def view_rental_archive():
     elif sort == "employee":
         order_clause = "EmployeeName"
 
+    try:
+        date_from, date_to = parse_date_range(request.args)
+    except ValueError:
+        flash("❌ Invalid date range.", "danger")
+        date_from = date_to = None
+
+    # Only admins see (and filter) every hotel's archive; anyone else without a hotel sees nothing.
+    if position == 'Admin':
+        hotel_id = request.args.get('hotel_id', type=int)
+    where, params = archive_filters(date_from, date_to, hotel_id, any_hotel=position == 'Admin')
+
+    page = paginator.paginate(db.session, "*", "RentalArchive", order_clause, key="RentalID",
+                              where=where, params=params, nullable=("EmployeeName",),
+                              types={"ArchiveDate": "DATE", "CheckInDate": "DATE", "CustomerName": "TEXT",
+                                     "HotelName": "TEXT"})
+    hotels = []
+    if position == 'Admin':
+        hotels = db.session.execute(text("SELECT HotelID, HotelName FROM Hotel ORDER BY HotelName")).fetchall()
+    return render_template("employee/rental_archive.html", rentals=page.rows, page=page, sort=sort, hotels=hotels)
+
+
+@bp_employee.route('/employee/<any(bookings, rentals):archive>/archive/export')
+def export_archive(archive):
+    if 'user_type' not in session or session['user_type'] != 'employee':
+        return redirect(url_for('auth.login'))
+
+    position = session.get('position')
+    archive_page = 'employee.view_booking_archive' if archive == 'bookings' else 'employee.view_rental_archive'
+
+    if position not in ['Admin', 'Manager', 'Receptionist']:
+        flash("❌ Access denied.")
+        return redirect(url_for('employee.employee_dashboard'))
+
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        flash("❌ Unknown export format.", "danger")
+        return redirect(url_for(archive_page))
+
+    try:
+        date_from, date_to = parse_date_range(request.args)
+    except ValueError:
+        flash("❌ Invalid date range.", "danger")
+        return redirect(url_for(archive_page))
+
+    # Only admins export across hotels; everyone else gets their own hotel.
     if position == 'Admin':
-        query = text(f"SELECT * FROM RentalArchive ORDER BY {order_clause}")
-        params = {}
+        hotel_id = request.args.get('hotel_id', type=int)
     else:
-        query = text(f"""
-            SELECT * FROM RentalArchive 
-            WHERE HotelName IN (
-                SELECT HotelName FROM Hotel WHERE HotelID = :hid
-            )
-            ORDER BY {order_clause}
-        """)
-        params = {'hid': hotel_id}
+        hotel_id = session.get('hotel_id')
+        if hotel_id is None:
+            flash("⚠️ Hotel information missing for this account.")
+            return redirect(url_for(archive_page))
+
+    return archive_exports.response(db.session, archive, fmt, date_from, date_to, hotel_id,
+                                    any_hotel=position == 'Admin')
+
+
+@bp_employee.route('/employee/group-search')
+def group_search_rooms():
+    if 'user_type' not in session or session['user_type'] != 'employee':
+        return redirect(url_for('auth.login'))
+
+    if not request.args.get("checkin") or not request.args.get("checkout"):
+        return render_template("employee/group_search.html", hotels=[], checkin=None, checkout=None)
+
+    try:
+        criteria = parse_criteria(request.args)
+        rooms, mix = parse_group(request.args)
+        max_total = request.args.get("maxtotal", type=float)
+        if criteria['checkin'] >= criteria['checkout']:
+            raise ValueError("Check-out must be after check-in")
+        hotels, next_cursor = group_search(db.session, criteria, rooms, mix, max_total,
+                                           request.args.get("cursor"), current_app.config.get('SEARCH_PAGE_SIZE', 25))
+    except ValueError as e:
+        if request.args.get("format") == "json":
+            return jsonify({'error': str(e)}), 400
+        return render_template("employee/group_search.html", hotels=[], checkin=None, checkout=None, error=str(e))
+
+    page_args = request.args.to_dict()
+    page_args.pop("cursor", None)
+    next_url = url_for('employee.group_search_rooms', **page_args, cursor=next_cursor) if next_cursor else None
+    first_url = url_for('employee.group_search_rooms', **page_args) if request.args.get("cursor") else None
+
+    if request.args.get("format") == "json":
+        return jsonify({
+            'hotels': [{
+                'hotel_id': hotel.hotelid,
+                'hotel': hotel.hotelname,
+                'chain': hotel.chainname,
+                'address': hotel.address,
+                'rating': hotel.rating,
+                'room_ids': hotel.room_ids,
+                'nightly_total': float(hotel.nightly_total),
+                'stay_total': float(hotel.stay_total),
+            } for hotel in hotels],
+            'next': next_url,
+        })
+
+    return render_template("employee/group_search.html", hotels=hotels, checkin=criteria['checkin'],
+                           checkout=criteria['checkout'], next_url=next_url, first_url=first_url)
+
+
+@bp_employee.route('/employee/search-cache')
+def search_cache_stats():
+    if 'user_type' not in session or session['user_type'] != 'employee' or session.get('position') != 'Admin':
+        flash("❌ Only admins can view search cache statistics.")
+        return redirect(url_for('employee.employee_dashboard'))
 
-    archived_rentals = db.session.execute(query, params).fetchall()
-    return render_template("employee/rental_archive.html", rentals=archived_rentals)
\ No newline at end of file
+    return jsonify(search_cache.stats())
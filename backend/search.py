@@ -0,0 +1,577 @@
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import text
+from availability import availability_index
+from holds import ACTIVE_HOLD
+from search_cache import search_cache
+
+CAPACITY_RANK = "CASE r.Capacity WHEN 'single' THEN 1 WHEN 'double' THEN 2 WHEN 'triple' THEN 3 WHEN 'family' THEN 4 WHEN 'suite' THEN 5 ELSE 6 END"
+
+AMENITY_COUNT = "COALESCE(rs.AmenityCount, 0)"
+
+# sort option -> (expression, direction, SQL type of the cursor value)
+# Ties are always broken on (HotelID, RoomID) in the same direction so that the
+# keyset comparison can be written as a single row comparison.
+SORTS = {
+    'price': ("r.Price", "ASC", "NUMERIC"),
+    'price_desc': ("r.Price", "DESC", "NUMERIC"),
+    'rating': ("h.Rating", "DESC", "INTEGER"),
+    'rating_asc': ("h.Rating", "ASC", "INTEGER"),
+    'category': ("h.Category", "ASC", "TEXT"),
+    'capacity': (CAPACITY_RANK, "DESC", "INTEGER"),
+    'capacity_asc': (CAPACITY_RANK, "ASC", "INTEGER"),
+    'amenities': (AMENITY_COUNT, "DESC", "INTEGER"),
+    'amenities_least': (AMENITY_COUNT, "ASC", "INTEGER"),
+}
+
+# Served by the GiST indexes behind EXCL_Booking_Room_Stay and idx_rental_stay
+OVERLAPPING_BOOKING = """
+                SELECT 1 FROM Booking b
+                WHERE b.HotelID = r.HotelID AND b.RoomID = r.RoomID
+                AND b.Status IN ('Pending', 'Checked-in')
+                AND b.StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+            """
+OVERLAPPING_RENTAL = """
+                SELECT 1 FROM Rental rt
+                WHERE rt.HotelID = r.HotelID AND rt.RoomID = r.RoomID
+                AND rt.StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+            """
+
+# Lower bound of the room's $100 price band; everything from $500 up shares one band.
+# The ``price_band`` filter takes these lower bounds.
+PRICE_BAND_WIDTH = 100
+TOP_PRICE_BAND = 500
+PRICE_BUCKET = f"CAST(LEAST(FLOOR(r.Price / {PRICE_BAND_WIDTH}) * {PRICE_BAND_WIDTH}, {TOP_PRICE_BAND}) AS INTEGER)"
+
+# One row per (facet, value) over the whole filtered result set, aggregated into
+# a single JSON value so it can ride along with the page in the same statement.
+FACETS_SQL = f"""
+            SELECT json_agg(f ORDER BY f.facet, f.count DESC, f.value)
+            FROM (
+                SELECT CASE
+                        WHEN GROUPING(r.Capacity) = 0 THEN 'capacity'
+                        WHEN GROUPING(r.ViewType) = 0 THEN 'viewtype'
+                        WHEN GROUPING(h.Category) = 0 THEN 'category'
+                        WHEN GROUPING(hc.ChainName) = 0 THEN 'chain'
+                        ELSE 'price_band'
+                    END AS facet,
+                    COALESCE(r.Capacity, r.ViewType, h.Category, hc.ChainName, CAST({PRICE_BUCKET} AS TEXT)) AS value,
+                    COUNT(*) AS count
+                FROM Room r
+                JOIN Hotel h ON r.HotelID = h.HotelID
+                JOIN HotelChain hc ON h.HotelChainID = hc.HotelChainID
+                {{free_join}}
+                WHERE {{filters}}
+                GROUP BY GROUPING SETS ((r.Capacity), (r.ViewType), (h.Category), (hc.ChainName), ({PRICE_BUCKET}))
+            ) f
+"""
+
+FILTER_FIELDS = ['capacity', 'area', 'chain', 'category', 'price', 'price_band', 'minrooms', 'minhotelrooms', 'viewtype']
+
+
+def parse_criteria(args):
+    """Normalize the search form into a plain dict; raises ValueError, with a message to show, on bad input."""
+    try:
+        checkin = datetime.strptime(args.get("checkin", ""), "%Y-%m-%d").date()
+        checkout = datetime.strptime(args.get("checkout", ""), "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("Invalid dates")
+
+    criteria = {'checkin': checkin, 'checkout': checkout}
+    for field in FILTER_FIELDS:
+        value = (args.get(field) or "").strip()
+        if value:
+            criteria[field] = value
+    if 'price_band' in criteria:
+        # Any price inside a band names that band
+        try:
+            band = int(criteria['price_band'])
+        except ValueError:
+            band = -1
+        if band < 0:
+            raise ValueError("Invalid price band")
+        criteria['price_band'] = min(band // PRICE_BAND_WIDTH * PRICE_BAND_WIDTH, TOP_PRICE_BAND)
+    criteria['sort'] = args.get("sort") if args.get("sort") in SORTS else 'price'
+    return criteria
+
+
+def build_filters(session, criteria):
+    filters = ["r.Status = 'Available'"]
+    params = {"checkin": criteria['checkin'], "checkout": criteria['checkout']}
+
+    if criteria.get("capacity"):
+        filters.append("r.Capacity = :capacity")
+        params["capacity"] = criteria["capacity"]
+
+    if criteria.get("area"):
+        # A known city name is matched exactly on the indexed Hotel.City; anything
+        # else (street, state, partial text) goes through the address trigram index.
+        city = criteria["area"].strip().lower()
+        if session.execute(text("SELECT 1 FROM Hotel WHERE City = :city LIMIT 1"), {"city": city}).fetchone():
+            filters.append("h.City = :city")
+            params["city"] = city
+        else:
+            filters.append("h.Address ILIKE :area")
+            params["area"] = f"%{criteria['area']}%"
+
+    if criteria.get("chain"):
+        filters.append("hc.ChainName ILIKE :chain")
+        params["chain"] = f"%{criteria['chain']}%"
+
+    if criteria.get("category"):
+        filters.append("h.Category = :category")
+        params["category"] = criteria["category"]
+
+    if criteria.get("price"):
+        filters.append("r.Price <= :price")
+        params["price"] = criteria["price"]
+
+    if criteria.get("price_band") is not None:
+        filters.append("r.Price >= :band_from")
+        params["band_from"] = criteria["price_band"]
+        if criteria["price_band"] < TOP_PRICE_BAND:
+            filters.append("r.Price < :band_to")
+            params["band_to"] = criteria["price_band"] + PRICE_BAND_WIDTH
+
+    if criteria.get("minrooms"):
+        filters.append("h.Num_Rooms >= :minrooms")
+        params["minrooms"] = criteria["minrooms"]
+
+    if criteria.get("minhotelrooms"):
+        filters.append("h.Num_Rooms >= :minhotelrooms")
+        params["minhotelrooms"] = criteria["minhotelrooms"]
+
+    if criteria.get("viewtype"):
+        filters.append("r.ViewType = :viewtype")
+        params["viewtype"] = criteria["viewtype"]
+
+    return filters, params
+
+
+def availability_clause(session, criteria, filters, params, use_index=True):
+    """Restrict the search to rooms free for the stay; returns the extra JOIN.
+
+    ``use_index=False`` always uses the SQL overlap checks, for callers whose
+    answer must match the database rather than this process's index.
+    """
+    checkin, checkout = criteria['checkin'], criteria['checkout']
+
+    # Holds are too short-lived for the index and always checked in SQL.
+    filters.append(f"NOT EXISTS ({ACTIVE_HOLD})")
+
+    # Narrow to free rooms with the in-memory index when the stay is inside its
+    # horizon; otherwise fall back to the correlated overlap checks.
+    if use_index and availability_index.enabled:
+        availability_index.ensure_ready(session)
+    if use_index and availability_index.enabled and availability_index.covers(checkin, checkout):
+        params["free_hids"], params["free_rids"] = availability_index.free_room_keys(checkin, checkout)
+        return """
+        JOIN unnest(CAST(:free_hids AS INTEGER[]), CAST(:free_rids AS INTEGER[])) AS free(HotelID, RoomID)
+            ON free.HotelID = r.HotelID AND free.RoomID = r.RoomID"""
+
+    filters.append(f"NOT EXISTS ({OVERLAPPING_BOOKING})")
+    filters.append(f"NOT EXISTS ({OVERLAPPING_RENTAL})")
+    return ""
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(list(values), default=str).encode()).decode()
+
+
+def _cursor_value(value, sql_type):
+    """Check a decoded cursor value against the SQL type it is cast to, so a tampered
+    cursor is rejected here rather than by Postgres."""
+    if isinstance(value, bool) or value is None:
+        raise ValueError
+    if sql_type == 'INTEGER':
+        value = int(value)
+        if not -2 ** 31 <= value < 2 ** 31:
+            raise ValueError
+        return value
+    if sql_type == 'NUMERIC':
+        value = Decimal(str(value))
+        if not value.is_finite() or abs(value.adjusted()) > 1000:
+            raise ValueError
+        return value
+    if sql_type == 'DATE':
+        return date.fromisoformat(value)
+    if not isinstance(value, str):
+        raise ValueError
+    return value
+
+
+def decode_cursor(cursor, size=3, ids=2, types=None):
+    """Decode a cursor into ``size`` values; the last ``ids`` of them are integer keys.
+
+    With ``types``, the SQL types of the values before the keys, every value is
+    also checked to fit its type (the keys as INTEGER).
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError
+        if types is None:
+            return values[:-ids] + [int(value) for value in values[-ids:]]
+        types = list(types) + ['INTEGER'] * ids
+        return [_cursor_value(value, sql_type) for value, sql_type in zip(values, types)]
+    except (ValueError, TypeError, ArithmeticError):
+        raise ValueError("Invalid page cursor")
+
+
+def build_search_query(session, criteria, cursor=None, page_size=25, with_facets=False, use_index=True):
+    """Return the SQL and parameters for one keyset page of free rooms.
+
+    With ``with_facets`` every row also carries a ``facets`` JSON column holding
+    the facet counts for the whole filtered set (computed once per statement).
+    """
+    filters, params = build_filters(session, criteria)
+    free_join = availability_clause(session, criteria, filters, params, use_index)
+    facets = ""
+    if with_facets:
+        facets = f",\n            ({FACETS_SQL.format(free_join=free_join, filters=' AND '.join(filters))}) AS facets"
+
+    sort_expr, direction, sort_type = SORTS[criteria['sort']]
+    if cursor:
+        params["after_key"], params["after_hid"], params["after_rid"] = decode_cursor(cursor, types=[sort_type])
+        comparison = ">" if direction == "ASC" else "<"
+        filters.append(
+            f"({sort_expr}, r.HotelID, r.RoomID) {comparison} "
+            f"(CAST(:after_key AS {sort_type}), :after_hid, :after_rid)"
+        )
+    params["limit"] = page_size + 1
+
+    query = f"""
+        SELECT r.*, h.HotelName, h.Address, hc.ChainName, h.Rating, h.Num_Rooms,
+            rs.Amenities AS amenities,
+            rs.LatestProblem AS problem_cause,
+            {sort_expr} AS sort_key{facets}
+        FROM Room r
+        JOIN Hotel h ON r.HotelID = h.HotelID
+        JOIN HotelChain hc ON h.HotelChainID = hc.HotelChainID
+        LEFT JOIN RoomSummary rs ON rs.HotelID = r.HotelID AND rs.RoomID = r.RoomID
+        {free_join}
+        WHERE {' AND '.join(filters)}
+        ORDER BY {sort_expr} {direction}, r.HotelID {direction}, r.RoomID {direction}
+        LIMIT :limit
+    """
+    return query, params
+
+
+def group_facets(rows):
+    """Turn the JSON facet rows into ``{facet: [(value, label, count), ...]}``."""
+    facets = {}
+    for row in rows or []:
+        value = row['value']
+        if row['facet'] == 'price_band':
+            value = int(value)
+            label = f"${value}+" if value >= TOP_PRICE_BAND else f"${value}–{value + PRICE_BAND_WIDTH - 1}"
+        else:
+            label = value.replace('_', ' ').capitalize() if row['facet'] == 'viewtype' else value
+        facets.setdefault(row['facet'], []).append((value, label, row['count']))
+    if 'price_band' in facets:
+        facets['price_band'].sort()
+    return facets
+
+
+def search_page(session, criteria, cursor=None, page_size=25, use_index=True):
+    """Fetch one keyset page of free rooms.
+
+    Returns ``(rooms, next_cursor, facets)``; ``next_cursor`` is None on the last
+    page. Facets only come with the first page, since they do not depend on
+    the cursor; later pages return None. See ``availability_clause`` for
+    ``use_index``.
+    """
+    with_facets = cursor is None
+    query, params = build_search_query(session, criteria, cursor, page_size, with_facets, use_index)
+    rooms = session.execute(text(query), params).fetchall()
+    facets = group_facets(rooms[0].facets if rooms else None) if with_facets else None
+
+    next_cursor = None
+    if len(rooms) > page_size:
+        rooms = rooms[:page_size]
+        last = rooms[-1]
+        next_cursor = encode_cursor([last.sort_key, last.hotelid, last.roomid])
+    return rooms, next_cursor, facets
+
+
+def search_etag(session, criteria, cursor=None, page_size=25):
+    """Strong ETag for a search page, without running the search itself.
+
+    Combines the normalized request with the availability version of every
+    hotel the hotel-level filters (area, chain, category, size) allow, so any
+    write touching one of those hotels yields a new tag. A hotel's version is
+    its AvailabilityVersion counter plus the deltas not folded into it yet.
+    """
+    filters, params = build_filters(session, criteria)
+    hotel_filters = [f for f in filters if f.startswith(("h.", "hc."))] or ["TRUE"]
+    # Active hold IDs are folded in as well, since a hold expiring changes the
+    # results without any write.
+    versions = session.execute(text(f"""
+        SELECT string_agg(h.HotelID || ':' || (COALESCE(v.Version, 0) + (
+                   SELECT COUNT(*) FROM AvailabilityVersionDelta d WHERE d.HotelID = h.HotelID
+               )) || COALESCE(':' || (
+                   SELECT string_agg(CAST(rh.HoldID AS TEXT), '.' ORDER BY rh.HoldID)
+                   FROM RoomHold rh WHERE rh.HotelID = h.HotelID AND rh.ExpiresAt > now()
+               ), ''), ',' ORDER BY h.HotelID)
+        FROM Hotel h
+        JOIN HotelChain hc ON h.HotelChainID = hc.HotelChainID
+        LEFT JOIN AvailabilityVersion v ON v.HotelID = h.HotelID
+        WHERE {' AND '.join(hotel_filters)}
+    """), params).scalar()
+    key = search_cache.make_key(criteria, cursor, page_size)
+    return hashlib.sha1(f"{key!r}|{versions or ''}".encode()).hexdigest()
+
+
+def cached_search_page(session, criteria, cursor=None, page_size=25):
+    """``search_page`` behind the per-process result cache."""
+    if not search_cache.enabled:
+        return search_page(session, criteria, cursor, page_size)
+
+    key = search_cache.make_key(criteria, cursor, page_size)
+    page = search_cache.get(key)
+    if page is None:
+        page = search_page(session, criteria, cursor, page_size)
+        search_cache.put(key, criteria, *page)
+    return page
+
+
+# Free gaps per room inside [:checkin, :checkout), computed in one pass with
+# window functions: each busy stay closes the gap that started at the latest
+# checkout before it, and a final gap runs from the last checkout to the end.
+FREE_WINDOWS_SQL = """
+    WITH busy AS (
+        SELECT HotelID, RoomID,
+               GREATEST(CheckInDate, CAST(:checkin AS DATE)) AS busy_from,
+               LEAST(CheckOutDate, CAST(:checkout AS DATE)) AS busy_to
+        FROM Booking
+        WHERE Status IN ('Pending', 'Checked-in')
+          AND StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+        UNION ALL
+        SELECT HotelID, RoomID,
+               GREATEST(CheckInDate, CAST(:checkin AS DATE)),
+               LEAST(CheckOutDate, CAST(:checkout AS DATE))
+        FROM Rental
+        WHERE StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+        UNION ALL
+        SELECT HotelID, RoomID,
+               GREATEST(CheckInDate, CAST(:checkin AS DATE)),
+               LEAST(CheckOutDate, CAST(:checkout AS DATE))
+        FROM RoomHold
+        WHERE ExpiresAt > now()
+          AND StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+    ),
+    gaps AS (
+        SELECT HotelID, RoomID,
+               COALESCE(MAX(busy_to) OVER (
+                   PARTITION BY HotelID, RoomID ORDER BY busy_from, busy_to
+                   ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+               ), CAST(:checkin AS DATE)) AS gap_from,
+               busy_from AS gap_to
+        FROM busy
+        UNION ALL
+        SELECT r.HotelID, r.RoomID, COALESCE(MAX(b.busy_to), CAST(:checkin AS DATE)), CAST(:checkout AS DATE)
+        FROM Room r
+        LEFT JOIN busy b ON b.HotelID = r.HotelID AND b.RoomID = r.RoomID
+        GROUP BY r.HotelID, r.RoomID
+    )
+    SELECT DISTINCT ON (HotelID, RoomID) HotelID, RoomID, gap_from AS FreeFrom
+    FROM gaps
+    WHERE gap_to - gap_from >= :nights
+    ORDER BY HotelID, RoomID, gap_from
+"""
+
+
+def flexible_search(session, criteria, nights, cursor=None, page_size=25):
+    """Cheapest, then earliest, free ``nights``-night stay per room.
+
+    ``criteria['checkin']``/``['checkout']`` bound the window the stay must fit
+    in. Returns ``(rooms, next_cursor)`` where every room carries its own
+    ``stay_checkin``/``stay_checkout`` and ``total_price``.
+    """
+    filters, params = build_filters(session, criteria)
+    params["nights"] = nights
+    checkin, checkout = criteria['checkin'], criteria['checkout']
+
+    if availability_index.enabled:
+        availability_index.ensure_ready(session)
+    if availability_index.enabled and availability_index.covers(checkin, checkout):
+        holds = session.execute(text("""
+            SELECT HotelID, RoomID, CheckInDate, CheckOutDate FROM RoomHold
+            WHERE ExpiresAt > now()
+              AND StayPeriod && daterange(CAST(:checkin AS DATE), CAST(:checkout AS DATE), '[)')
+        """), params).fetchall()
+        starts = availability_index.earliest_free_starts(checkin, checkout, nights, extra=holds)
+        params["win_hids"] = [hotel_id for hotel_id, _ in starts]
+        params["win_rids"] = [room_id for _, room_id in starts]
+        params["win_starts"] = list(starts.values())
+        windows = """
+        SELECT * FROM unnest(CAST(:win_hids AS INTEGER[]), CAST(:win_rids AS INTEGER[]), CAST(:win_starts AS DATE[]))
+            AS w(HotelID, RoomID, FreeFrom)"""
+    else:
+        windows = FREE_WINDOWS_SQL
+
+    if cursor:
+        params["after_price"], params["after_from"], params["after_hid"], params["after_rid"] = decode_cursor(cursor, 4, types=["NUMERIC", "DATE"])
+        filters.append(
+            "(r.Price, w.FreeFrom, r.HotelID, r.RoomID) > "
+            "(CAST(:after_price AS NUMERIC), CAST(:after_from AS DATE), :after_hid, :after_rid)"
+        )
+    params["limit"] = page_size + 1
+
+    query = f"""
+        WITH windows AS ({windows})
+        SELECT r.*, h.HotelName, h.Address, hc.ChainName, h.Rating, h.Num_Rooms,
+            rs.Amenities AS amenities,
+            rs.LatestProblem AS problem_cause,
+            w.FreeFrom AS stay_checkin,
+            w.FreeFrom + :nights AS stay_checkout,
+            r.Price * :nights AS total_price
+        FROM windows w
+        JOIN Room r ON r.HotelID = w.HotelID AND r.RoomID = w.RoomID
+        JOIN Hotel h ON r.HotelID = h.HotelID
+        JOIN HotelChain hc ON h.HotelChainID = hc.HotelChainID
+        LEFT JOIN RoomSummary rs ON rs.HotelID = r.HotelID AND rs.RoomID = r.RoomID
+        WHERE {' AND '.join(filters)}
+        ORDER BY r.Price, w.FreeFrom, r.HotelID, r.RoomID
+        LIMIT :limit
+    """
+    rooms = session.execute(text(query), params).fetchall()
+
+    next_cursor = None
+    if len(rooms) > page_size:
+        rooms = rooms[:page_size]
+        last = rooms[-1]
+        next_cursor = encode_cursor([last.price, last.stay_checkin, last.hotelid, last.roomid])
+    return rooms, next_cursor
+
+
+def room_to_dict(room):
+    """Compact JSON form of a search result row."""
+    result = {
+        'hotel_id': room.hotelid,
+        'room_id': room.roomid,
+        'hotel': room.hotelname,
+        'chain': room.chainname,
+        'address': room.address,
+        'rating': room.rating,
+        'capacity': room.capacity,
+        'view': room.viewtype,
+        'extendable': room.extendable,
+        'price': float(room.price),
+        'amenities': room.amenities.split(', ') if room.amenities else [],
+        'problem': room.problem_cause,
+    }
+    if 'stay_checkin' in room._fields:
+        result['checkin'] = room.stay_checkin.isoformat()
+        result['checkout'] = room.stay_checkout.isoformat()
+        result['total_price'] = float(room.total_price)
+    return result
+
+
+CAPACITIES = ['single', 'double', 'triple', 'family', 'suite']
+
+
+def parse_group(args):
+    """Read the group size and optional capacity mix; raises ValueError.
+
+    The mix is written as ``double:2,single:1``. Returns ``(rooms, mix)`` where
+    ``mix`` maps capacity -> count and is empty when any capacity will do.
+    """
+    mix = {}
+    for part in (args.get("mix") or "").split(","):
+        if not part.strip():
+            continue
+        capacity, _, count = part.partition(":")
+        capacity = capacity.strip().lower()
+        if capacity not in CAPACITIES or not count.strip().isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid room mix entry '{part.strip()}'")
+        mix[capacity] = mix.get(capacity, 0) + int(count)
+
+    rooms = args.get("rooms", type=int)
+    if rooms is None:
+        rooms = sum(mix.values())
+    if not rooms or rooms < 1:
+        raise ValueError("Number of rooms must be at least 1")
+    if mix and sum(mix.values()) != rooms:
+        raise ValueError("Room mix does not add up to the number of rooms")
+    return rooms, mix
+
+
+def group_search(session, criteria, rooms, mix=None, max_total=None, cursor=None, page_size=25):
+    """Hotels that can host ``rooms`` free rooms for the stay, cheapest set first.
+
+    Free rooms are ranked by price inside each hotel (and capacity, when a mix
+    is given); the first ``rooms`` of them, or the first ``count`` of each
+    capacity, form the hotel's cheapest set. Hotels without enough rooms drop
+    out in the HAVING clause, so only one row per qualifying hotel comes back.
+    Returns ``(hotels, next_cursor)``.
+    """
+    criteria = dict(criteria)
+    if mix:
+        criteria.pop("capacity", None)
+    filters, params = build_filters(session, criteria)
+    free_join = availability_clause(session, criteria, filters, params)
+    params["rooms"] = rooms
+    params["nights"] = (criteria['checkout'] - criteria['checkin']).days
+
+    if mix:
+        params["mix_caps"] = list(mix)
+        params["mix_counts"] = list(mix.values())
+        filters.append("r.Capacity = ANY(CAST(:mix_caps AS TEXT[]))")
+        partition = "r.HotelID, r.Capacity"
+        wanted = """
+        JOIN unnest(CAST(:mix_caps AS TEXT[]), CAST(:mix_counts AS INTEGER[])) AS wanted(Capacity, Count)
+            ON wanted.Capacity = ranked.Capacity"""
+        pick = "ranked.rank <= wanted.Count"
+    else:
+        partition = "r.HotelID"
+        wanted = ""
+        pick = "ranked.rank <= :rooms"
+
+    having = ["COUNT(*) = :rooms"]
+    if max_total is not None:
+        having.append("SUM(ranked.Price) <= :max_total")
+        params["max_total"] = max_total
+    if cursor:
+        params["after_total"], params["after_hid"] = decode_cursor(cursor, 2, ids=1, types=["NUMERIC"])
+        having.append("(SUM(ranked.Price), ranked.HotelID) > (CAST(:after_total AS NUMERIC), :after_hid)")
+    params["limit"] = page_size + 1
+
+    query = f"""
+        WITH ranked AS (
+            SELECT r.HotelID, r.RoomID, r.Capacity, r.Price,
+                ROW_NUMBER() OVER (PARTITION BY {partition} ORDER BY r.Price, r.RoomID) AS rank
+            FROM Room r
+            JOIN Hotel h ON r.HotelID = h.HotelID
+            JOIN HotelChain hc ON h.HotelChainID = hc.HotelChainID
+            {free_join}
+            WHERE {' AND '.join(filters)}
+        )
+        SELECT ranked.HotelID, h.HotelName, h.Address, hc.ChainName, h.Rating,
+            COUNT(*) AS room_count,
+            SUM(ranked.Price) AS nightly_total,
+            SUM(ranked.Price) * :nights AS stay_total,
+            ARRAY_AGG(ranked.RoomID ORDER BY ranked.Price, ranked.RoomID) AS room_ids,
+            STRING_AGG(ranked.RoomID || ' (' || ranked.Capacity || ', $' || ranked.Price || ')', ', '
+                       ORDER BY ranked.Price, ranked.RoomID) AS room_set
+        FROM ranked
+        {wanted}
+        JOIN Hotel h ON ranked.HotelID = h.HotelID
+        JOIN HotelChain hc ON h.HotelChainID = hc.HotelChainID
+        WHERE {pick}
+        GROUP BY ranked.HotelID, h.HotelName, h.Address, hc.ChainName, h.Rating
+        HAVING {' AND '.join(having)}
+        ORDER BY nightly_total, ranked.HotelID
+        LIMIT :limit
+    """
+    hotels = session.execute(text(query), params).fetchall()
+
+    next_cursor = None
+    if len(hotels) > page_size:
+        hotels = hotels[:page_size]
+        last = hotels[-1]
+        next_cursor = encode_cursor([last.nightly_total, last.hotelid])
+    return hotels, next_cursor
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+
+from availability import as_date
+
+
+class _Entry:
+    __slots__ = ('value', 'checkin', 'checkout', 'hotels', 'expires_at')
+
+    def __init__(self, value, checkin, checkout, hotels, expires_at):
+        self.value = value
+        self.checkin = checkin
+        self.checkout = checkout
+        self.hotels = hotels
+        self.expires_at = expires_at
+
+
+class SearchCache:
+    """LRU + TTL cache of search result pages keyed on the normalized filters.
+
+    Each entry remembers its stay and the hotels on its page so writes only
+    drop the pages they can change: a room being taken only affects pages that
+    show that hotel, while a room being freed can surface on any page for an
+    overlapping stay.
+    """
+
+    def __init__(self, max_entries=256, ttl=60):
+        self.enabled = True
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SEARCH_CACHE_ENABLED', True)
+        self.max_entries = app.config.get('SEARCH_CACHE_SIZE', self.max_entries)
+        self.ttl = app.config.get('SEARCH_CACHE_TTL', self.ttl)
+
+    @staticmethod
+    def make_key(criteria, cursor=None, page_size=None):
+        normalized = []
+        for field, value in sorted(criteria.items()):
+            value = str(value)
+            if field in ('area', 'chain'):
+                value = value.lower()
+            normalized.append((field, value))
+        return tuple(normalized), cursor or None, page_size
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key, criteria, rooms, next_cursor, facets=None):
+        if not self.enabled:
+            return
+        # Facet counts cover every matching hotel, not only the ones on the page.
+        hotels = {room.hotelid for room in rooms} if facets is None else None
+        entry = _Entry((rooms, next_cursor, facets), criteria['checkin'], criteria['checkout'],
+                       hotels, time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, hotel_id=None, checkin=None, checkout=None, freed=False):
+        """Drop pages affected by a write.
+
+        ``hotel_id``/``checkin``/``checkout`` describe what changed (None means
+        "any"). ``freed`` marks writes that can make a room appear in results.
+        """
+        hotel_id = int(hotel_id) if hotel_id is not None else None
+        checkin, checkout = as_date(checkin), as_date(checkout)
+
+        with self._lock:
+            stale = []
+            for key, entry in self._entries.items():
+                if checkin is not None and not (entry.checkin < checkout and checkin < entry.checkout):
+                    continue
+                if not freed and hotel_id is not None and entry.hotels is not None and hotel_id not in entry.hotels:
+                    continue
+                stale.append(key)
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+search_cache = SearchCache()
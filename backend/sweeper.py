@@ -0,0 +1,210 @@
+import threading
+import time
+import traceback
+from sqlalchemy import text
+from app import db
+from availability import availability_index
+from search_cache import search_cache
+
+# Each task changes at most :batch rows per statement, found through a partial
+# index, and skips rows a request is writing instead of waiting for them.
+TASKS = {
+    'complete_rentals': text("""
+        UPDATE Rental SET Status = 'Completed'
+        WHERE RentalID IN (
+            SELECT RentalID FROM Rental
+            WHERE Status = 'Ongoing' AND CheckOutDate < CURRENT_DATE
+            ORDER BY CheckOutDate
+            LIMIT :batch
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING RentalID
+    """),
+    'no_show_bookings': text("""
+        UPDATE Booking SET Status = 'No-show'
+        WHERE BookingID IN (
+            SELECT BookingID FROM Booking
+            WHERE Status = 'Pending' AND CheckInDate <= CURRENT_DATE - :grace
+            ORDER BY CheckInDate
+            LIMIT :batch
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING HotelID, RoomID, CheckInDate, CheckOutDate
+    """),
+    'expired_holds': text("""
+        DELETE FROM RoomHold
+        WHERE HoldID IN (
+            SELECT HoldID FROM RoomHold
+            WHERE ExpiresAt <= now()
+            LIMIT :batch
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING HotelID, RoomID, CheckInDate, CheckOutDate
+    """),
+    'old_booking_requests': text("""
+        DELETE FROM BookingRequest
+        WHERE RequestID IN (
+            SELECT RequestID FROM BookingRequest
+            WHERE Status <> 'Queued' AND ProcessedAt < now() - make_interval(days => :retention)
+            ORDER BY RequestID
+            LIMIT :batch
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING RequestID
+    """),
+    # The two delta folds run last, so they also fold in the deltas the tasks above appended.
+    # Hotels are updated in HotelID order, so two sweeps folding at once cannot deadlock on
+    # their rows. A fold moves counts without changing any total, so ETags stay the same.
+    'availability_version_deltas': text("""
+        WITH folded AS (
+            DELETE FROM AvailabilityVersionDelta
+            WHERE DeltaID IN (
+                SELECT DeltaID FROM AvailabilityVersionDelta
+                ORDER BY DeltaID
+                LIMIT :batch
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING DeltaID, HotelID
+        ),
+        versions AS (
+            INSERT INTO AvailabilityVersion (HotelID, Version)
+            SELECT HotelID, COUNT(*)
+            FROM folded
+            GROUP BY HotelID
+            ORDER BY HotelID
+            ON CONFLICT (HotelID) DO UPDATE
+            SET Version = AvailabilityVersion.Version + EXCLUDED.Version
+        )
+        SELECT DeltaID FROM folded
+    """),
+    'dashboard_deltas': text("""
+        WITH folded AS (
+            DELETE FROM HotelDashboardDelta
+            WHERE DeltaID IN (
+                SELECT DeltaID FROM HotelDashboardDelta
+                ORDER BY DeltaID
+                LIMIT :batch
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING DeltaID, HotelID, PendingBookings, InHouseRentals, OutOfOrderRooms
+        ),
+        counters AS (
+            INSERT INTO HotelDashboard (HotelID, PendingBookings, InHouseRentals, OutOfOrderRooms)
+            SELECT HotelID, SUM(PendingBookings), SUM(InHouseRentals), SUM(OutOfOrderRooms)
+            FROM folded
+            GROUP BY HotelID
+            ORDER BY HotelID
+            ON CONFLICT (HotelID) DO UPDATE
+            SET PendingBookings = HotelDashboard.PendingBookings + EXCLUDED.PendingBookings,
+                InHouseRentals = HotelDashboard.InHouseRentals + EXCLUDED.InHouseRentals,
+                OutOfOrderRooms = HotelDashboard.OutOfOrderRooms + EXCLUDED.OutOfOrderRooms
+        )
+        SELECT DeltaID FROM folded
+    """),
+}
+
+# Tasks that can make a room free again; they return the room and stay they freed.
+FREES_ROOMS = ('no_show_bookings', 'expired_holds')
+
+
+class Sweeper:
+    """Periodic maintenance that used to happen on page views.
+
+    Completes rentals whose stay is over, marks Pending bookings whose
+    check-in passed ``no_show_grace_days`` ago as No-show, clears expired
+    holds and old processed booking requests and folds the availability
+    version and dashboard counter deltas the triggers append into
+    AvailabilityVersion and HotelDashboard. Every task runs in batches of
+    ``batch_size`` rows, each committed on its own, so a sweep never holds
+    more than one batch of row locks.
+
+    Run it with ``flask sweep`` (from cron, say) or set ``SWEEPER_ENABLED``
+    to sweep every ``interval`` seconds from a thread in each web process;
+    concurrent sweeps skip each other's rows.
+    """
+
+    def __init__(self, enabled=False, interval=300, batch_size=500, no_show_grace_days=1, request_retention_days=7):
+        self.enabled = enabled
+        self.interval = interval
+        self.batch_size = batch_size
+        self.no_show_grace_days = no_show_grace_days
+        self.request_retention_days = request_retention_days
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SWEEPER_ENABLED', self.enabled)
+        self.interval = app.config.get('SWEEPER_INTERVAL', self.interval)
+        self.batch_size = app.config.get('SWEEPER_BATCH_SIZE', self.batch_size)
+        self.no_show_grace_days = app.config.get('NO_SHOW_GRACE_DAYS', self.no_show_grace_days)
+        self.request_retention_days = app.config.get('BOOKING_REQUEST_RETENTION_DAYS', self.request_retention_days)
+
+        if self.enabled:
+            # Started by the first request, so CLI commands do not spawn it.
+            app.before_request(lambda: self.start(app))
+
+    def run(self, session):
+        """Run every task to completion; returns {task: (rows, batches, seconds)}."""
+        params = {'batch': self.batch_size, 'grace': self.no_show_grace_days,
+                  'retention': self.request_retention_days}
+        results = {}
+        for task, statement in TASKS.items():
+            start = time.perf_counter()
+            rows = batches = 0
+            while True:
+                try:
+                    changed = session.execute(statement, params).fetchall()
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    raise
+                rows += len(changed)
+                batches += 1
+                if task in FREES_ROOMS:
+                    for hotel_id, room_id, checkin, checkout in changed:
+                        availability_index.refresh_room(session, hotel_id, room_id)
+                        search_cache.invalidate(hotel_id, checkin, checkout, freed=True)
+                if len(changed) < self.batch_size:
+                    break
+            results[task] = (rows, batches, time.perf_counter() - start)
+        return results
+
+    @staticmethod
+    def summary(results):
+        total = sum(seconds for _, _, seconds in results.values())
+        parts = ", ".join(f"{task} {rows}" for task, (rows, _, _) in results.items())
+        return f"🧹 Sweep: {parts} rows in {total * 1000:.0f} ms"
+
+    def start(self, app):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(app,), daemon=True, name='sweeper')
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join()
+            self._thread = None
+
+    def _loop(self, app):
+        while True:
+            with app.app_context():
+                try:
+                    print(self.summary(self.run(db.session)))
+                except Exception:
+                    print("⚠️ Sweep failed:")
+                    print(traceback.format_exc())
+                finally:
+                    db.session.remove()
+            if self._stop.wait(self.interval):
+                return
+
+
+sweeper = Sweeper()